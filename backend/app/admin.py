@@ -1,15 +1,21 @@
 from django.contrib import admin
-from .models import CustomUser, Level, Feedback
+from .models import CustomUser, Level, Feedback, LevelCompletion
 from django.contrib.auth.admin import UserAdmin
 
 
+class LevelCompletionInline(admin.TabularInline):
+    model = LevelCompletion
+    extra = 0
+
+
 @admin.register(CustomUser)
 class CustomUserAdmin(UserAdmin):
     model = CustomUser
     list_display = ('email', 'username', 'xp')
     fieldsets = UserAdmin.fieldsets + (
-        (None, {'fields': ('xp', 'completed_levels')}),
+        (None, {'fields': ('xp',)}),
     )
+    inlines = [LevelCompletionInline]
 
 
 @admin.register(Level)
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class AppConfigCustom(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from .authentication import discard_cached_user
+        from .catalog import bump_catalog_version
+        from .models import CustomUser, Level
+
+        post_save.connect(bump_catalog_version, sender=Level, dispatch_uid='level-catalog-save')
+        post_delete.connect(bump_catalog_version, sender=Level, dispatch_uid='level-catalog-delete')
+        post_save.connect(discard_cached_user, sender=CustomUser, dispatch_uid='user-cache-save')
+        post_delete.connect(discard_cached_user, sender=CustomUser, dispatch_uid='user-cache-delete')
@@ -0,0 +1,166 @@
+"""Database-free JWT authentication for the read-heavy endpoints.
+
+``JWTAuthentication`` loads the ``CustomUser`` row on every request, before
+the view runs, even when the view only needs the user's id (levels,
+feedback history) or a couple of fields. ``ClaimsJWTAuthentication`` trusts
+the verified token instead: ``request.user`` is a ``ClaimsUser`` answering
+``id``/``pk``, ``username`` and ``language`` from the token's claims, and
+only materializing the ``CustomUser`` (through a short-TTL per-process
+cache) when a view reads anything else, such as ``xp``.
+
+XP is deliberately not a claim: it changes with every saved attempt, while
+an access token lives for an hour. Views using this authentication must
+filter by ``user_id=request.user.pk`` rather than ``user=request.user``.
+
+Trade-off: a deleted or deactivated user keeps read access to these
+endpoints until the access token expires, unless their row is cached (an
+inactive cached user is rejected). Write endpoints keep the default,
+fully checked ``JWTAuthentication``.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import CustomUser
+
+
+# Claims copied into tokens by ClaimsRefreshToken.for_user
+USER_CLAIMS = ('username', 'language')
+
+
+class UserCache:
+    """Per-process LRU of ``CustomUser`` rows with a short time to live.
+
+    Writes that change a user (XP updates, profile saves) call ``discard``
+    in the process that made them; other processes see the change once the
+    entry expires (``AUTH_USER_CACHE_TTL`` seconds).
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def peek(self, user_id):
+        """The cached user, or None if absent or expired (never queries)."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def get(self, user_id) -> CustomUser:
+        """The user with ``user_id``, loaded on a miss; raises AuthenticationFailed if gone."""
+        user = self.peek(user_id)
+        if user is None:
+            user = CustomUser.objects.filter(pk=user_id).first()
+            if user is None:
+                raise AuthenticationFailed('User not found', code='user_not_found')
+            if self.ttl > 0:
+                with self._lock:
+                    self._entries[user_id] = (time.monotonic() + self.ttl, user)
+                    self._entries.move_to_end(user_id)
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
+
+    def discard(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_TTL, settings.AUTH_USER_CACHE_SIZE)
+
+
+def discard_cached_user(sender, instance, **kwargs):
+    """Signal receiver dropping a saved or deleted user from the cache."""
+    user_cache.discard(instance.pk)
+
+
+class ClaimsUser(TokenUser):
+    """``request.user`` backed by verified token claims.
+
+    Attributes without a claim (and tokens issued before the claims were
+    added) fall through to the cached ``CustomUser``, available as ``user``.
+    Cached instances are shared between requests: treat them as read-only.
+    """
+
+    @cached_property
+    def id(self) -> int:
+        # simplejwt stores the id as a string; the cache and ORM filters use ints
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self) -> int:
+        return self.id
+
+    @cached_property
+    def user(self) -> CustomUser:
+        return user_cache.get(self.id)
+
+    @cached_property
+    def username(self) -> str:
+        return self.token.get('username') or self.user.username
+
+    @cached_property
+    def language(self) -> str:
+        return self.token.get('language') or self.user.language
+
+    def __str__(self) -> str:
+        return f'ClaimsUser {self.id}'
+
+    def __getattr__(self, attr):
+        # Only reached for names not defined above; never recurse on
+        # private names (copy/pickle probes) or on ``user`` itself
+        if attr.startswith('_') or attr == 'user':
+            raise AttributeError(attr)
+        return getattr(self.user, attr)
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """Verifies the access token without loading the user (see module docstring)."""
+
+    def get_user(self, validated_token) -> ClaimsUser:
+        try:
+            user = ClaimsUser(validated_token)
+            user_id = user.id
+        except (KeyError, TypeError, ValueError):
+            raise InvalidToken('Token contained no recognizable user identification')
+        # Free check: reject users known (from the cache) to be deactivated
+        cached = user_cache.peek(user_id)
+        if cached is not None and not cached.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry ``USER_CLAIMS``."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
@@ -0,0 +1,88 @@
+"""Cached, pre-rendered level catalog for the level endpoints.
+
+Levels only change when ``create_levels`` runs or an admin edits one, yet
+every dashboard load used to query and re-serialize all of them (including
+both reading texts). The rendered JSON bytes and their ETag are cached
+under a catalog version, so a hit does no ORM or serializer work.
+
+The version is a random token stored in the cache and replaced whenever a
+``Level`` is saved or deleted (see ``AppConfig.ready``); entries of older
+versions are simply never read again and expire. ``QuerySet.update()`` and
+raw SQL bypass the signals, so call ``bump_catalog_version()`` after those.
+
+With the default local-memory cache each process keeps its own version, so
+changes made by another process (``create_levels``) show up after
+``LEVEL_CATALOG_TTL``; configure ``CACHE_REDIS_URL`` to share entries and
+version bumps immediately.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+
+from .models import Level
+from .renderers import FastJSONRenderer
+from .serializers import LevelSerializer
+
+
+CATALOG_VERSION_KEY = 'levels:version'
+
+
+def catalog_version() -> str:
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # add() so concurrent first requests agree on one version
+        cache.add(CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version(**kwargs):
+    """Invalidate every cached catalog entry (also a signal receiver)."""
+    cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def _render(data) -> tuple:
+    body = FastJSONRenderer().render(data)
+    return '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest(), body
+
+
+def level_list_entry() -> tuple:
+    """``(etag, body)`` for all levels in id order."""
+    key = 'levels:%s:list' % catalog_version()
+    entry = cache.get(key)
+    if entry is None:
+        levels = Level.objects.all().order_by('id')
+        entry = _render(LevelSerializer(levels, many=True).data)
+        cache.set(key, entry, settings.LEVEL_CATALOG_TTL)
+    return entry
+
+
+def level_detail_entry(pk: int):
+    """``(etag, body)`` for one level, or None if it does not exist."""
+    key = 'levels:%s:%d' % (catalog_version(), pk)
+    entry = cache.get(key)
+    if entry is None:
+        level = Level.objects.filter(pk=pk).first()
+        if level is None:
+            return None
+        entry = _render(LevelSerializer(level).data)
+        cache.set(key, entry, settings.LEVEL_CATALOG_TTL)
+    return entry
+
+
+def catalog_response(request, entry) -> HttpResponse:
+    """JSON response for a cached entry, or 304 if the client's copy matches."""
+    etag, body = entry
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if etag in (tag.strip() for tag in if_none_match.split(',')) or if_none_match.strip() == '*':
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    # Per-user (authenticated) data: browsers may keep it, shared caches not
+    response['Cache-Control'] = 'private, max-age=%d, must-revalidate' % settings.LEVEL_CATALOG_MAX_AGE
+    response['Vary'] = 'Authorization'
+    return response
@@ -0,0 +1,79 @@
+"""Batched feedback persistence shared by the bulk and internal endpoints.
+
+``save_feedback_batch`` stores any number of attempts, possibly for several
+users, with a fixed number of queries: one level and one user lookup, then
+in one transaction one bulk insert, one XP update per user, one completion
+insert and one aggregate update per (user, level) touched.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .authentication import user_cache
+from .models import CustomUser, Feedback, Level, LevelCompletion
+from .progress import SCORE_FIELDS, record_attempts
+
+
+def xp_for_scores(scores) -> int:
+    """XP earned by an attempt: ten times its average score."""
+    return int(round(sum(scores) / 4.0 * 10))
+
+
+def save_feedback_batch(entries) -> list:
+    """Persist validated attempts and return one result per entry.
+
+    ``entries`` is a list of ``(user_id, data)`` where ``data`` is the
+    ``validated_data`` of a ``FeedbackItemSerializer``. Results are
+    ``{'status': 'created', 'id', 'xp_earned'}`` or ``{'status': 'error',
+    'errors'}`` for attempts on unknown levels or users.
+    """
+    known_levels = set(
+        Level.objects.filter(id__in={data['level_id'] for _, data in entries}).values_list('id', flat=True)
+    )
+    known_users = set(
+        CustomUser.objects.filter(id__in={user_id for user_id, _ in entries}).values_list('id', flat=True)
+    )
+    now = timezone.now()
+    results = [None] * len(entries)
+    pending = []
+    for position, (user_id, data) in enumerate(entries):
+        if data['level_id'] not in known_levels:
+            results[position] = {'status': 'error', 'errors': {'level_id': ['Level not found']}}
+            continue
+        if user_id not in known_users:
+            results[position] = {'status': 'error', 'errors': {'user_id': ['User not found']}}
+            continue
+        scores = {name: data[name] for name in SCORE_FIELDS}
+        feedback = Feedback(
+            user_id=user_id,
+            level_id=data['level_id'],
+            transcript=data['transcript'],
+            feedback_text=data['feedback_text'],
+            created_at=data.get('created_at') or now,
+            **scores,
+        )
+        pending.append((position, feedback, xp_for_scores(scores.values())))
+    if not pending:
+        return results
+
+    xp_by_user = {}
+    for _, feedback, xp in pending:
+        xp_by_user[feedback.user_id] = xp_by_user.get(feedback.user_id, 0) + xp
+
+    with transaction.atomic():
+        created = Feedback.objects.bulk_create([feedback for _, feedback, _ in pending])
+        for user_id, xp in xp_by_user.items():
+            CustomUser.objects.filter(pk=user_id).update(xp=F('xp') + xp)
+        LevelCompletion.objects.bulk_create(
+            [
+                LevelCompletion(user_id=user_id, level_id=level_id)
+                for user_id, level_id in {(feedback.user_id, feedback.level_id) for feedback in created}
+            ],
+            ignore_conflicts=True,
+        )
+        record_attempts(created)
+    user_cache.discard(*xp_by_user)
+
+    for position, feedback, xp in pending:
+        results[position] = {'status': 'created', 'id': feedback.id, 'xp_earned': xp}
+    return results
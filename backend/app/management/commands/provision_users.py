@@ -0,0 +1,132 @@
+import csv
+import json
+import os
+import sys
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+
+from app.models import CustomUser
+from app.provisioning import password_pool, provision_users
+
+
+FIELDS = ('email', 'username', 'password', 'first_name', 'last_name', 'language')
+USERNAME_FIELD = CustomUser._meta.get_field('username')
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line number, row dict)`` from a CSV (with header) or JSONL stream."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_num, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_num, {'_error': f'invalid JSON ({e})'}
+            continue
+        yield line_num, row if isinstance(row, dict) else {'_error': 'expected a JSON object'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Create users in bulk from a CSV (header row) or JSONL file with the fields '
+        'email (required), username, password, first_name, last_name and language. '
+        'Rows without a username get one derived from the email, rows without a '
+        'password an unusable one.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file, or '-' for stdin")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Default: from the file extension')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count() or 1,
+            help='Password hashing processes (default: one per CPU, 1 hashes in-process)',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        if path == '-':
+            stream = sys.stdin
+        else:
+            try:
+                stream = open(path, newline='', encoding='utf-8-sig')
+            except OSError as e:
+                raise CommandError(f'Cannot open {path}: {e}')
+
+        self.created = self.skipped = 0
+        pool = password_pool(options['processes'])
+        try:
+            batch, seen = [], {'email': set(), 'username': set()}
+            for line_num, row in read_rows(stream, fmt):
+                row = self.clean_row(line_num, row, seen)
+                if row is None:
+                    continue
+                batch.append((line_num, row))
+                if len(batch) >= options['batch_size']:
+                    self.flush(batch, pool)
+                    batch = []
+            if batch:
+                self.flush(batch, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            if stream is not sys.stdin:
+                stream.close()
+
+        self.stdout.write(self.style.SUCCESS(f'Created {self.created} users, skipped {self.skipped} rows'))
+
+    def skip(self, line_num, reason):
+        self.skipped += 1
+        self.stderr.write(f'line {line_num}: {reason}')
+
+    def clean_row(self, line_num, row, seen):
+        """The row's known fields as strings, or None if it is invalid."""
+        if '_error' in row:
+            return self.skip(line_num, row['_error'])
+        # Passwords are kept verbatim, other fields stripped
+        row = {name: str(row.get(name) or '') for name in FIELDS}
+        row.update((name, value.strip()) for name, value in row.items() if name != 'password')
+        try:
+            validate_email(row['email'])
+        except ValidationError:
+            return self.skip(line_num, f"invalid email {row['email']!r}")
+        if row['username']:
+            try:
+                USERNAME_FIELD.run_validators(row['username'])
+            except ValidationError as e:
+                return self.skip(line_num, f"invalid username {row['username']!r} ({' '.join(e.messages)})")
+        for name in ('email', 'username'):
+            if row[name] and row[name] in seen[name]:
+                return self.skip(line_num, f'duplicate {name} {row[name]} in input')
+        for name in ('email', 'username'):
+            seen[name].add(row[name])
+        return row
+
+    def flush(self, batch, pool):
+        existing = set(
+            CustomUser.objects.filter(email__in=[row['email'] for _, row in batch]).values_list('email', flat=True)
+        )
+        taken = set(
+            CustomUser.objects.filter(
+                username__in=[row['username'] for _, row in batch if row['username']]
+            ).values_list('username', flat=True)
+        )
+        rows = []
+        for line_num, row in batch:
+            if row['email'] in existing:
+                self.skip(line_num, f"{row['email']} is already registered")
+            elif row['username'] in taken:
+                self.skip(line_num, f"username {row['username']} is taken")
+            else:
+                rows.append(row)
+        if rows:
+            self.created += len(provision_users(rows, pool))
+            self.stdout.write(f'{self.created} users created...')
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.progress import rebuild_level_progress
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-user, per-level progress aggregates from all saved feedback'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = rebuild_level_progress()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} level progress rows'))
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_customuser_language'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='feedback_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['user', 'level', '-created_at', '-id'], name='feedback_user_level_idx'),
+        ),
+    ]
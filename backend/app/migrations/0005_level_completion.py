@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def copy_completed_levels(apps, schema_editor):
+    """Move each user's completed_levels JSON list into LevelCompletion rows."""
+    CustomUser = apps.get_model('app', 'CustomUser')
+    Level = apps.get_model('app', 'Level')
+    LevelCompletion = apps.get_model('app', 'LevelCompletion')
+
+    level_ids = set(Level.objects.values_list('id', flat=True))
+    rows = []
+    users = CustomUser.objects.exclude(completed_levels=[]).values_list('id', 'completed_levels')
+    for user_id, completed in users.iterator(chunk_size=1000):
+        for level_id in set(completed or []):
+            # Lists may hold stale ids (deleted levels) or strings
+            try:
+                level_id = int(level_id)
+            except (TypeError, ValueError):
+                continue
+            if level_id in level_ids:
+                rows.append(LevelCompletion(user_id=user_id, level_id=level_id))
+        if len(rows) >= 5000:
+            LevelCompletion.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    LevelCompletion.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def restore_completed_levels(apps, schema_editor):
+    CustomUser = apps.get_model('app', 'CustomUser')
+    LevelCompletion = apps.get_model('app', 'LevelCompletion')
+
+    completed = {}
+    for user_id, level_id in LevelCompletion.objects.order_by('completed_at', 'id').values_list('user_id', 'level_id'):
+        completed.setdefault(user_id, []).append(level_id)
+    users = list(CustomUser.objects.filter(id__in=completed))
+    for user in users:
+        user.completed_levels = completed[user.id]
+    CustomUser.objects.bulk_update(users, ['completed_levels'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_feedback_history_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LevelCompletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('level', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.level')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='level_completions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='levelcompletion',
+            constraint=models.UniqueConstraint(fields=('user', 'level'), name='unique_level_completion'),
+        ),
+        migrations.RunPython(copy_completed_levels, restore_completed_levels),
+        migrations.RemoveField(
+            model_name='customuser',
+            name='completed_levels',
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Frozen copy of app.progress.rebuild_sql as of this migration: the live
+# module follows today's models, this has to match the schema right here.
+SCORE_FIELDS = ('grammar_score', 'vocabulary_score', 'fluency_score', 'topic_relevance_score')
+
+
+def build_level_progress(apps, schema_editor):
+    LevelProgress = apps.get_model('app', 'LevelProgress')
+    Feedback = apps.get_model('app', 'Feedback')
+    quote = schema_editor.connection.ops.quote_name
+
+    def progress_column(name):
+        return quote(LevelProgress._meta.get_field(name).column)
+
+    def feedback_column(name):
+        return quote(Feedback._meta.get_field(name).column)
+
+    user, level, created_at = feedback_column('user'), feedback_column('level'), feedback_column('created_at')
+    columns = [progress_column(name) for name in ('user', 'level', 'attempts', 'last_attempt_at')]
+    inner = [
+        f'f.{user} AS user_id', f'f.{level} AS level_id', 'COUNT(*) AS attempts',
+        f'MAX(f.{created_at}) AS last_attempt_at',
+    ]
+    outer = ['a.user_id', 'a.level_id', 'a.attempts', 'a.last_attempt_at']
+    for name in SCORE_FIELDS:
+        columns += [progress_column(f'best_{name}'), progress_column(f'avg_{name}'), progress_column(f'last_{name}')]
+        score = feedback_column(name)
+        inner += [f'MAX(f.{score}) AS best_{name}', f'AVG(f.{score}) AS avg_{name}']
+        outer += [f'a.best_{name}', f'a.avg_{name}', f'l.{score}']
+    feedback, pk = quote(Feedback._meta.db_table), feedback_column('id')
+    schema_editor.execute(f"""
+        INSERT INTO {quote(LevelProgress._meta.db_table)} ({', '.join(columns)})
+        SELECT {', '.join(outer)}
+        FROM (
+            SELECT {', '.join(inner)},
+                (SELECT x.{pk} FROM {feedback} x
+                 WHERE x.{user} = f.{user} AND x.{level} = f.{level}
+                 ORDER BY x.{created_at} DESC, x.{pk} DESC LIMIT 1) AS last_id
+            FROM {feedback} f
+            GROUP BY f.{user}, f.{level}
+        ) a
+        JOIN {feedback} l ON l.{pk} = a.last_id
+    """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_level_completion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LevelProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.IntegerField(default=0)),
+                ('best_grammar_score', models.FloatField(default=0.0)),
+                ('best_vocabulary_score', models.FloatField(default=0.0)),
+                ('best_fluency_score', models.FloatField(default=0.0)),
+                ('best_topic_relevance_score', models.FloatField(default=0.0)),
+                ('last_grammar_score', models.FloatField(default=0.0)),
+                ('last_vocabulary_score', models.FloatField(default=0.0)),
+                ('last_fluency_score', models.FloatField(default=0.0)),
+                ('last_topic_relevance_score', models.FloatField(default=0.0)),
+                ('avg_grammar_score', models.FloatField(default=0.0)),
+                ('avg_vocabulary_score', models.FloatField(default=0.0)),
+                ('avg_fluency_score', models.FloatField(default=0.0)),
+                ('avg_topic_relevance_score', models.FloatField(default=0.0)),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('level', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.level')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='level_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='levelprogress',
+            constraint=models.UniqueConstraint(fields=('user', 'level'), name='unique_level_progress'),
+        ),
+        migrations.RunPython(build_level_progress, migrations.RunPython.noop),
+    ]
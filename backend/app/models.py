@@ -9,7 +9,6 @@ class CustomUser(AbstractUser):
     # Use email as unique identifier in practice; keep username for compatibility
     email = models.EmailField(unique=True)
     xp = models.IntegerField(default=0)
-    completed_levels = models.JSONField(default=list)
     # Preferred language for the user ('English' or 'German')
     language = models.CharField(max_length=20, default='English')
 
@@ -38,5 +37,67 @@ class Feedback(models.Model):
     feedback_text = models.TextField(blank=True)
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # Feedback history views (newest first, keyset paginated)
+            models.Index(fields=['user', '-created_at', '-id'], name='feedback_user_created_idx'),
+            models.Index(fields=['user', 'level', '-created_at', '-id'], name='feedback_user_level_idx'),
+        ]
+
     def __str__(self):
         return f"Feedback {self.id} by {self.user.email} for Level {self.level.id}"
+
+
+class LevelCompletion(models.Model):
+    """A level the user has completed (at least one saved attempt)."""
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='level_completions')
+    level = models.ForeignKey(Level, on_delete=models.CASCADE, related_name='+')
+    completed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            # Also the index for "levels completed by this user"
+            models.UniqueConstraint(fields=['user', 'level'], name='unique_level_completion'),
+        ]
+
+    def __str__(self):
+        return f"Level {self.level_id} completed by user {self.user_id}"
+
+
+class LevelProgress(models.Model):
+    """Per-user, per-level aggregate of Feedback, maintained by progress.py.
+
+    One row per (user, level) attempted, so progress dashboards read
+    O(levels) rows instead of scanning every attempt.
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='level_progress')
+    level = models.ForeignKey(Level, on_delete=models.CASCADE, related_name='+')
+    attempts = models.IntegerField(default=0)
+    best_grammar_score = models.FloatField(default=0.0)
+    best_vocabulary_score = models.FloatField(default=0.0)
+    best_fluency_score = models.FloatField(default=0.0)
+    best_topic_relevance_score = models.FloatField(default=0.0)
+    last_grammar_score = models.FloatField(default=0.0)
+    last_vocabulary_score = models.FloatField(default=0.0)
+    last_fluency_score = models.FloatField(default=0.0)
+    last_topic_relevance_score = models.FloatField(default=0.0)
+    avg_grammar_score = models.FloatField(default=0.0)
+    avg_vocabulary_score = models.FloatField(default=0.0)
+    avg_fluency_score = models.FloatField(default=0.0)
+    avg_topic_relevance_score = models.FloatField(default=0.0)
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'level'], name='unique_level_progress'),
+        ]
+
+    def __str__(self):
+        return f"Progress of user {self.user_id} on level {self.level_id}"
+
+
+def completed_level_ids(user_id) -> list:
+    """Ids of the levels the user has completed (one index-only query)."""
+    return list(
+        LevelCompletion.objects.filter(user_id=user_id).order_by('level_id').values_list('level_id', flat=True)
+    )
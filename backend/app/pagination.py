@@ -0,0 +1,78 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class FeedbackCursorPagination(CursorPagination):
+    """Keyset pagination for feedback histories, newest first.
+
+    Opt-in: requests without ``cursor`` or ``page_size`` still get the full
+    history as a plain list, which is what the current frontend expects.
+    Paginated pages come back as ``{"next", "previous", "results"}`` and each
+    one is a bounded scan of the (user[, level], created_at, id) index.
+
+    DRF's cursor only holds ``created_at`` and falls back to an offset when
+    rows share a timestamp (as a bulk-ingested batch does). Here the cursor
+    position is the whole ``(created_at, id)`` key, which is unique, so pages
+    are always found with a keyset filter and never with an offset.
+    """
+
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        current_position = self.cursor.position if self.cursor is not None else None
+
+        if reverse:
+            queryset = queryset.order_by('created_at', 'id')
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            created_at, pk = self.parse_position(current_position)
+            # Forward pages continue with older rows, reversed (previous) pages
+            # with newer ones. The non-strict bound on created_at alone keeps
+            # the OR from turning the index range scan into a filter.
+            if reverse:
+                queryset = queryset.filter(created_at__gte=created_at).filter(Q(created_at__gt=created_at) | Q(id__gt=pk))
+            else:
+                queryset = queryset.filter(created_at__lte=created_at).filter(Q(created_at__lt=created_at) | Q(id__lt=pk))
+
+        # One extra row tells whether another page follows
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > self.page_size:
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = True, current_position
+            self.has_previous, self.previous_position = following_position is not None, following_position
+        else:
+            self.has_next, self.next_position = following_position is not None, following_position
+            self.has_previous, self.previous_position = current_position is not None, current_position
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def parse_position(self, position):
+        created_at, _, pk = position.rpartition('|')
+        created_at = parse_datetime(created_at)
+        if created_at is None or not pk.isdigit():
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, int(pk)
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            return f"{instance['created_at'].isoformat()}|{instance['id']}"
+        return f'{instance.created_at.isoformat()}|{instance.id}'
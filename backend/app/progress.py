@@ -0,0 +1,104 @@
+"""Maintenance of the per-user, per-level ``LevelProgress`` aggregates.
+
+``record_attempts`` folds new Feedback rows into their aggregates with an
+idempotent insert and one UPDATE of database-side expressions per level,
+so it is safe under concurrent submissions and runs inside the caller's
+transaction. ``rebuild_level_progress`` recomputes every aggregate from
+Feedback with one set-based INSERT ... SELECT (manage.py rebuild_progress).
+"""
+from django.db import connection
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest
+
+from .models import Feedback, LevelProgress
+
+
+SCORE_FIELDS = ('grammar_score', 'vocabulary_score', 'fluency_score', 'topic_relevance_score')
+
+
+def record_attempts(feedbacks):
+    """Fold new Feedback rows into their users' per-level aggregates.
+
+    Rows are grouped per (user, level) and each group is merged with one
+    UPDATE, so a bulk submission costs one statement per level touched.
+    Offline submissions may be older than what is stored; last_* only move
+    to the batch's newest attempt if it is the newest overall.
+    """
+    groups = {}
+    for feedback in feedbacks:
+        groups.setdefault((feedback.user_id, feedback.level_id), []).append(feedback)
+    if not groups:
+        return
+
+    LevelProgress.objects.bulk_create(
+        [LevelProgress(user_id=user_id, level_id=level_id) for user_id, level_id in groups],
+        ignore_conflicts=True,
+    )
+    for (user_id, level_id), group in groups.items():
+        # Ties go to the later row, matching the rebuild's (created_at, id) order
+        latest = max(reversed(group), key=lambda feedback: feedback.created_at)
+        is_latest = Q(last_attempt_at__isnull=True) | Q(last_attempt_at__lte=latest.created_at)
+        count = len(group)
+        # Right-hand sides see the row as it was before this UPDATE
+        updates = {
+            'attempts': F('attempts') + count,
+            'last_attempt_at': Case(When(is_latest, then=Value(latest.created_at)), default=F('last_attempt_at')),
+        }
+        for name in SCORE_FIELDS:
+            # float(): an int score would make the expressions mix field types
+            scores = [float(getattr(feedback, name)) for feedback in group]
+            updates[f'best_{name}'] = Greatest(F(f'best_{name}'), Value(max(scores)))
+            updates[f'last_{name}'] = Case(
+                When(is_latest, then=Value(float(getattr(latest, name)))), default=F(f'last_{name}'),
+            )
+            updates[f'avg_{name}'] = (F(f'avg_{name}') * F('attempts') + sum(scores)) / (F('attempts') + count)
+        LevelProgress.objects.filter(user_id=user_id, level_id=level_id).update(**updates)
+
+
+def record_attempt(feedback: Feedback):
+    """Add ``feedback`` to the aggregate of its user and level."""
+    record_attempts([feedback])
+
+
+def rebuild_sql(progress_table: str, feedback_table: str) -> str:
+    """INSERT ... SELECT recomputing all aggregates from Feedback.
+
+    One GROUP BY pass computes counts, maxima and averages; the latest
+    attempt of each group is found through the (user, level, created_at, id)
+    index and joined back for the last_* scores.
+    """
+    quote = connection.ops.quote_name
+    progress, feedback = quote(progress_table), quote(feedback_table)
+    columns = ['user_id', 'level_id', 'attempts', 'last_attempt_at']
+    inner = ['f.user_id', 'f.level_id', 'COUNT(*) AS attempts', 'MAX(f.created_at) AS last_attempt_at']
+    outer = ['a.user_id', 'a.level_id', 'a.attempts', 'a.last_attempt_at']
+    for name in SCORE_FIELDS:
+        columns += [f'best_{name}', f'avg_{name}', f'last_{name}']
+        inner += [f'MAX(f.{name}) AS best_{name}', f'AVG(f.{name}) AS avg_{name}']
+        outer += [f'a.best_{name}', f'a.avg_{name}', f'l.{name}']
+    return f"""
+        INSERT INTO {progress} ({', '.join(columns)})
+        SELECT {', '.join(outer)}
+        FROM (
+            SELECT {', '.join(inner)},
+                (SELECT x.id FROM {feedback} x
+                 WHERE x.user_id = f.user_id AND x.level_id = f.level_id
+                 ORDER BY x.created_at DESC, x.id DESC LIMIT 1) AS last_id
+            FROM {feedback} f
+            GROUP BY f.user_id, f.level_id
+        ) a
+        JOIN {feedback} l ON l.id = a.last_id
+    """
+
+
+def rebuild_level_progress() -> int:
+    """Replace all aggregates with ones recomputed from Feedback; returns the row count.
+
+    Run inside a transaction so readers never see the table empty.
+    Migrations must not call this (it follows the current schema); 0006
+    keeps its own frozen copy of the SQL.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {connection.ops.quote_name(LevelProgress._meta.db_table)}')
+        cursor.execute(rebuild_sql(LevelProgress._meta.db_table, Feedback._meta.db_table))
+        return cursor.rowcount
@@ -0,0 +1,126 @@
+"""Username allocation and batched user creation (signup and provision_users).
+
+Usernames are derived as at signup (the given username, else the email's
+local part) and made unique with the lowest free numeric suffix (``john``,
+``john1``, ``john2``, ...). ``allocate_usernames`` finds every taken name
+of a whole batch with one prefix query and allocates the rest in memory,
+instead of one existence query per collision. ``provision_users`` keeps
+explicit usernames as given; the caller skips rows whose name is taken.
+
+Password hashing is deliberately slow (PBKDF2), so ``provision_users``
+hashes a batch in a process pool before inserting it with ``bulk_create``.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from operator import or_
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Q
+
+from .models import CustomUser
+
+
+USERNAME_MAX_LENGTH = CustomUser._meta.get_field('username').max_length
+
+
+def base_username(email: str, username: str = '') -> str:
+    return (username or email.split('@')[0])[:USERNAME_MAX_LENGTH]
+
+
+def _assign_usernames(bases, taken) -> tuple:
+    """Usernames for ``bases`` avoiding ``taken``, and the prefixes they were built on."""
+    taken = set(taken)
+    counters = {}
+    prefixes = set()
+    usernames = []
+    for base in bases:
+        username = base
+        while username in taken:
+            counters[base] = counters.get(base, 0) + 1
+            suffix = str(counters[base])
+            prefix = base[:USERNAME_MAX_LENGTH - len(suffix)]
+            prefixes.add(prefix)
+            username = prefix + suffix
+        taken.add(username)
+        usernames.append(username)
+    return usernames, prefixes
+
+
+def allocate_usernames(bases, reserved=()) -> list:
+    """One unique username per entry of ``bases``, in order, also avoiding ``reserved``.
+
+    Every existing name a base could collide with starts with that base,
+    except when the base is close to max_length and a suffix truncates it
+    (``xxx...x`` becomes ``xxx...1``): such shorter prefixes are loaded
+    with a second query and the allocation is redone, so that case costs
+    one extra query rather than an IntegrityError for the whole batch.
+
+    Names are only reserved in memory: concurrent signups can still race for
+    the same name, which the unique index turns into an IntegrityError.
+    """
+    if not bases:
+        return []
+    taken = set(reserved)
+    queried = set()
+    prefixes = set(bases)
+    while True:
+        missing = prefixes - queried
+        if missing:
+            query = reduce(or_, (Q(username__startswith=prefix) for prefix in missing))
+            taken.update(CustomUser.objects.filter(query).values_list('username', flat=True))
+            queried |= missing
+        usernames, prefixes = _assign_usernames(bases, taken)
+        if prefixes <= queried:
+            return usernames
+
+
+def _setup_hash_worker():
+    # Spawned (non-forked) workers start without configured settings
+    import django
+    django.setup()
+
+
+def hash_passwords(passwords, pool=None) -> list:
+    """``make_password`` for each password (None gives an unusable password)."""
+    if pool is None:
+        return [make_password(password) for password in passwords]
+    return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // 32)))
+
+
+def password_pool(processes: int):
+    """Process pool for ``hash_passwords``, or None to hash in this process."""
+    if processes <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=processes, initializer=_setup_hash_worker)
+
+
+def provision_users(rows, pool=None) -> list:
+    """Create users from validated ``rows`` and return them.
+
+    Each row is a dict with ``email`` and optionally ``username``,
+    ``password``, ``first_name``, ``last_name`` and ``language``. Emails and
+    given usernames must already be checked to be unique (given usernames
+    are used as they are); the others are allocated from the email. The
+    batch is inserted in one transaction with one username query and one
+    ``bulk_create``.
+    """
+    given = [row['username'] for row in rows if row.get('username')]
+    allocated = iter(allocate_usernames(
+        [base_username(row['email']) for row in rows if not row.get('username')], reserved=given,
+    ))
+    usernames = [row.get('username') or next(allocated) for row in rows]
+    passwords = hash_passwords([row.get('password') or None for row in rows], pool)
+    users = [
+        CustomUser(
+            username=username,
+            email=row['email'],
+            password=password,
+            first_name=row.get('first_name', ''),
+            last_name=row.get('last_name', ''),
+            language=row.get('language') or 'English',
+        )
+        for row, username, password in zip(rows, usernames, passwords)
+    ]
+    with transaction.atomic():
+        return CustomUser.objects.bulk_create(users)
@@ -0,0 +1,25 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON renderer that uses orjson when it is installed.
+
+    Level lists and feedback histories are the largest payloads the API
+    returns; orjson encodes them several times faster than the stdlib. Types
+    orjson does not know (Decimal, lazy translation strings, ...) go through
+    DRF's own encoder. Without orjson, or when the client asks for indented
+    output, this behaves exactly like ``JSONRenderer``.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=JSONEncoder().default, option=orjson.OPT_NON_STR_KEYS)
@@ -1,8 +1,14 @@
 from rest_framework import serializers
-from .models import CustomUser, Level, Feedback
+from .models import CustomUser, Level, Feedback, LevelProgress, completed_level_ids
+from .provisioning import allocate_usernames, base_username
 
 
 class UserSerializer(serializers.ModelSerializer):
+    completed_levels = serializers.SerializerMethodField()
+
+    def get_completed_levels(self, user):
+        return completed_level_ids(user.pk)
+
     class Meta:
         model = CustomUser
         fields = ['id', 'username', 'email', 'xp', 'completed_levels', 'first_name', 'last_name', 'language']
@@ -23,17 +29,9 @@ class SignupSerializer(serializers.ModelSerializer):
         return value
 
     def create(self, validated_data):
-        # Generate username from email if not provided
-        username = validated_data.get('username') or validated_data['email'].split('@')[0]
-        
-        # Ensure username is unique
-        base_username = username
-        counter = 1
-        while CustomUser.objects.filter(username=username).exists():
-            username = f"{base_username}{counter}"
-            counter += 1
-        
-        user = CustomUser.objects.create(
+        # Username from email if not provided, made unique with one query
+        username = allocate_usernames([base_username(validated_data['email'], validated_data.get('username', ''))])[0]
+        user = CustomUser(
             username=username,
             email=validated_data['email'],
             first_name=validated_data.get('first_name', ''),
@@ -52,7 +50,40 @@ class LevelSerializer(serializers.ModelSerializer):
 
 
 class FeedbackSerializer(serializers.ModelSerializer):
+    # Large text columns that history lists may leave out (``?omit=``)
+    OMITTABLE_FIELDS = ('transcript', 'feedback_text')
+
+    def __init__(self, *args, omit=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in omit:
+            self.fields.pop(name, None)
+
     class Meta:
         model = Feedback
         fields = ['id', 'user', 'level', 'transcript', 'grammar_score', 'vocabulary_score', 'fluency_score', 'topic_relevance_score', 'feedback_text', 'created_at']
         read_only_fields = ['id', 'created_at']
+
+
+class LevelProgressSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LevelProgress
+        exclude = ['id', 'user']
+
+
+class FeedbackItemSerializer(serializers.Serializer):
+    """One attempt in a bulk feedback submission (see BulkSaveFeedbackView)."""
+    level_id = serializers.IntegerField()
+    transcript = serializers.CharField(required=False, allow_blank=True, default='')
+    grammar_score = serializers.FloatField(required=False, default=0.0)
+    vocabulary_score = serializers.FloatField(required=False, default=0.0)
+    fluency_score = serializers.FloatField(required=False, default=0.0)
+    topic_relevance_score = serializers.FloatField(required=False, default=0.0)
+    feedback_text = serializers.CharField(required=False, allow_blank=True, default='')
+    # When the attempt was made (offline clients); defaults to now
+    created_at = serializers.DateTimeField(required=False)
+
+
+class InternalFeedbackItemSerializer(FeedbackItemSerializer):
+    """Bulk item sent by the AI service on behalf of a user."""
+    # Checked against the database for the whole batch in save_feedback_batch
+    user_id = serializers.IntegerField()
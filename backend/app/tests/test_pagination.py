@@ -0,0 +1,61 @@
+from base64 import b64decode, b64encode
+from urllib.parse import unquote
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app.models import CustomUser, Feedback, Level
+from app.views import get_tokens_for_user
+
+
+class FeedbackCursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('reader', 'reader@example.com', 'pw')
+        cls.level = Level.objects.create(topic='Travel')
+        # A bulk-ingested batch: every row has the same created_at
+        now = timezone.now()
+        Feedback.objects.bulk_create([Feedback(user=cls.user, level=cls.level, created_at=now) for _ in range(25)])
+        Feedback.objects.create(user=cls.user, level=cls.level, created_at=now - timezone.timedelta(days=1))
+        cls.newest_first = list(Feedback.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + get_tokens_for_user(self.user)['access'])
+
+    def walk(self, url, link):
+        ids, pages = [], []
+        while url:
+            page = self.client.get(url).json()
+            pages.append(page)
+            ids += [item['id'] for item in page['results']]
+            url = page[link]
+        return ids, pages
+
+    def test_pages_through_tied_timestamps_without_offsets(self):
+        ids, pages = self.walk('/api/user_feedback/?page_size=4', 'next')
+        self.assertEqual(ids, self.newest_first)
+        for page in pages[1:]:
+            cursor = page['previous'].split('cursor=')[1].split('&')[0]
+            self.assertNotIn('o=', self.decode(cursor))
+
+    def test_previous_links_walk_back(self):
+        _, pages = self.walk('/api/user_feedback/?page_size=4', 'next')
+        _, previous_pages = self.walk(pages[-1]['previous'], 'previous')
+        self.assertEqual(
+            [item['id'] for page in reversed(previous_pages) for item in page['results']],
+            self.newest_first[:24],
+        )
+
+    def test_without_pagination_params_returns_plain_list(self):
+        response = self.client.get('/api/user_feedback/')
+        self.assertEqual([item['id'] for item in response.json()], self.newest_first)
+
+    def test_invalid_cursor(self):
+        cursor = b64encode(b'p=yesterday').decode()
+        self.assertEqual(self.client.get(f'/api/user_feedback/?cursor={cursor}').status_code, 404)
+
+    @staticmethod
+    def decode(cursor):
+        return b64decode(unquote(cursor)).decode()
@@ -0,0 +1,72 @@
+import random
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from app.models import CustomUser, Feedback, Level, LevelProgress
+from app.progress import SCORE_FIELDS, record_attempt, record_attempts
+
+
+def snapshot():
+    """Every aggregate, keyed by (user, level), with floats rounded."""
+    rows = {}
+    for progress in LevelProgress.objects.all():
+        values = {}
+        for field in LevelProgress._meta.concrete_fields:
+            if field.name in ('id', 'user', 'level'):
+                continue
+            value = getattr(progress, field.attname)
+            values[field.name] = round(value, 9) if isinstance(value, float) else value
+        rows[progress.user_id, progress.level_id] = values
+    return rows
+
+
+class LevelProgressTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [CustomUser.objects.create(username=f'user{i}', email=f'user{i}@example.com') for i in range(2)]
+        cls.levels = [Level.objects.create(topic=f'Topic {i}') for i in range(3)]
+
+    def feedback(self, rng, created_at):
+        return Feedback(
+            user=rng.choice(self.users),
+            level=rng.choice(self.levels),
+            created_at=created_at,
+            **{name: round(rng.uniform(1, 10), 2) for name in SCORE_FIELDS},
+        )
+
+    def test_incremental_updates_match_rebuild(self):
+        rng = random.Random(7)
+        start = timezone.now()
+        for batch in range(6):
+            # Offline submissions arrive out of order, and batches share timestamps
+            feedbacks = [
+                self.feedback(rng, start + timedelta(minutes=rng.choice([-30, 0, 0, batch, 60])))
+                for _ in range(rng.randint(1, 8))
+            ]
+            record_attempts(Feedback.objects.bulk_create(feedbacks))
+        single = self.feedback(rng, start - timedelta(days=1))
+        single.save()
+        record_attempt(single)
+
+        incremental = snapshot()
+        call_command('rebuild_progress', stdout=StringIO())
+        self.assertEqual(incremental, snapshot())
+
+    def test_older_attempt_does_not_replace_last_scores(self):
+        user, level = self.users[0], self.levels[0]
+        now = timezone.now()
+        newer = Feedback.objects.create(user=user, level=level, created_at=now, grammar_score=4)
+        record_attempt(newer)
+        older = Feedback.objects.create(user=user, level=level, created_at=now - timedelta(hours=1), grammar_score=9)
+        record_attempt(older)
+
+        progress = LevelProgress.objects.get(user=user, level=level)
+        self.assertEqual(progress.attempts, 2)
+        self.assertEqual(progress.last_grammar_score, 4)
+        self.assertEqual(progress.best_grammar_score, 9)
+        self.assertEqual(progress.avg_grammar_score, 6.5)
+        self.assertEqual(progress.last_attempt_at, now)
@@ -0,0 +1,54 @@
+from io import StringIO
+from tempfile import NamedTemporaryFile
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from app.models import CustomUser
+from app.provisioning import USERNAME_MAX_LENGTH, allocate_usernames
+
+
+class AllocateUsernamesTests(TestCase):
+    def test_lowest_free_suffix(self):
+        CustomUser.objects.create(username='john', email='john@example.com')
+        CustomUser.objects.create(username='john2', email='john2@example.com')
+        with self.assertNumQueries(1):
+            self.assertEqual(allocate_usernames(['john', 'john', 'john', 'amy']), ['john1', 'john3', 'john4', 'amy'])
+
+    def test_truncated_candidates_avoid_taken_names(self):
+        base = 'x' * USERNAME_MAX_LENGTH
+        CustomUser.objects.create(username=base, email='a@example.com')
+        CustomUser.objects.create(username=base[:-1] + '1', email='b@example.com')
+        usernames = allocate_usernames([base, base])
+        self.assertEqual(usernames, [base[:-1] + '2', base[:-1] + '3'])
+
+    def test_reserved_names_are_avoided(self):
+        self.assertEqual(allocate_usernames(['john'], reserved=['john']), ['john1'])
+
+
+class ProvisionUsersCommandTests(TestCase):
+    def provision(self, csv):
+        with NamedTemporaryFile('w', suffix='.csv') as f:
+            f.write(csv)
+            f.flush()
+            out, err = StringIO(), StringIO()
+            call_command('provision_users', f.name, processes=1, stdout=out, stderr=err)
+        return err.getvalue()
+
+    def test_taken_username_is_skipped_not_renamed(self):
+        CustomUser.objects.create(username='john', email='old@example.com')
+        errors = self.provision('email,username\nnew@example.com,john\njohn@example.com,\n')
+        self.assertIn('line 2: username john is taken', errors)
+        self.assertFalse(CustomUser.objects.filter(email='new@example.com').exists())
+        self.assertEqual(CustomUser.objects.get(email='john@example.com').username, 'john1')
+
+    def test_given_usernames_win_over_derived_ones(self):
+        self.provision('email,username\nann@example.com,\nother@example.com,ann\n')
+        self.assertEqual(CustomUser.objects.get(email='other@example.com').username, 'ann')
+        self.assertEqual(CustomUser.objects.get(email='ann@example.com').username, 'ann1')
+
+    def test_invalid_and_duplicate_usernames_are_skipped(self):
+        errors = self.provision('email,username\na@example.com,bad name\nb@example.com,bob\nc@example.com,bob\n')
+        self.assertIn("line 2: invalid username 'bad name'", errors)
+        self.assertIn('line 4: duplicate username bob in input', errors)
+        self.assertEqual(CustomUser.objects.count(), 1)
@@ -7,7 +7,10 @@ urlpatterns = [
     path('levels/', views.LevelListView.as_view(), name='levels'),
     path('levels/<int:pk>/', views.LevelDetailView.as_view(), name='level-detail'),
     path('save_feedback/', views.SaveFeedbackView.as_view(), name='save-feedback'),
+    path('save_feedback/bulk/', views.BulkSaveFeedbackView.as_view(), name='save-feedback-bulk'),
+    path('internal/feedback/', views.InternalFeedbackIngestView.as_view(), name='internal-feedback'),
     path('user_progress/', views.UserProgressView.as_view(), name='user-progress'),
+    path('progress_summary/', views.ProgressSummaryView.as_view(), name='progress-summary'),
     path('user_feedback/', views.UserFeedbackView.as_view(), name='user-feedback'),
     path('feedback/<int:level_id>/', views.FeedbackByLevelView.as_view(), name='feedback-by-level'),
 ]
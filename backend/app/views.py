@@ -1,10 +1,22 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions, generics
+from django.conf import settings
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
-from .models import CustomUser, Level, Feedback
-from .serializers import UserSerializer, SignupSerializer, LevelSerializer, FeedbackSerializer
+from django.db import transaction
+from django.db.models import F
+from django.utils.crypto import constant_time_compare
+from django.http import Http404
+from .authentication import ClaimsJWTAuthentication, ClaimsRefreshToken, user_cache
+from .catalog import catalog_response, level_detail_entry, level_list_entry
+from .ingest import save_feedback_batch, xp_for_scores
+from .models import CustomUser, Level, Feedback, LevelCompletion, LevelProgress, completed_level_ids
+from .pagination import FeedbackCursorPagination
+from .progress import SCORE_FIELDS, record_attempt
+from .serializers import (
+    UserSerializer, SignupSerializer, LevelSerializer, FeedbackSerializer, FeedbackItemSerializer,
+    InternalFeedbackItemSerializer, LevelProgressSerializer,
+)
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 
@@ -20,7 +32,7 @@ def health_check(request):
     })
 
 def get_tokens_for_user(user):
-    refresh = RefreshToken.for_user(user)
+    refresh = ClaimsRefreshToken.for_user(user)
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
@@ -64,22 +76,32 @@ class LoginView(APIView):
 
 
 class LevelListView(generics.ListAPIView):
+    """All levels, served from the cached catalog (see catalog.py) with ETag/304."""
     queryset = Level.objects.all().order_by('id')
     serializer_class = LevelSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     
     def list(self, request, *args, **kwargs):
         try:
-            return super().list(request, *args, **kwargs)
+            return catalog_response(request, level_list_entry())
         except Exception as e:
             return Response({'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 class LevelDetailView(generics.RetrieveAPIView):
+    """One level, served from the cached catalog (see catalog.py) with ETag/304."""
     queryset = Level.objects.all()
     serializer_class = LevelSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
+    def retrieve(self, request, *args, **kwargs):
+        entry = level_detail_entry(self.kwargs['pk'])
+        if entry is None:
+            raise Http404
+        return catalog_response(request, entry)
+
 
 class SaveFeedbackView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -88,57 +110,165 @@ class SaveFeedbackView(APIView):
         data = request.data
         user = request.user
         try:
-            level = Level.objects.get(id=int(data.get('level_id')))
+            level = Level.objects.only('id').get(id=int(data.get('level_id')))
         except Level.DoesNotExist:
             return Response({'detail': 'Level not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        feedback = Feedback.objects.create(
-            user=user,
-            level=level,
-            transcript=data.get('transcript', ''),
-            grammar_score=float(data.get('grammar_score', 0)),
-            vocabulary_score=float(data.get('vocabulary_score', 0)),
-            fluency_score=float(data.get('fluency_score', 0)),
-            topic_relevance_score=float(data.get('topic_relevance_score', 0)),
-            feedback_text=data.get('feedback_text', ''),
-        )
+        scores = {name: float(data.get(name, 0)) for name in SCORE_FIELDS}
+        xp_earned = xp_for_scores(scores.values())
 
-        # Update user XP and completed levels
-        avg = (feedback.grammar_score + feedback.vocabulary_score + feedback.fluency_score + feedback.topic_relevance_score) / 4.0
-        xp_earned = int(round(avg * 10))
-        user.xp = (user.xp or 0) + xp_earned
-        completed = user.completed_levels or []
-        if level.id not in completed:
-            completed.append(level.id)
-        user.completed_levels = completed
-        user.save()
+        # XP is incremented in the database and completion is an idempotent
+        # insert, so concurrent submissions cannot overwrite each other
+        with transaction.atomic():
+            feedback = Feedback.objects.create(
+                user=user,
+                level=level,
+                transcript=data.get('transcript', ''),
+                feedback_text=data.get('feedback_text', ''),
+                **scores,
+            )
+            CustomUser.objects.filter(pk=user.pk).update(xp=F('xp') + xp_earned)
+            LevelCompletion.objects.bulk_create([LevelCompletion(user=user, level=level)], ignore_conflicts=True)
+            record_attempt(feedback)
+        user_cache.discard(user.pk)
 
         return Response({'detail': 'Feedback saved', 'xp_earned': xp_earned}, status=status.HTTP_201_CREATED)
 
 
+def _feedback_items(data):
+    """The item list of a batch request body, or an error Response."""
+    items = data.get('items') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return Response({'detail': 'Expected a non-empty list of items'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > settings.BULK_FEEDBACK_MAX_ITEMS:
+        return Response(
+            {'detail': f'At most {settings.BULK_FEEDBACK_MAX_ITEMS} items per request'},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+    return items
+
+
+def _ingest(items, serializer_class, user_id=None) -> Response:
+    """Validate ``items``, save the valid ones in one batch and report per item."""
+    results = [None] * len(items)
+    entries, positions = [], []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            data = serializer.validated_data
+            entries.append((user_id if user_id is not None else data['user_id'], data))
+            positions.append(index)
+        else:
+            results[index] = {'status': 'error', 'errors': serializer.errors}
+    if entries:
+        for index, result in zip(positions, save_feedback_batch(entries)):
+            results[index] = result
+
+    for index, result in enumerate(results):
+        result['index'] = index
+    saved = [result for result in results if result['status'] == 'created']
+    return Response(
+        {'saved': len(saved), 'xp_earned': sum(result['xp_earned'] for result in saved), 'results': results},
+        status=status.HTTP_201_CREATED if saved else status.HTTP_400_BAD_REQUEST,
+    )
+
+
+class BulkSaveFeedbackView(APIView):
+    """Save many attempts at once (offline clients, migration tooling).
+
+    Accepts ``{"items": [...]}`` (or a bare list) of SaveFeedbackView-style
+    items, optionally with ``created_at``. Valid items are stored with a
+    fixed number of queries regardless of batch size (see ingest.py);
+    invalid items are reported and skipped.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        items = _feedback_items(request.data)
+        if isinstance(items, Response):
+            return items
+        return _ingest(items, FeedbackItemSerializer, user_id=request.user.pk)
+
+
+class InternalFeedbackIngestView(APIView):
+    """Batched feedback from the AI service's queue workers (service-to-service).
+
+    Items are bulk items plus the ``user_id`` the worker verified from the
+    user's JWT when the job was queued. Authenticated by the shared
+    ``INTERNAL_API_TOKEN`` in ``X-Internal-Token``; disabled when unset.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        token = settings.INTERNAL_API_TOKEN
+        if not token or not constant_time_compare(request.headers.get('X-Internal-Token', ''), token):
+            return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+        items = _feedback_items(request.data)
+        if isinstance(items, Response):
+            return items
+        return _ingest(items, InternalFeedbackItemSerializer)
+
+
 class UserProgressView(APIView):
+    """XP (from the cached user) and completed levels; no per-request user query."""
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         user = request.user
         return Response({
             'xp': user.xp or 0,
-            'completed_levels': user.completed_levels or [],
+            'completed_levels': completed_level_ids(user.pk),
         })
 
 
-class FeedbackByLevelView(generics.ListAPIView):
-    serializer_class = FeedbackSerializer
+class ProgressSummaryView(APIView):
+    """XP, completed levels and per-level aggregates (one row per attempted level)."""
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
-    def get_queryset(self):
-        level_id = self.kwargs.get('level_id')
-        return Feedback.objects.filter(level_id=level_id, user=self.request.user).order_by('-created_at')
+    def get(self, request):
+        user = request.user
+        levels = LevelProgress.objects.filter(user_id=user.pk).order_by('level_id')
+        return Response({
+            'xp': user.xp or 0,
+            'completed_levels': completed_level_ids(user.pk),
+            'levels': LevelProgressSerializer(levels, many=True).data,
+        })
+
 
+class FeedbackHistoryMixin:
+    """Shared behaviour of the feedback history lists.
 
-class UserFeedbackView(generics.ListAPIView):
+    ``?cursor=``/``?page_size=`` switch to keyset pagination (see
+    pagination.py) and ``?omit=transcript,feedback_text`` leaves those
+    columns out of both the query and the response.
+    """
     serializer_class = FeedbackSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedbackCursorPagination
+
+    def omitted_fields(self):
+        requested = self.request.query_params.get('omit', '')
+        return [name for name in requested.split(',') if name in FeedbackSerializer.OMITTABLE_FIELDS]
+
+    def history_queryset(self, **filters):
+        queryset = Feedback.objects.filter(user_id=self.request.user.pk, **filters).order_by('-created_at', '-id')
+        omit = self.omitted_fields()
+        return queryset.defer(*omit) if omit else queryset
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('omit', self.omitted_fields())
+        return super().get_serializer(*args, **kwargs)
+
+
+class FeedbackByLevelView(FeedbackHistoryMixin, generics.ListAPIView):
+    def get_queryset(self):
+        return self.history_queryset(level_id=self.kwargs.get('level_id'))
+
 
+class UserFeedbackView(FeedbackHistoryMixin, generics.ListAPIView):
     def get_queryset(self):
-        return Feedback.objects.filter(user=self.request.user).order_by('-created_at')
+        return self.history_queryset()
@@ -107,6 +107,32 @@ CONN_MAX_AGE = int(config('CONN_MAX_AGE', default='600'))
 for db in DATABASES.values():
     db.setdefault('CONN_MAX_AGE', CONN_MAX_AGE)
 
+# -------------------------------------------------------------------
+# CACHE
+# -------------------------------------------------------------------
+
+# Local memory per process by default; point CACHE_REDIS_URL at Redis to
+# share cached data (e.g. the level catalog) between workers
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 1000},
+        }
+    }
+
+# Level catalog (app/catalog.py): cache entry lifetime and client max-age
+LEVEL_CATALOG_TTL = int(config('LEVEL_CATALOG_TTL', default='300'))
+LEVEL_CATALOG_MAX_AGE = int(config('LEVEL_CATALOG_MAX_AGE', default='0'))
+
 # -------------------------------------------------------------------
 # AUTH & USER MODEL
 # -------------------------------------------------------------------
@@ -180,11 +206,13 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'if-none-match',
 ]
 
 CORS_EXPOSE_HEADERS = [
     'content-type',
     'x-csrftoken',
+    'etag',
 ]
 
 # -------------------------------------------------------------------
@@ -195,8 +223,29 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # orjson-backed JSON (falls back to the stdlib codec if orjson is missing)
+    'DEFAULT_RENDERER_CLASSES': (
+        'app.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'app.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
+# Largest batch accepted by POST /api/save_feedback/bulk/ and internal/feedback/
+BULK_FEEDBACK_MAX_ITEMS = int(config('BULK_FEEDBACK_MAX_ITEMS', default='1000'))
+
+# Shared secret for service-to-service calls from the AI service's workers
+# (POST /api/internal/feedback/); empty disables them
+INTERNAL_API_TOKEN = config('INTERNAL_API_TOKEN', default='')
+
+# Per-process user cache behind ClaimsJWTAuthentication (app/authentication.py)
+AUTH_USER_CACHE_TTL = float(config('AUTH_USER_CACHE_TTL', default='10'))
+AUTH_USER_CACHE_SIZE = int(config('AUTH_USER_CACHE_SIZE', default='1024'))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
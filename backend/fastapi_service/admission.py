@@ -0,0 +1,180 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from prometheus_client import Counter, Gauge
+from starlette.exceptions import HTTPException
+
+from . import jsonlib
+from .logs import get_logger
+
+
+log = get_logger('admission')
+
+
+ADMISSION_WAIT_TIMEOUT = float(os.getenv('ADMISSION_WAIT_TIMEOUT', '15'))
+
+PROVIDER_IN_FLIGHT = Gauge(
+    's2s_provider_in_flight',
+    'Provider calls currently holding an admission slot',
+    ['provider'],
+    multiprocess_mode='livesum',
+)
+PROVIDER_QUEUE_DEPTH = Gauge(
+    's2s_provider_queue_depth',
+    'Requests waiting for a provider admission slot',
+    ['provider'],
+    multiprocess_mode='livesum',
+)
+ADMISSION_REJECTED = Counter(
+    's2s_admission_rejected_total',
+    'Requests shed by admission control',
+    ['provider', 'reason'],
+)
+
+
+class Overloaded(HTTPException):
+    """A provider has no capacity left; rendered as 429/503 with Retry-After."""
+
+    def __init__(self, provider: str, status_code: int, retry_after: int):
+        super().__init__(
+            status_code=status_code,
+            detail=f'{provider} is busy, please retry in {retry_after}s',
+            headers={'Retry-After': str(retry_after)},
+        )
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """Concurrency limit for one upstream provider, with a bounded wait queue.
+
+    Up to ``max_concurrent`` callers hold a slot at once; the next
+    ``max_waiting`` wait in FIFO order for at most ``wait_timeout`` seconds.
+    Anyone beyond that is refused immediately with 429, and a waiter whose
+    deadline passes gets 503, both carrying a Retry-After estimated from
+    recent slot hold times. Failing fast keeps a spike from piling up
+    recordings in memory and timing out every request at once.
+
+    Counters and futures are used instead of an ``asyncio.Semaphore`` so the
+    limiter is not tied to one event loop (plain RQ workers run each job on
+    a fresh loop).
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_waiting: int, wait_timeout: float = ADMISSION_WAIT_TIMEOUT):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.in_flight = 0
+        self._waiters = deque()
+        # Smoothed seconds a slot is held, for Retry-After estimates
+        self._avg_hold = 1.0
+        self._update_metrics()
+
+    @property
+    def saturated(self) -> bool:
+        """True when a new caller would be refused outright."""
+        return self.in_flight >= self.max_concurrent and len(self._waiters) >= self.max_waiting
+
+    def retry_after(self) -> int:
+        estimate = self._avg_hold * (len(self._waiters) + 1) / max(1, self.max_concurrent)
+        return int(min(60, max(1, math.ceil(estimate))))
+
+    def reject(self, reason: str, status_code: int) -> Overloaded:
+        ADMISSION_REJECTED.labels(provider=self.name, reason=reason).inc()
+        log.warning("%s: %s (%d in flight, %d waiting)", self.name, reason, self.in_flight, len(self._waiters))
+        return Overloaded(self.name, status_code, self.retry_after())
+
+    def _update_metrics(self):
+        PROVIDER_IN_FLIGHT.labels(provider=self.name).set(self.in_flight)
+        PROVIDER_QUEUE_DEPTH.labels(provider=self.name).set(len(self._waiters))
+
+    async def acquire(self):
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            self._update_metrics()
+            return
+        if len(self._waiters) >= self.max_waiting:
+            raise self.reject('queue_full', 429)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_metrics()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.wait_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+                self._update_metrics()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self.reject('wait_timeout', 503)
+
+    def release(self):
+        # Hand the slot straight to the oldest waiter so nobody can barge in
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_metrics()
+                return
+        self.in_flight -= 1
+        self._update_metrics()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * (time.monotonic() - started)
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            'in_flight': self.in_flight,
+            'waiting': len(self._waiters),
+            'max_concurrent': self.max_concurrent,
+            'max_waiting': self.max_waiting,
+        }
+
+
+class LoadSheddingMiddleware:
+    """Answer 429 before reading the body when the limiter is saturated.
+
+    Without this an overloaded service would still spool every incoming
+    recording to memory/disk only to refuse it afterwards.
+    """
+
+    def __init__(self, app, limiter: AdmissionLimiter, paths=()):
+        self.app = app
+        self.limiter = limiter
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] not in self.paths or not self.limiter.saturated:
+            await self.app(scope, receive, send)
+            return
+
+        error = self.limiter.reject('shed', 429)
+        body = jsonlib.dumps({'detail': error.detail}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': error.status_code,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', str(error.retry_after).encode()),
+                (b'connection', b'close'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,16 @@
+#!/usr/bin/env bash
+# Start the FastAPI AI service (run from backend/)
+set -e
+
+PORT=${PORT:-8001}
+API_WORKERS=${API_WORKERS:-1}
+
+# /metrics merges every process writing to this directory, including RQ
+# workers that share it (see metrics.py). Files are named after host and
+# pid; drop this host's leftovers from the previous run
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+	mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+	rm -f "$PROMETHEUS_MULTIPROC_DIR"/*_"${HOSTNAME//_/-}"-*.db
+fi
+
+exec uvicorn fastapi_service.main:app --host 0.0.0.0 --port "$PORT" --workers "$API_WORKERS" --timeout-keep-alive 180
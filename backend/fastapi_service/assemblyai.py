@@ -0,0 +1,63 @@
+from .http_pool import PooledClient, env_float, stage_timeout
+
+
+ASSEMBLYAI_BASE_URL = 'https://api.assemblyai.com/v2'
+ASSEMBLYAI_UPLOAD_TIMEOUT = env_float('ASSEMBLYAI_UPLOAD_TIMEOUT', 120.0)
+ASSEMBLYAI_REQUEST_TIMEOUT = env_float('ASSEMBLYAI_REQUEST_TIMEOUT', 15.0)
+ASSEMBLYAI_POLL_TIMEOUT = env_float('ASSEMBLYAI_POLL_TIMEOUT', 10.0)
+WEBHOOK_AUTH_HEADER = 'X-Fluento-Webhook-Secret'
+
+
+class AssemblyAIProvider(PooledClient):
+    """Async client for the AssemblyAI upload and transcript endpoints.
+
+    Each stage gets its own timeout: uploads may legitimately take a while for
+    long recordings, while transcript creation and status polls are small
+    JSON calls that should fail fast.
+    """
+
+    def __init__(self, api_key: str):
+        super().__init__(ASSEMBLYAI_BASE_URL, headers={'authorization': api_key}, timeout=ASSEMBLYAI_REQUEST_TIMEOUT)
+        self.api_key = api_key
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    async def upload(self, content) -> str:
+        """Upload raw audio and return the URL AssemblyAI stored it under."""
+        resp = await self.client.post('/upload', content=content, timeout=stage_timeout(ASSEMBLYAI_UPLOAD_TIMEOUT))
+        resp.raise_for_status()
+        upload_json = resp.json()
+        return upload_json.get('upload_url') or upload_json.get('url')
+
+    async def create_transcript(
+        self,
+        audio_url: str,
+        webhook_url: str = '',
+        webhook_secret: str = '',
+        max_seconds: float = None,
+    ) -> str:
+        """Start a transcription job and return its id.
+
+        With ``webhook_url`` AssemblyAI POSTs ``{"transcript_id", "status"}``
+        there once the job finishes; ``webhook_secret`` is sent back in the
+        WEBHOOK_AUTH_HEADER so the receiver can reject forged callbacks.
+        ``max_seconds`` stops transcription at that point of the recording.
+        """
+        body = {'audio_url': audio_url}
+        if max_seconds:
+            body['audio_end_at'] = int(max_seconds * 1000)
+        if webhook_url:
+            body['webhook_url'] = webhook_url
+            if webhook_secret:
+                body['webhook_auth_header_name'] = WEBHOOK_AUTH_HEADER
+                body['webhook_auth_header_value'] = webhook_secret
+        resp = await self.client.post('/transcript', json=body)
+        resp.raise_for_status()
+        return resp.json().get('id')
+
+    async def get_transcript(self, transcript_id: str) -> dict:
+        resp = await self.client.get(f'/transcript/{transcript_id}', timeout=stage_timeout(ASSEMBLYAI_POLL_TIMEOUT))
+        resp.raise_for_status()
+        return resp.json()
@@ -0,0 +1,38 @@
+import os
+from typing import Optional
+
+import jwt
+from starlette.exceptions import HTTPException
+
+
+# Django (simplejwt) signs access tokens with its SECRET_KEY unless
+# SIMPLE_JWT['SIGNING_KEY'] says otherwise
+JWT_SIGNING_KEY = os.getenv('JWT_SIGNING_KEY') or os.getenv('DJANGO_SECRET_KEY', '')
+JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
+
+
+class InvalidToken(HTTPException):
+    """Missing, malformed, expired or forged access token; rendered as 401."""
+
+    def __init__(self, detail: str = 'Invalid or expired access token'):
+        super().__init__(status_code=401, detail=detail, headers={'WWW-Authenticate': 'Bearer'})
+
+
+def user_id_from_authorization(authorization: Optional[str]) -> int:
+    """Verify a Django-issued ``Bearer`` access token and return its user id.
+
+    Only the signature and claims are checked; the user row is not looked
+    up here (Django validates it again when the result is saved).
+    """
+    if not JWT_SIGNING_KEY:
+        raise HTTPException(status_code=503, detail='Token verification is not configured')
+    scheme, _, token = (authorization or '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        raise InvalidToken('Authorization: Bearer <access token> is required')
+    try:
+        claims = jwt.decode(token, JWT_SIGNING_KEY, algorithms=[JWT_ALGORITHM])
+        if claims.get('token_type') != 'access':
+            raise InvalidToken()
+        return int(claims['user_id'])
+    except (jwt.PyJWTError, KeyError, TypeError, ValueError):
+        raise InvalidToken()
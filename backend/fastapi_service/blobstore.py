@@ -0,0 +1,200 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from .logs import get_logger
+from .redis_pool import redis_conn
+from .uploads import UPLOAD_CHUNK_SIZE
+
+
+log = get_logger('blobs')
+
+
+# Directory shared by the API and every worker (same host or a shared
+# volume). Unset, recordings go through Redis instead (see RedisBlobStore).
+AUDIO_BLOB_DIR = os.getenv('AUDIO_BLOB_DIR', '')
+AUDIO_BLOB_TTL = int(os.getenv('AUDIO_BLOB_TTL', str(6 * 60 * 60)))
+AUDIO_BLOB_GC_INTERVAL = int(os.getenv('AUDIO_BLOB_GC_INTERVAL', str(10 * 60)))
+AUDIO_BLOB_REDIS_MAX_BYTES = int(os.getenv('AUDIO_BLOB_REDIS_MAX_BYTES', str(8 * 1024 * 1024)))
+
+
+class BlobNotFound(Exception):
+    """Raised when a blob reference has expired or was never stored here."""
+
+
+class BlobTooLarge(Exception):
+    """Raised when a recording is larger than the store accepts."""
+
+    def __init__(self, size: int, max_bytes: int):
+        super().__init__(
+            f'Recording is {size} bytes; at most {max_bytes} can be queued without a shared AUDIO_BLOB_DIR'
+        )
+
+
+def check_ref(ref: str):
+    if len(ref) != 64 or not all(c in '0123456789abcdef' for c in ref):
+        raise BlobNotFound(ref)
+
+
+class BlobStore:
+    """Content-addressed on-disk store for uploaded audio.
+
+    Blobs are written once under ``<root>/<sha256[:2]>/<sha256>`` and the
+    sha256 is the reference handed to RQ jobs, so Redis only ever carries a
+    64-character string regardless of recording length. Workers read blobs
+    through read-only memory maps instead of copying them onto the heap.
+    Files older than ``ttl`` seconds are removed by ``gc()``, which ``put``
+    triggers at most every ``gc_interval`` seconds.
+
+    The API and the workers must see the same ``AUDIO_BLOB_DIR`` (same host
+    or a shared volume); without one, use ``RedisBlobStore``.
+    """
+
+    def __init__(self, root: str, ttl: int, gc_interval: int = AUDIO_BLOB_GC_INTERVAL):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.gc_interval = gc_interval
+        self._last_gc = 0.0
+
+    def path(self, ref: str) -> Path:
+        check_ref(ref)
+        return self.root / ref[:2] / ref
+
+    def put_file(self, fileobj) -> str:
+        """Copy a binary file object into the store in chunks; return its ref."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                fileobj.seek(0)
+                while True:
+                    chunk = fileobj.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+            ref = digest.hexdigest()
+            target = self.path(ref)
+            target.parent.mkdir(exist_ok=True)
+            if target.exists():
+                # Same audio already stored: refresh its TTL instead of rewriting
+                os.utime(target)
+                os.unlink(tmp_path)
+            else:
+                os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.maybe_gc()
+        return ref
+
+    def put_bytes(self, data: bytes) -> str:
+        ref = hashlib.sha256(data).hexdigest()
+        target = self.path(ref)
+        if target.exists():
+            os.utime(target)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix='.upload-')
+            with os.fdopen(fd, 'wb') as out:
+                out.write(data)
+            os.replace(tmp_path, target)
+        self.maybe_gc()
+        return ref
+
+    @contextmanager
+    def open(self, ref: str):
+        """Yield a read-only memory map of the blob."""
+        try:
+            f = open(self.path(ref), 'rb')
+        except FileNotFoundError:
+            raise BlobNotFound(ref)
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                yield view
+
+    def maybe_gc(self):
+        if time.monotonic() - self._last_gc >= self.gc_interval:
+            self.gc()
+
+    def gc(self) -> int:
+        """Delete blobs (and stale partial uploads) older than the TTL."""
+        self._last_gc = time.monotonic()
+        if not self.root.exists():
+            return 0
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for path in self.root.glob('**/*'):
+            try:
+                if path.is_file() and path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        if removed:
+            log.info("Removed %d expired audio blobs", removed)
+        return removed
+
+
+class RedisBlobStore:
+    """Blob store for deployments where the API and workers share no disk.
+
+    Recordings are kept in Redis under ``audio_blob:<sha256>`` (expiring
+    after ``ttl`` seconds) and the job still only carries the sha256. Only
+    recordings up to ``max_bytes`` are accepted: larger ones raise
+    ``BlobTooLarge`` when the job is queued rather than filling Redis.
+    """
+
+    prefix = 'audio_blob:'
+
+    def __init__(self, redis, ttl: int, max_bytes: int = AUDIO_BLOB_REDIS_MAX_BYTES):
+        self.redis = redis
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    def key(self, ref: str) -> str:
+        check_ref(ref)
+        return self.prefix + ref
+
+    def put_file(self, fileobj) -> str:
+        size = fileobj.seek(0, os.SEEK_END)
+        if size > self.max_bytes:
+            raise BlobTooLarge(size, self.max_bytes)
+        fileobj.seek(0)
+        return self.put_bytes(fileobj.read())
+
+    def put_bytes(self, data: bytes) -> str:
+        if len(data) > self.max_bytes:
+            raise BlobTooLarge(len(data), self.max_bytes)
+        ref = hashlib.sha256(data).hexdigest()
+        self.redis.set(self.key(ref), data, ex=self.ttl)
+        return ref
+
+    @contextmanager
+    def open(self, ref: str):
+        data = self.redis.get(self.key(ref))
+        if data is None:
+            raise BlobNotFound(ref)
+        yield data
+
+    def maybe_gc(self):
+        pass
+
+    def gc(self) -> int:
+        # Redis expires blobs itself
+        return 0
+
+
+if AUDIO_BLOB_DIR:
+    blob_store = BlobStore(AUDIO_BLOB_DIR, AUDIO_BLOB_TTL)
+else:
+    blob_store = RedisBlobStore(redis_conn, AUDIO_BLOB_TTL)
@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from prometheus_client import Counter
+
+from . import jsonlib
+from .logs import get_logger
+
+
+log = get_logger('cache')
+
+
+CACHE_REQUESTS = Counter(
+    's2s_cache_requests_total',
+    'Cache lookups by cache name and outcome',
+    ['cache', 'result'],
+)
+
+
+def content_key(*parts) -> str:
+    """Stable sha256 over bytes or JSON-serializable parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, (bytes, bytearray, memoryview)):
+            part = json.dumps(part, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class TwoTierCache:
+    """In-process LRU in front of Redis, with single-flight computation.
+
+    Lookups go LRU -> Redis -> ``compute``. Concurrent callers asking for the
+    same key while it is being computed share one upstream call instead of
+    each hitting the provider. Only values accepted by ``should_store`` are
+    cached; a ``compute`` that raises propagates the error to every waiter
+    and caches nothing.
+
+    Redis is optional: with ``redis=None`` (or Redis unreachable) the cache
+    degrades to the local tier only.
+    """
+
+    def __init__(self, name: str, ttl: int, max_entries: int, redis=None):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.redis = redis
+        self._local = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _redis_key(self, key: str) -> str:
+        return f'cache:{self.name}:{key}'
+
+    def _record(self, result: str):
+        if result == 'miss':
+            self.misses += 1
+        else:
+            self.hits += 1
+        CACHE_REQUESTS.labels(cache=self.name, result=result).inc()
+
+    def _get_local(self, key: str):
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value, ttl: Optional[float] = None):
+        self._local[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def _get_redis(self, key: str):
+        if self.redis is None:
+            return None
+        try:
+            redis_key = self._redis_key(key)
+            raw, ttl = await asyncio.gather(self.redis.get(redis_key), self.redis.ttl(redis_key))
+        except Exception as e:
+            log.warning("Redis read failed for %s: %s", self.name, e)
+            return None
+        if raw is None:
+            return None
+        value = jsonlib.loads(raw)
+        # Promote into the local tier, but never past the Redis expiry
+        self._set_local(key, value, ttl if ttl and ttl > 0 else None)
+        return value
+
+    async def _set_redis(self, key: str, value):
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(self._redis_key(key), jsonlib.dumps(value), ex=self.ttl)
+        except Exception as e:
+            log.warning("Redis write failed for %s: %s", self.name, e)
+
+    async def get(self, key: str):
+        """Cached value for ``key`` (LRU, then Redis), or None."""
+        value = self._get_local(key)
+        if value is not None:
+            self._record('local_hit')
+            return value
+        value = await self._get_redis(key)
+        self._record('redis_hit' if value is not None else 'miss')
+        return value
+
+    async def set(self, key: str, value):
+        """Store a value computed outside ``get_or_compute`` (e.g. in bulk)."""
+        self._set_local(key, value)
+        await self._set_redis(key, value)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable],
+        should_store: Callable[[object], bool] = lambda value: value is not None,
+    ):
+        value = self._get_local(key)
+        if value is not None:
+            self._record('local_hit')
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._record('coalesced')
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(self._fill(key, compute, should_store))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so a disconnecting client does not cancel the call other
+        # waiters are sharing
+        return await asyncio.shield(task)
+
+    async def _fill(self, key: str, compute, should_store):
+        value = await self._get_redis(key)
+        if value is not None:
+            self._record('redis_hit')
+            return value
+
+        self._record('miss')
+        value = await compute()
+        if should_store(value):
+            self._set_local(key, value)
+            await self._set_redis(key, value)
+        return value
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'local_entries': len(self._local),
+            'inflight': len(self._inflight),
+        }
@@ -0,0 +1,31 @@
+"""Loads ``backend/.env`` into the environment.
+
+Several modules read their settings from ``os.environ`` at import time
+(REDIS_URL in redis_pool, LOG_* in logs, timeouts in http_pool, ...), so
+entry points (main, worker, tasks) import this module before any other
+``fastapi_service`` module. It then imports ``metrics``, which has to set
+up multiprocess mode before any other module defines a metric.
+"""
+import os
+from pathlib import Path
+
+
+ENV_FILE = Path(__file__).parent.parent / '.env'
+
+
+def load_env_file(path: Path = ENV_FILE):
+    if not path.exists():
+        return
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#') and '=' in line:
+                key, value = line.split('=', 1)
+                # Remove quotes if present
+                value = value.strip('"').strip("'")
+                os.environ[key.strip()] = value
+
+
+load_env_file()
+
+from . import metrics  # noqa: E402,F401
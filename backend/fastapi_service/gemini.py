@@ -0,0 +1,60 @@
+from .http_pool import PooledClient, env_float
+
+
+GEMINI_MODEL = 'gemini-2.5-flash'
+GEMINI_BASE_URL = 'https://generativelanguage.googleapis.com/v1beta'
+GEMINI_GENERATE_TIMEOUT = env_float('GEMINI_GENERATE_TIMEOUT', 30.0)
+
+
+class GeminiResponseError(Exception):
+    """Raised when Gemini answers without any usable text candidate."""
+
+
+class GeminiProvider(PooledClient):
+    """Async client for the Gemini generateContent REST endpoint.
+
+    This is the single Gemini implementation used by the service. It talks to
+    the REST API through a pooled httpx client so every call is awaited on
+    the event loop and never blocks other in-flight requests (the
+    google-generativeai SDK's ``generate_content`` is synchronous).
+    """
+
+    def __init__(self, api_key: str, model: str = GEMINI_MODEL, timeout: float = GEMINI_GENERATE_TIMEOUT):
+        super().__init__(GEMINI_BASE_URL, headers={'x-goog-api-key': api_key}, timeout=timeout)
+        self.api_key = api_key
+        self.model = model
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    @property
+    def path(self) -> str:
+        return f'/models/{self.model}:generateContent'
+
+    async def generate(self, prompt: str) -> str:
+        """Send a single-turn prompt and return the text of the first candidate."""
+        payload = {
+            "contents": [
+                {
+                    "parts": [
+                        {
+                            "text": prompt
+                        }
+                    ]
+                }
+            ]
+        }
+
+        response = await self.client.post(self.path, json=payload)
+        response.raise_for_status()
+        result = response.json()
+
+        candidates = result.get('candidates') or []
+        if candidates:
+            content = candidates[0].get('content') or {}
+            parts = content.get('parts') or []
+            if parts:
+                return parts[0].get('text', '{}')
+
+        raise GeminiResponseError(f'Unexpected Gemini response: {str(result)[:200]}')
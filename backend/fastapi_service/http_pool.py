@@ -0,0 +1,74 @@
+import os
+
+import httpx
+
+from .logs import get_logger
+
+
+log = get_logger('http')
+
+
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+
+def env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+# Keep-alive pool shared by every provider client. One uvicorn worker keeps a
+# handful of warm TLS connections per upstream host instead of a new
+# handshake per upload / poll / generate call.
+HTTP_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv('HTTP_MAX_CONNECTIONS', '100')),
+    max_keepalive_connections=int(os.getenv('HTTP_MAX_KEEPALIVE_CONNECTIONS', '20')),
+    keepalive_expiry=env_float('HTTP_KEEPALIVE_EXPIRY', 30.0),
+)
+HTTP2_ENABLED = os.getenv('HTTP2_ENABLED', 'False') == 'True'
+HTTP_CONNECT_TIMEOUT = env_float('HTTP_CONNECT_TIMEOUT', 5.0)
+
+
+def stage_timeout(seconds: float) -> httpx.Timeout:
+    """Timeout for one pipeline stage, with the shared connect/pool budget."""
+    return httpx.Timeout(seconds, connect=HTTP_CONNECT_TIMEOUT, pool=HTTP_CONNECT_TIMEOUT)
+
+
+class PooledClient:
+    """Lazily-created ``httpx.AsyncClient`` owned by one upstream provider.
+
+    The FastAPI lifespan opens the client at startup and closes it on
+    shutdown; code running outside the app (the RQ worker) gets one on first
+    use and must call ``aclose()`` before its event loop goes away.
+    """
+
+    def __init__(self, base_url: str, headers: dict = None, timeout: float = 30.0):
+        self.base_url = base_url
+        self.headers = headers or {}
+        self.timeout = timeout
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            http2 = HTTP2_ENABLED and H2_AVAILABLE
+            if HTTP2_ENABLED and not H2_AVAILABLE:
+                log.warning("HTTP2_ENABLED is set but the 'h2' package is missing, using HTTP/1.1")
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                limits=HTTP_LIMITS,
+                timeout=stage_timeout(self.timeout),
+                http2=http2,
+            )
+        return self._client
+
+    def open(self) -> httpx.AsyncClient:
+        return self.client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
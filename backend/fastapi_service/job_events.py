@@ -0,0 +1,163 @@
+import asyncio
+from typing import AsyncIterator, Optional
+
+from . import jsonlib
+from .logs import get_logger
+
+
+log = get_logger('jobs')
+
+
+STATE_KEY = 'job:state:{}'
+EVENTS_CHANNEL = 'job:events:{}'
+EVENTS_PATTERN = 'job:events:*'
+STATE_TTL = 60 * 60
+
+# queued -> uploading -> transcribing -> analyzing [-> saving] -> done | failed
+PROGRESS_STATES = ('queued', 'uploading', 'transcribing', 'analyzing', 'saving')
+TERMINAL_STATES = ('done', 'failed', 'not_found')
+
+
+def state_rank(event: dict) -> Optional[int]:
+    """Position of the event's state in the job lifecycle (None if unknown)."""
+    state = event.get('state')
+    if state in TERMINAL_STATES:
+        return len(PROGRESS_STATES)
+    if state in PROGRESS_STATES:
+        return PROGRESS_STATES.index(state)
+    return None
+
+
+async def publish_job_event(redis, job_id: str, state: str, **data):
+    """Record ``state`` as the job's latest state and push it to subscribers.
+
+    Publishing never fails the job: a missed event only means clients fall
+    back to the stored state or to /api/job_status/.
+    """
+    event = {'job_id': job_id, 'state': state, **data}
+    raw = jsonlib.dumps(event)
+    try:
+        await redis.set(STATE_KEY.format(job_id), raw, ex=STATE_TTL)
+        await redis.publish(EVENTS_CHANNEL.format(job_id), raw)
+    except Exception as e:
+        log.warning("Could not publish %s for %s: %s", state, job_id, e)
+
+
+class JobEventHub:
+    """Fans job state transitions out to SSE / WebSocket streams.
+
+    Like TranscriptWaiter, the process holds a single pattern subscription
+    and routes each ``job:events:<id>`` message to the local queues watching
+    that job, so open status streams do not each pin a Redis connection.
+    """
+
+    def __init__(self, redis):
+        self.redis = redis
+        self._subscribers = {}
+        self._pubsub = None
+        self._listener = None
+
+    async def start(self):
+        if self._listener is not None and not self._listener.done():
+            return
+        # The listener died (e.g. Redis dropped the connection): release its
+        # pub/sub connection before subscribing again
+        await self._close_pubsub()
+        self._pubsub = self.redis.pubsub()
+        await self._pubsub.psubscribe(EVENTS_PATTERN)
+        self._listener = asyncio.ensure_future(self._listen())
+
+    async def stop(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.cancel()
+        # Closing the connection also ends a listener that lost the
+        # cancellation inside a pub/sub read (it then stops on the error)
+        await self._close_pubsub()
+        if listener is not None:
+            try:
+                await listener
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def _close_pubsub(self):
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = None
+
+    async def _listen(self):
+        try:
+            while True:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None or message.get('type') != 'pmessage':
+                    continue
+                try:
+                    event = jsonlib.loads(message['data'])
+                except (TypeError, ValueError):
+                    continue
+                for queue in self._subscribers.get(event.get('job_id'), ()):
+                    queue.put_nowait(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if self._listener is not None:
+                # Not stop() closing the connection under us
+                log.warning("Pub/sub listener stopped: %s", e)
+
+    async def _current_state(self, job_id: str) -> Optional[dict]:
+        raw = await self.redis.get(STATE_KEY.format(job_id))
+        return jsonlib.loads(raw) if raw else None
+
+    async def stream(self, job_id: str, timeout: float, fallback=None) -> AsyncIterator[Optional[dict]]:
+        """Yield job events until a terminal state or ``timeout`` seconds.
+
+        The stored state is replayed first so late subscribers still see
+        where the job is. Events published while it was being read are both
+        stored and queued, so queued events that do not come after the last
+        one yielded (repeats, or older states arriving late) are dropped.
+        ``fallback`` (an async callable) supplies an event
+        for jobs that have no stored state, e.g. ones finished long ago.
+        ``None`` is yielded every 15s of silence so callers can keep the
+        connection alive.
+        """
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            await self.start()
+            current = await self._current_state(job_id)
+            if current is None and fallback is not None:
+                current = await fallback()
+            last_rank = None
+            if current is not None:
+                yield current
+                if current.get('state') in TERMINAL_STATES:
+                    return
+                last_rank = state_rank(current)
+
+            deadline = asyncio.get_running_loop().time() + timeout
+            while True:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    return
+                try:
+                    event = await asyncio.wait_for(queue.get(), min(15.0, remaining))
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                rank = state_rank(event)
+                if rank is not None and last_rank is not None and rank <= last_rank:
+                    continue
+                if rank is not None:
+                    last_rank = rank
+                yield event
+                if event.get('state') in TERMINAL_STATES:
+                    return
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
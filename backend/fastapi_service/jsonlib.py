@@ -0,0 +1,42 @@
+"""JSON codec for the AI service: orjson when installed, stdlib otherwise.
+
+orjson is several times faster at both encoding and decoding, which matters
+for the analysis payloads, cached values and event streams this service
+moves around. Everything keeps working without it.
+
+``content_key`` in cache.py deliberately keeps using the stdlib encoder so
+cache keys do not change with the codec.
+"""
+import json
+
+from fastapi.responses import JSONResponse as StdJSONResponse
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+    ORJSONResponse = None
+
+
+HAS_ORJSON = orjson is not None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so existing
+# ``except json.JSONDecodeError`` handlers catch errors from either codec
+JSONDecodeError = json.JSONDecodeError
+
+JSONResponse = ORJSONResponse if HAS_ORJSON else StdJSONResponse
+
+
+def loads(data):
+    """Parse JSON from str or bytes."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj) -> str:
+    """Serialize ``obj`` to a JSON string."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
@@ -0,0 +1,222 @@
+"""Local lexical scoring for free speaking.
+
+Used instead of Gemini when no API key is configured: a handful of cheap
+features (type-token ratio, word-frequency bands, sentence lengths, filler
+and repetition rates) are mapped onto the four score fields. The frequency
+tables in ``data/`` are loaded once at import time, and ``score_batch``
+computes every feature column for a whole batch of transcripts in one pass,
+so thousands of transcripts per second can be scored on a single core.
+"""
+import math
+import re
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+
+DATA_DIR = Path(__file__).parent / 'data'
+
+# Frequency bands by rank in a language's word list: core words, common
+# words, the rest of the list, and anything not on it
+BAND_LIMITS = (100, 300)
+BAND_COUNT = 4
+
+# Length of a list that covers everyday vocabulary, so that unlisted words
+# really are advanced. The bundled lists are far shorter (a few hundred
+# words each): many everyday words land in the "rare" band, so the bands'
+# weight in the vocabulary score is scaled by len(list) / FULL_LIST_WORDS
+# and grows back as longer lists are dropped into data/.
+FULL_LIST_WORDS = 5000
+
+WORD_RE = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+SENTENCE_RE = re.compile(r'[.!?]+')
+
+FILLERS = frozenset({'um', 'umm', 'uh', 'uhh', 'er', 'erm', 'ah', 'hmm', 'mm', 'äh', 'ähm', 'öh', 'hm'})
+FILLER_PAIRS = frozenset({('you', 'know'), ('i', 'mean'), ('sort', 'of'), ('kind', 'of')})
+
+# Prompt verbs in level topics that say nothing about the subject
+TOPIC_INSTRUCTIONS = frozenset({
+    'describe', 'talk', 'tell', 'introduce', 'explain', 'discuss', 'yourself', 'about',
+    'beschreibe', 'erzähle', 'erzähl', 'stell', 'stelle', 'dich', 'vor', 'über',
+})
+
+# Targets a confident learner answer roughly meets
+TARGET_WORDS = 60
+TARGET_SENTENCE_WORDS = (8, 20)
+
+
+def load_frequency_tables(data_dir: Path = DATA_DIR) -> Dict[str, Dict[str, int]]:
+    """Map ``<lang>_frequency.txt`` word lists to ``{word: band}`` tables."""
+    tables = {}
+    for path in sorted(data_dir.glob('*_frequency.txt')):
+        bands = {}
+        rank = 0
+        for line in path.read_text(encoding='utf-8').splitlines():
+            if line.startswith('#'):
+                continue
+            for word in line.split():
+                if word in bands:
+                    continue
+                bands[word] = sum(rank >= limit for limit in BAND_LIMITS)
+                rank += 1
+        tables[path.name.split('_', 1)[0]] = bands
+    return tables
+
+
+def _clamp(value: float, low: float = 0.0, high: float = 1.0) -> float:
+    return max(low, min(high, value))
+
+
+def _ramp(value: float, low: float, high: float) -> float:
+    """0 at ``low``, 1 at ``high``, linear in between."""
+    return _clamp((value - low) / (high - low))
+
+
+def _score(ratio: float) -> float:
+    return round(1 + 9 * _clamp(ratio), 1)
+
+
+def _stem(word: str) -> str:
+    return word[:5]
+
+
+class LexicalScorer:
+    """Feature-based scorer over precomputed frequency tables."""
+
+    def __init__(self, tables: Dict[str, Dict[str, int]]):
+        self.tables = tables
+        # Core (band 0) words of each language, used to guess the language
+        self._core = {lang: {w for w, band in bands.items() if band == 0} for lang, bands in tables.items()}
+
+    def _table_for(self, words: List[str]) -> Dict[str, int]:
+        if not self.tables:
+            return {}
+        lang = max(self._core, key=lambda lang: sum(w in self._core[lang] for w in words))
+        return self.tables[lang]
+
+    def features(self, transcripts: Sequence[str], topics: Sequence[str]) -> Dict[str, array]:
+        """Feature columns for a batch; index ``i`` belongs to ``transcripts[i]``."""
+        n = len(transcripts)
+        columns = {
+            name: array('d', bytes(8 * n))
+            for name in (
+                'words', 'ttr', 'guiraud', 'sentence_mean', 'sentence_std',
+                'filler_rate', 'repetition_rate', 'topic_coverage',
+                'band_core', 'band_common', 'band_listed', 'band_rare', 'band_weight',
+            )
+        }
+        band_columns = (columns['band_core'], columns['band_common'], columns['band_listed'], columns['band_rare'])
+
+        for i, (text, topic) in enumerate(zip(transcripts, topics)):
+            lowered = text.casefold()
+            words = [w.replace('’', "'") for w in WORD_RE.findall(lowered)]
+            count = len(words)
+            columns['words'][i] = count
+            if not count:
+                continue
+
+            types = len(set(words))
+            columns['ttr'][i] = types / count
+            columns['guiraud'][i] = types / math.sqrt(count)
+
+            table = self._table_for(words)
+            band_counts = [0] * BAND_COUNT
+            fillers = 0
+            repeats = 0
+            previous = None
+            for word in words:
+                band_counts[table.get(word, 3)] += 1
+                if word in FILLERS or (previous, word) in FILLER_PAIRS:
+                    fillers += 1
+                elif word == previous:
+                    repeats += 1
+                previous = word
+            for column, band_count in zip(band_columns, band_counts):
+                column[i] = band_count / count
+            columns['band_weight'][i] = min(1.0, len(table) / FULL_LIST_WORDS)
+            columns['filler_rate'][i] = fillers / count
+            columns['repetition_rate'][i] = repeats / count
+
+            lengths = [len(WORD_RE.findall(s)) for s in SENTENCE_RE.split(lowered)]
+            lengths = [length for length in lengths if length] or [count]
+            mean = sum(lengths) / len(lengths)
+            columns['sentence_mean'][i] = mean
+            columns['sentence_std'][i] = math.sqrt(sum((length - mean) ** 2 for length in lengths) / len(lengths))
+
+            # Content words of the topic ("Describe your hobby" -> hobby),
+            # matched on a short prefix so hobby/hobbies both count
+            topic_words = {
+                _stem(w) for w in WORD_RE.findall(topic.casefold())
+                if w not in TOPIC_INSTRUCTIONS and table.get(w, 3) > 0
+            }
+            if topic_words:
+                said = {_stem(w) for w in words}
+                columns['topic_coverage'][i] = len(topic_words & said) / len(topic_words)
+            else:
+                columns['topic_coverage'][i] = 1.0
+        return columns
+
+    def score_batch(self, transcripts: Sequence[str], topics: Optional[Sequence[str]] = None) -> List[dict]:
+        """Score many transcripts at once; returns one analysis dict per transcript."""
+        if topics is None:
+            topics = [''] * len(transcripts)
+        f = self.features(transcripts, topics)
+        low, high = TARGET_SENTENCE_WORDS
+        results = []
+        for i, transcript in enumerate(transcripts):
+            words = f['words'][i]
+            # Short answers cap every score at about half rather than zeroing it
+            length = 0.5 + 0.5 * _ramp(words, 5, TARGET_WORDS) if words else 0.0
+            fillers = f['filler_rate'][i]
+            repeats = f['repetition_rate'][i]
+            advanced = f['band_listed'][i] + f['band_rare'][i]
+            mean = f['sentence_mean'][i]
+
+            sentence_fit = 1.0 if low <= mean <= high else _clamp(mean / low if mean < low else high / mean)
+            variety = _ramp(f['sentence_std'][i], 0, 4)
+            grammar = length * (0.6 * sentence_fit + 0.2 * variety + 0.2 * _clamp(1 - 10 * repeats))
+            band_weight = 0.4 * f['band_weight'][i]
+            vocabulary = length * (
+                (1 - band_weight) * _ramp(f['guiraud'][i], 2.5, 7) + band_weight * _ramp(advanced, 0.1, 0.35)
+            )
+            fluency = length * _clamp(1 - 4 * fillers - 5 * repeats)
+            relevance = 0.4 + 0.6 * f['topic_coverage'][i] if words else 0.0
+
+            grammar_tips = []
+            if mean > high:
+                grammar_tips.append('Split long sentences into shorter ones to keep your grammar under control.')
+            elif mean < low and words:
+                grammar_tips.append('Join short ideas with words like "because", "and" or "but" to build fuller sentences.')
+            if words < TARGET_WORDS:
+                grammar_tips.append('Say a little more: add an example or a reason to each point.')
+
+            fluency_tips = []
+            if fillers > 0.03:
+                fluency_tips.append('Replace fillers like "um" and "uh" with a short pause.')
+            if repeats > 0.02:
+                fluency_tips.append('Try not to repeat words; slow down slightly and plan the next phrase.')
+            if advanced < 0.1 and words and f['band_weight'][i] >= 0.5:
+                fluency_tips.append('Use a few less common words to make your answer more specific.')
+
+            summary = (
+                f'Local analysis of {int(words)} words: '
+                f'{f["ttr"][i]:.0%} unique words, {advanced:.0%} beyond the most common vocabulary.'
+            )
+            results.append({
+                'grammar_score': _score(grammar),
+                'vocabulary_score': _score(vocabulary),
+                'fluency_score': _score(fluency),
+                'topic_relevance_score': _score(relevance),
+                'grammar_tips': grammar_tips[:2],
+                'fluency_tips': fluency_tips[:2],
+                'summary': summary,
+                'feedback': summary,
+                'transcript': transcript,
+            })
+        return results
+
+    def score(self, transcript: str, topic: str = '') -> dict:
+        return self.score_batch([transcript], [topic])[0]
+
+
+lexical_scorer = LexicalScorer(load_frequency_tables())
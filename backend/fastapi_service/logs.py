@@ -0,0 +1,157 @@
+"""Logging for the AI service and its RQ workers.
+
+Records are handed to a ``QueueHandler`` and written to stdout by a
+``QueueListener`` thread, so request handlers and jobs on the event loop
+never block on stdout and never pay for message formatting: messages use
+lazy ``%s`` arguments that are only rendered by the listener thread, and
+not at all for levels that are switched off.
+
+Settings:
+
+- ``LOG_LEVEL`` (default INFO); set DEBUG for every poll attempt and raw
+  provider answers.
+- ``LOG_FORMAT``: ``text`` (default, ``[TAG] message`` lines as before) or
+  ``json`` (one object per line, including any ``extra=`` fields).
+- ``LOG_POLL_EVERY`` (default 10): at INFO, only the first and every Nth
+  transcript poll attempt is logged.
+- ``LOG_TRANSCRIPTS``: ``truncate`` (default, first ``LOG_TRANSCRIPT_CHARS``
+  characters), ``redact`` (length only) or ``full``.
+"""
+import atexit
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+from . import jsonlib
+
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_POLL_EVERY = max(1, int(os.getenv('LOG_POLL_EVERY', '10')))
+LOG_TRANSCRIPTS = os.getenv('LOG_TRANSCRIPTS', 'truncate')
+LOG_TRANSCRIPT_CHARS = int(os.getenv('LOG_TRANSCRIPT_CHARS', '80'))
+
+ROOT_LOGGER = 's2s'
+
+# LogRecord attributes; anything else on a record came from ``extra=``
+_RECORD_FIELDS = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+def _tag(record: logging.LogRecord) -> str:
+    return record.name.rpartition('.')[2].upper()
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        record.tag = _tag(record)
+        return super().format(record)
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'tag': _tag(record),
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and key != 'tag':
+                entry[key] = value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return jsonlib.dumps(entry)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queue records as-is; the stock handler formats them in the caller."""
+
+    def prepare(self, record):
+        return record
+
+
+def _stream_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == 'json':
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(TextFormatter('%(asctime)s %(levelname)s [%(tag)s] %(message)s'))
+    return handler
+
+
+_listener = None
+
+
+def setup_logging():
+    """Route ``s2s.*`` loggers through a background writer thread (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+    records = queue.SimpleQueue()
+    _listener = QueueListener(records, _stream_handler(), respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(LOG_LEVEL)
+    root.handlers[:] = [_DeferredQueueHandler(records)]
+    root.propagate = False
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _after_fork_in_child():
+    # Stock `rq worker` forks a work horse per job and leaves it with
+    # os._exit(), so a writer thread there would die with unflushed records.
+    # The horse runs a single job; write directly.
+    global _listener
+    _listener = None
+    logging.getLogger(ROOT_LOGGER).handlers[:] = [_stream_handler()]
+
+
+def get_logger(tag: str) -> logging.Logger:
+    """Logger whose records are tagged ``[TAG]``, e.g. ``get_logger('gemini')``."""
+    return logging.getLogger(f'{ROOT_LOGGER}.{tag.lower()}')
+
+
+def poll_sampled(attempt: int) -> bool:
+    """Whether transcript poll ``attempt`` (1-based) should be logged at INFO."""
+    return attempt == 1 or attempt % LOG_POLL_EVERY == 0
+
+
+class _Preview:
+
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text or ''
+
+    def __str__(self):
+        if LOG_TRANSCRIPTS == 'full':
+            return self.text
+        if LOG_TRANSCRIPTS == 'redact':
+            return f'<{len(self.text)} chars>'
+        if len(self.text) <= LOG_TRANSCRIPT_CHARS:
+            return self.text
+        return self.text[:LOG_TRANSCRIPT_CHARS] + '...'
+
+
+def preview(text):
+    """Log argument rendering user text (transcripts) truncated or redacted.
+
+    The text is only cut when the record is actually written.
+    """
+    return _Preview(text)
+
+
+setup_logging()
+atexit.register(stop_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
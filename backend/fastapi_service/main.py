@@ -1,48 +1,171 @@
 import os
 import asyncio
-from fastapi import FastAPI, File, UploadFile, Form
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+import uuid
+from fastapi import FastAPI, File, UploadFile, Form, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import httpx
-from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from typing import List, Optional
 import json
-from pathlib import Path
-from rq import Queue
-from redis import Redis
-from fastapi import BackgroundTasks
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
-from fastapi.responses import Response
-
-# Load .env file manually
-env_file = Path(__file__).parent.parent / '.env'
-if env_file.exists():
-    with open(env_file) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                # Remove quotes if present
-                value = value.strip('"').strip("'")
-                os.environ[key.strip()] = value
+from pydantic import BaseModel
+
+# First: loads backend/.env before other modules read their settings
+from . import env  # noqa: F401
+from .admission import AdmissionLimiter, LoadSheddingMiddleware, Overloaded
+from .assemblyai import AssemblyAIProvider, WEBHOOK_AUTH_HEADER
+from .auth import user_id_from_authorization
+from .blobstore import BlobTooLarge, blob_store
+from .redis_pool import async_redis, close_async_redis, job_queue
+from .cache import TwoTierCache, content_key
+from .gemini import GeminiProvider, GeminiResponseError
+from . import jsonlib
+from .jsonlib import JSONResponse
+from .job_events import JobEventHub, publish_job_event
+from .lexical import lexical_scorer
+from .logs import get_logger, poll_sampled, preview
+from .metrics import (
+    RequestMetricsMiddleware,
+    mark_process_dead,
+    observe_polls,
+    record_parse_failure,
+    render_latest,
+    set_request_labels,
+    stage_timer,
+)
+from .persistence import feedback_sink
+from .reading import score_reading, tokenize
+from .resilience import CircuitBreaker, CircuitOpen, hedged, is_provider_fault
+from .uploads import (
+    MAX_AUDIO_SECONDS,
+    MAX_UPLOAD_BYTES,
+    AudioSource,
+    UploadLimitMiddleware,
+    audio_digest,
+    check_duration,
+    upload_content,
+)
+from .webhooks import TranscriptWaiter, publish_transcript_result
 
 # Load environment variables from .env file or OS environment
 ASSEMBLYAI_API_KEY = os.getenv('ASSEMBLYAI_API_KEY', '')
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 
-print(f"[STARTUP] ASSEMBLYAI_API_KEY loaded: {bool(ASSEMBLYAI_API_KEY)}")
-print(f"[STARTUP] GEMINI_API_KEY loaded: {bool(GEMINI_API_KEY)}")
+startup_log = get_logger('startup')
+transcribe_log = get_logger('transcribe')
+gemini_log = get_logger('gemini')
+reading_log = get_logger('reading')
+batch_log = get_logger('batch')
+request_log = get_logger('api')
+webhook_log = get_logger('webhook')
+
+startup_log.info("ASSEMBLYAI_API_KEY loaded: %s", bool(ASSEMBLYAI_API_KEY))
+startup_log.info("GEMINI_API_KEY loaded: %s", bool(GEMINI_API_KEY))
+
+# Upstream provider clients, each with its own pooled keep-alive connections
+assemblyai = AssemblyAIProvider(api_key=ASSEMBLYAI_API_KEY)
+gemini = GeminiProvider(api_key=GEMINI_API_KEY)
+
+# Admission control: bounded concurrency and wait queue per provider, so a
+# spike is shed with 429/503 + Retry-After instead of exhausting memory
+assemblyai_limiter = AdmissionLimiter(
+    'assemblyai',
+    max_concurrent=int(os.getenv('ASSEMBLYAI_MAX_CONCURRENT', '20')),
+    max_waiting=int(os.getenv('ASSEMBLYAI_MAX_QUEUE', '40')),
+)
+gemini_limiter = AdmissionLimiter(
+    'gemini',
+    max_concurrent=int(os.getenv('GEMINI_MAX_CONCURRENT', '20')),
+    max_waiting=int(os.getenv('GEMINI_MAX_QUEUE', '100')),
+)
+
+# Circuit breakers: fail fast (Gemini -> local scorer, AssemblyAI -> 503)
+# while a provider is erroring or timing out, instead of every request
+# waiting out the full timeout. Slow Gemini calls count as failures.
+assemblyai_breaker = CircuitBreaker('assemblyai', ignored=(Overloaded,))
+gemini_breaker = CircuitBreaker(
+    'gemini',
+    slow_call=float(os.getenv('GEMINI_SLOW_CALL_SECONDS', '20')),
+    ignored=(Overloaded,),
+)
+
+# Hedged Gemini requests: fire a duplicate call once the first has taken
+# longer than the recent p95 latency and use whichever answers first
+GEMINI_HEDGE = os.getenv('GEMINI_HEDGE', 'False') == 'True'
+GEMINI_HEDGE_MIN_DELAY = float(os.getenv('GEMINI_HEDGE_MIN_DELAY', '1.0'))
+
+# Webhook mode: AssemblyAI calls /api/assemblyai_callback/ when a transcript
+# is done and waiters are woken over Redis pub/sub instead of polling
+ASSEMBLYAI_CALLBACK_URL = os.getenv('ASSEMBLYAI_CALLBACK_URL', '')
+ASSEMBLYAI_WEBHOOK_SECRET = os.getenv('ASSEMBLYAI_WEBHOOK_SECRET', '')
+ASSEMBLYAI_WEBHOOK_TIMEOUT = float(os.getenv('ASSEMBLYAI_WEBHOOK_TIMEOUT', '120'))
+transcript_waiter = TranscriptWaiter(async_redis)
+if ASSEMBLYAI_CALLBACK_URL and not ASSEMBLYAI_WEBHOOK_SECRET:
+    startup_log.warning("ASSEMBLYAI_CALLBACK_URL is set without ASSEMBLYAI_WEBHOOK_SECRET; callbacks are not authenticated")
+
+# Content-addressed result caches (local LRU in front of Redis)
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+transcript_cache = TwoTierCache(
+    'transcript',
+    ttl=int(os.getenv('TRANSCRIPT_CACHE_TTL', str(24 * 60 * 60))),
+    max_entries=CACHE_MAX_ENTRIES,
+    redis=async_redis,
+)
+analysis_cache = TwoTierCache(
+    'analysis',
+    ttl=int(os.getenv('ANALYSIS_CACHE_TTL', str(24 * 60 * 60))),
+    max_entries=CACHE_MAX_ENTRIES,
+    redis=async_redis,
+)
+
+# /api/analyze_batch/: transcripts packed per Gemini prompt and how many
+# Gemini calls one batch may have in flight
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '500'))
+BATCH_PACK_SIZE = int(os.getenv('BATCH_PACK_SIZE', '5'))
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '4'))
+
+# Read mode is scored locally against the level text; Gemini is only asked
+# for narrative tips when this is enabled
+READING_GEMINI_TIPS = os.getenv('READING_GEMINI_TIPS', 'False') == 'True'
+
+# Job status streams (/api/job_events/, /ws/job_events/) fed by worker events
+JOB_EVENTS_TIMEOUT = float(os.getenv('JOB_EVENTS_TIMEOUT', '600'))
+job_events = JobEventHub(async_redis)
+
+
+async def close_clients():
+    """Close pooled provider and Redis clients (app shutdown or end of a worker job)."""
+    await assemblyai.aclose()
+    await gemini.aclose()
+    await transcript_waiter.stop()
+    await job_events.stop()
+    await feedback_sink.aclose()
+    await close_async_redis()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    assemblyai.open()
+    gemini.open()
+    startup_log.info("Pooled HTTP clients ready")
+    yield
+    await close_clients()
+    mark_process_dead()
+
+
+# orjson-backed responses when orjson is installed (see jsonlib.py)
+app = FastAPI(lifespan=lifespan, default_response_class=JSONResponse)
 
-# Try to import Google AI SDK
-try:
-    import google.generativeai as genai
-    genai.configure(api_key=GEMINI_API_KEY)
-    GENAI_AVAILABLE = True
-    print("[STARTUP] Google AI SDK (genai) available")
-except ImportError:
-    GENAI_AVAILABLE = False
-    print("[STARTUP] Google AI SDK not available, will use httpx fallback")
+# Cap request bodies (recordings) before they are spooled in full
+app.add_middleware(UploadLimitMiddleware, max_bytes=MAX_UPLOAD_BYTES)
 
-app = FastAPI()
+# Refuse new recordings up front while transcription is saturated
+app.add_middleware(
+    LoadSheddingMiddleware,
+    limiter=assemblyai_limiter,
+    paths=('/api/analyze_speech/', '/api/analyze_reading/'),
+)
 
 # Add CORS middleware - Allow Vercel domains
 app.add_middleware(
@@ -62,6 +185,9 @@ app.add_middleware(
     allow_origin_regex=r"^https://fluento.*\.vercel\.app$",
 )
 
+# Outermost, so requests shed by admission control are counted too
+app.add_middleware(RequestMetricsMiddleware)
+
 
 # Health check endpoints
 @app.get('/health')
@@ -71,7 +197,19 @@ def health_check():
         'status': 'healthy',
         'service': 'fastapi-ai-api',
         'assemblyai_configured': bool(ASSEMBLYAI_API_KEY),
-        'gemini_configured': bool(GEMINI_API_KEY)
+        'gemini_configured': bool(GEMINI_API_KEY),
+        'cache': {
+            'transcript': transcript_cache.stats(),
+            'analysis': analysis_cache.stats(),
+        },
+        'admission': {
+            'assemblyai': assemblyai_limiter.stats(),
+            'gemini': gemini_limiter.stats(),
+        },
+        'breakers': {
+            'assemblyai': assemblyai_breaker.stats(),
+            'gemini': gemini_breaker.stats(),
+        },
     }
 
 
@@ -81,17 +219,22 @@ def root():
     return {'message': 'Fluento AI API', 'status': 'running'}
 
 
-async def transcribe_with_assemblyai(file_bytes: bytes) -> Optional[str]:
-    """Upload audio bytes to AssemblyAI and return the transcript text.
+async def transcribe_with_assemblyai(audio: AudioSource, progress=None) -> Optional[str]:
+    """Upload audio to AssemblyAI and return the transcript text.
+
+    ``audio`` is either raw bytes or an ``UploadFile``; uploads are streamed
+    from their spooled file in chunks rather than read into memory.
+    ``progress`` is an optional async callable told when the upload is done
+    and AssemblyAI starts transcribing (used for job status events).
     
     If ASSEMBLYAI_API_KEY is not set, returns a placeholder transcript for testing.
     In production, ensure the API key is set in environment variables.
     """
-    print(f"[TRANSCRIBE] Starting transcription. API Key present: {bool(ASSEMBLYAI_API_KEY)}")
-    print(f"[TRANSCRIBE] Audio file size: {len(file_bytes)} bytes")
+    audio_hash, audio_size = await audio_digest(audio)
+    transcribe_log.info("Starting transcription: %d bytes", audio_size)
     
     if not ASSEMBLYAI_API_KEY:
-        print("[TRANSCRIBE] No AssemblyAI API key found, using placeholder")
+        transcribe_log.warning("No AssemblyAI API key found, using placeholder")
         # Return placeholder transcript for development/testing
         placeholder_transcripts = {
             'introduce': 'My name is John. I am a software engineer from California. I enjoy coding and hiking in my free time.',
@@ -102,71 +245,215 @@ async def transcribe_with_assemblyai(file_bytes: bytes) -> Optional[str]:
         }
         return placeholder_transcripts.get('introduce', 'I am practicing English speaking today.')
 
-    headers = {
-        'authorization': ASSEMBLYAI_API_KEY,
-        'content-type': 'application/json'
-    }
+    # Identical audio (retries, double submits, re-queued jobs) is only sent upstream once
+    return await transcript_cache.get_or_compute(
+        audio_hash,
+        lambda: _transcribe_admitted(audio, progress),
+    )
+
+
+def _transcript_text(data: dict) -> Optional[str]:
+    """Text of a finished transcript, or None if AssemblyAI reported an error."""
+    if data.get('status') == 'error':
+        transcribe_log.warning("Transcription error: %s", data.get('error'))
+        return None
+    transcript = data.get('text')
+    transcribe_log.info("Transcription complete: %s", preview(transcript))
+    return transcript
 
-    async with httpx.AsyncClient(timeout=120) as client:
-        # Upload file to AssemblyAI (upload endpoint)
-        upload_url = 'https://api.assemblyai.com/v2/upload'
-        try:
-            print(f"[TRANSCRIBE] Uploading audio to AssemblyAI...")
-            upload_resp = await client.post(upload_url, headers={'authorization': ASSEMBLYAI_API_KEY}, content=file_bytes)
-            upload_resp.raise_for_status()
-            upload_json = upload_resp.json()
-            audio_url = upload_json.get('upload_url') or upload_json.get('url')
-            print(f"[TRANSCRIBE] Upload successful, audio URL: {audio_url[:50]}...")
-
-            # Start transcription request (WITHOUT webhook - use polling instead)
-            print(f"[TRANSCRIBE] Starting transcription job (polling mode)...")
-            body = {'audio_url': audio_url}
-
-            transcript_req = await client.post(
-                'https://api.assemblyai.com/v2/transcript',
-                headers={'authorization': ASSEMBLYAI_API_KEY, 'content-type': 'application/json'},
-                json=body
-            )
-            transcript_req.raise_for_status()
-            job = transcript_req.json()
-            transcript_id = job.get('id')
-            print(f"[TRANSCRIBE] Job started with ID: {transcript_id}")
-
-            # Use polling - NO WEBHOOK
-            polling_url = f'https://api.assemblyai.com/v2/transcript/{transcript_id}'
-            max_attempts = 120  # 2 minutes max wait
-            for attempt in range(max_attempts):
-                status_resp = await client.get(polling_url, headers={'authorization': ASSEMBLYAI_API_KEY})
-                status_resp.raise_for_status()
-                data = status_resp.json()
-                status = data.get('status')
-                print(f"[TRANSCRIBE] Poll attempt {attempt+1}/{max_attempts}: status={status}")
-                
-                if status == 'completed':
-                    transcript = data.get('text')
-                    print(f"[TRANSCRIBE] Transcription complete: {transcript[:100]}...")
-                    return transcript
-                if status == 'error':
-                    error_msg = data.get('error')
-                    print(f"[TRANSCRIBE] Transcription error: {error_msg}")
-                    return None
-                
-                # Wait 1 second before next poll (exponential backoff after 30 attempts)
-                wait_time = 1 if attempt < 30 else 2
-                await asyncio.sleep(wait_time)
-            
-            print(f"[TRANSCRIBE] Timeout after {max_attempts} attempts")
-            return None
-            
-        except Exception as e:
-            print(f"[TRANSCRIBE] AssemblyAI transcription error: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
 
+async def _wait_for_webhook(transcript_id: str) -> Optional[dict]:
+    """Await the webhook for ``transcript_id`` and return the finished transcript.
+
+    The callback is only a wake-up signal: anyone who knows a transcript id
+    could post one (unless ASSEMBLYAI_WEBHOOK_SECRET is set), so the
+    transcript itself is always fetched from AssemblyAI.
+    """
+    try:
+        payload = await transcript_waiter.wait(transcript_id, ASSEMBLYAI_WEBHOOK_TIMEOUT)
+    except Exception as e:
+        transcribe_log.warning("Webhook wait failed: %s", e)
+        return None
+    if payload is None:
+        return None
+    return await assemblyai.get_transcript(transcript_id)
+
+
+async def _transcribe_admitted(audio: AudioSource, progress=None) -> Optional[str]:
+    # Raises CircuitOpen (503) while AssemblyAI is failing and Overloaded
+    # (429/503) when its capacity is exhausted
+    assemblyai_breaker.check()
+    async with assemblyai_limiter.slot():
+        async with assemblyai_breaker.guard() as call:
+            try:
+                data = await _transcribe_upstream(audio, progress)
+            except Exception as e:
+                transcribe_log.exception("AssemblyAI transcription error: %s", e)
+                # A rejected upload (4xx) is this recording's problem; only
+                # outages, 5xx and timeouts count against the provider
+                if is_provider_fault(e):
+                    call.failed()
+                return None
+            if data is None:
+                # Still not finished when polling gave up
+                call.failed()
+                return None
+            # A per-transcript ``status: error`` (corrupt or silent audio) is
+            # returned as a failed transcription without tripping the breaker
+            return _transcript_text(data)
+
+
+async def _await_transcript(transcript_id: str) -> Optional[dict]:
+    """Wait for a finished transcript: webhook if configured, else polling."""
+    if ASSEMBLYAI_CALLBACK_URL:
+        data = await _wait_for_webhook(transcript_id)
+        if data is not None and data.get('status') in ('completed', 'error'):
+            observe_polls(0)
+            return data
+        transcribe_log.info("No webhook result for %s, falling back to polling", transcript_id)
+
+    max_attempts = 120  # 2 minutes max wait
+    for attempt in range(max_attempts):
+        data = await assemblyai.get_transcript(transcript_id)
+        status = data.get('status')
+        if poll_sampled(attempt + 1):
+            transcribe_log.info("Poll attempt %d/%d: status=%s", attempt + 1, max_attempts, status)
+        else:
+            transcribe_log.debug("Poll attempt %d/%d: status=%s", attempt + 1, max_attempts, status)
+        
+        if status in ('completed', 'error'):
+            observe_polls(attempt + 1)
+            return data
+        
+        # Wait 1 second before next poll (exponential backoff after 30 attempts)
+        wait_time = 1 if attempt < 30 else 2
+        await asyncio.sleep(wait_time)
+    
+    observe_polls(max_attempts)
+    transcribe_log.warning("Timeout for %s after %d attempts", transcript_id, max_attempts)
     return None
 
 
+async def _transcribe_upstream(audio: AudioSource, progress=None) -> Optional[dict]:
+    """Upload, start and await a transcript; None if it never finished."""
+    # Upload file to AssemblyAI (upload endpoint)
+    transcribe_log.debug("Uploading audio to AssemblyAI...")
+    with stage_timer('assemblyai_upload'):
+        audio_url = await assemblyai.upload(upload_content(audio))
+    transcribe_log.debug("Upload successful")
+    if progress is not None:
+        await progress('transcribing')
+
+    with stage_timer('assemblyai_create'):
+        transcript_id = await assemblyai.create_transcript(
+            audio_url,
+            webhook_url=ASSEMBLYAI_CALLBACK_URL,
+            webhook_secret=ASSEMBLYAI_WEBHOOK_SECRET,
+            max_seconds=MAX_AUDIO_SECONDS,
+        )
+    transcribe_log.info(
+        "Job started with ID: %s (%s mode)", transcript_id, 'webhook' if ASSEMBLYAI_CALLBACK_URL else 'polling',
+    )
+
+    with stage_timer('transcript_wait'):
+        return await _await_transcript(transcript_id)
+
+
+ANALYSIS_PROMPT = """Analyze speech. Topic: {topic}
+Transcript: "{transcript}"
+
+JSON only:
+{{
+    "grammar_score": <1-10>,
+    "vocabulary_score": <1-10>,
+    "fluency_score": <1-10>,
+    "topic_relevance_score": <1-10>,
+    "grammar_tips": ["<tip1>", "<tip2>"],
+    "fluency_tips": ["<tip1>", "<tip2>"],
+    "summary": "<brief feedback>"
+}}"""
+
+
+def strip_code_fences(text_content: str) -> str:
+    """Remove a markdown code block wrapped around Gemini's JSON, if present."""
+    text_content = text_content.strip()
+    if text_content.startswith('```'):
+        text_content = text_content.split('```')[1]
+        if text_content.startswith('json'):
+            text_content = text_content[4:]
+    return text_content.strip()
+
+
+def parse_gemini_json(text_content: str):
+    """Decode Gemini's JSON answer, counting answers that are not JSON."""
+    try:
+        return jsonlib.loads(strip_code_fences(text_content))
+    except jsonlib.JSONDecodeError:
+        record_parse_failure()
+        raise
+
+
+def parse_analysis(text_content: str, transcript: str) -> dict:
+    """Parse Gemini's JSON answer and normalize scores, tips and legacy fields."""
+    analysis = parse_gemini_json(text_content)
+    return normalize_analysis(analysis, transcript)
+
+
+def normalize_analysis(analysis: dict, transcript: str) -> dict:
+    """Clamp scores, trim tips and fill the legacy fields of a Gemini analysis.
+
+    Returns a new dict with only the analysis fields: anything else Gemini
+    sent (e.g. the ``id`` of a packed answer) is dropped so it never
+    reaches clients or the analysis cache.
+    """
+    return {
+        # Ensure scores are valid numbers between 1-10
+        'grammar_score': max(1, min(10, float(analysis.get('grammar_score', 5)))),
+        'vocabulary_score': max(1, min(10, float(analysis.get('vocabulary_score', 5)))),
+        'fluency_score': max(1, min(10, float(analysis.get('fluency_score', 5)))),
+        'topic_relevance_score': max(1, min(10, float(analysis.get('topic_relevance_score', 5)))),
+        # Ensure tips are lists (2 per section for speed)
+        'grammar_tips': analysis.get('grammar_tips', [])[:2],
+        'fluency_tips': analysis.get('fluency_tips', [])[:2],
+        'summary': analysis.get('summary', 'Great effort!'),
+        # Legacy feedback field for backward compatibility
+        'feedback': analysis.get('summary', 'Great effort!'),
+        'transcript': transcript,
+    }
+
+
+async def _gemini_call(prompt: str) -> str:
+    gemini_breaker.check()
+    async with gemini_limiter.slot():
+        async with gemini_breaker.guard():
+            with stage_timer('gemini'):
+                return await gemini.generate(prompt)
+
+
+async def gemini_generate(prompt: str) -> str:
+    """``gemini.generate`` behind the Gemini breaker and admission limiter.
+
+    Raises CircuitOpen or Overloaded instead of calling Gemini when it is
+    failing or at capacity. With GEMINI_HEDGE, a second call is fired once
+    the first has run past the recent p95 latency.
+    """
+    p95 = gemini_breaker.latency_quantile(0.95) if GEMINI_HEDGE else None
+    if p95 is None:
+        return await _gemini_call(prompt)
+    return await hedged(lambda: _gemini_call(prompt), max(GEMINI_HEDGE_MIN_DELAY, p95), provider='gemini')
+
+
+async def _gemini_analysis(transcript: str, topic: str) -> dict:
+    # Ultra-optimized prompt for fastest responses (minimal tokens)
+    prompt = ANALYSIS_PROMPT.format(topic=topic, transcript=transcript)
+
+    gemini_log.debug("Sending request to %s", gemini.model)
+    text_content = await gemini_generate(prompt)
+    gemini_log.debug("Response received: %s", preview(text_content))
+
+    return parse_analysis(text_content, transcript)
+
+
 async def analyze_with_gemini(transcript: str, topic: str, mode: str = 'speak') -> dict:
     """Send transcript and topic to Gemini API and get analysis.
     
@@ -178,97 +465,118 @@ async def analyze_with_gemini(transcript: str, topic: str, mode: str = 'speak')
     Returns:
         Dict with grammar_score, vocabulary_score, fluency_score, topic_relevance_score, feedback, transcript
     """
-    print(f"[GEMINI] Starting analysis. API Key present: {bool(GEMINI_API_KEY)}, Mode: {mode}")
-    print(f"[GEMINI] Transcript: {transcript[:100]}...")
-    print(f"[GEMINI] Topic: {topic}")
-    
-    if not GEMINI_API_KEY:
-        print("[GEMINI] No Gemini API key found, using fallback heuristic")
-        # Fallback to heuristic if no API key
-        avg_len = len(transcript.split())
-        grammar_score = min(10.0, max(3.0, 7.0 + (avg_len - 30) / 50))
-        vocabulary_score = min(10.0, max(3.0, 6.0 + (avg_len - 20) / 60))
-        fluency_score = min(10.0, max(3.0, 6.5 + (avg_len - 25) / 80))
-        topic_relevance_score = 8.0 if topic.lower() in transcript.lower() else 6.0
-        return {
-            'grammar_score': round(grammar_score, 1),
-            'vocabulary_score': round(vocabulary_score, 1),
-            'fluency_score': round(fluency_score, 1),
-            'topic_relevance_score': round(topic_relevance_score, 1),
-            'feedback': "Analysis unavailable: Gemini API key not configured.",
-            'transcript': transcript,
-        }
+    gemini_log.info("Starting analysis: mode=%s topic=%s transcript=%s", mode, topic, preview(transcript))
+
+    if not gemini.configured:
+        gemini_log.info("No Gemini API key found, using local lexical scorer")
+        return lexical_scorer.score(transcript, topic)
     
     try:
-        # Try using Google AI SDK first (if available)
-        if GENAI_AVAILABLE:
-            print("[GEMINI] Using Google AI SDK (genai)")
-            import google.generativeai as genai
-            
-            # Ultra-optimized prompt for fastest responses (minimal tokens)
-            prompt = f"""Analyze speech. Topic: {topic}
+        analysis = await analysis_cache.get_or_compute(
+            content_key(transcript, topic, mode),
+            lambda: _gemini_analysis(transcript, topic),
+        )
+        gemini_log.info(
+            "Final scores: grammar=%s vocabulary=%s fluency=%s topic=%s",
+            analysis.get('grammar_score'), analysis.get('vocabulary_score'),
+            analysis.get('fluency_score'), analysis.get('topic_relevance_score'),
+        )
+        return dict(analysis)
+
+    # Degrade to local scores rather than neutral placeholders or an error
+    except (CircuitOpen, Overloaded) as e:
+        gemini_log.warning("Skipping Gemini (%s), using local lexical scorer", e.detail)
+        return lexical_scorer.score(transcript, topic)
+    except GeminiResponseError as e:
+        gemini_log.warning("%s", e)
+        return lexical_scorer.score(transcript, topic)
+    except json.JSONDecodeError as e:
+        gemini_log.warning("JSON parsing error: %s", e)
+        return lexical_scorer.score(transcript, topic)
+    except Exception as e:
+        gemini_log.exception("Error calling Gemini API: %s", e)
+        return lexical_scorer.score(transcript, topic)
+
+
+READING_TIPS_PROMPT = """A learner read this text aloud.
+Text: "{reference}"
 Transcript: "{transcript}"
+Skipped: {omitted}. Misread: {substituted}.
 
 JSON only:
 {{
-    "grammar_score": <1-10>,
-    "vocabulary_score": <1-10>,
-    "fluency_score": <1-10>,
-    "topic_relevance_score": <1-10>,
     "grammar_tips": ["<tip1>", "<tip2>"],
     "fluency_tips": ["<tip1>", "<tip2>"],
-    "summary": "<brief feedback>"
+    "summary": "<one encouraging sentence>"
 }}"""
 
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            print(f"[GEMINI] Sending request to Gemini 2.5 Flash model (no streaming)...")
-            response = model.generate_content(prompt, stream=False)
-            text_content = response.text
-            print(f"[GEMINI] Response received (complete): {text_content[:300]}...")
-            
-            # Clean up response (remove markdown code blocks if present)
-            text_content = text_content.strip()
-            if text_content.startswith('```'):
-                text_content = text_content.split('```')[1]
-                if text_content.startswith('json'):
-                    text_content = text_content[4:]
-            text_content = text_content.strip()
-            
-            # Parse JSON
-            print(f"[GEMINI] Parsing JSON...")
-            analysis = json.loads(text_content)
-            print(f"[GEMINI] Parsed analysis: {analysis}")
-            
-            # Ensure scores are valid numbers between 1-10
-            analysis['grammar_score'] = max(1, min(10, float(analysis.get('grammar_score', 5))))
-            analysis['vocabulary_score'] = max(1, min(10, float(analysis.get('vocabulary_score', 5))))
-            analysis['fluency_score'] = max(1, min(10, float(analysis.get('fluency_score', 5))))
-            analysis['topic_relevance_score'] = max(1, min(10, float(analysis.get('topic_relevance_score', 5))))
-            
-            # Ensure tips are lists (2 per section for speed)
-            analysis['grammar_tips'] = analysis.get('grammar_tips', [])[:2]
-            analysis['fluency_tips'] = analysis.get('fluency_tips', [])[:2]
-            analysis['summary'] = analysis.get('summary', 'Great effort!')
-            
-            # Legacy feedback field for backward compatibility
-            analysis['feedback'] = analysis.get('summary', 'Great effort!')
-            analysis['transcript'] = transcript
-            
-            print(f"[GEMINI] Final analysis: {analysis}")
-            return analysis
-        
-        else:
-            # Fallback to httpx with correct endpoint
-            print("[GEMINI] Using httpx with Gemini API")
-            async with httpx.AsyncClient(timeout=30) as client:
-                url = f'https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={GEMINI_API_KEY}'
-                
-                # Ultra-optimized prompt for fastest responses (minimal tokens)
-                prompt = f"""Analyze speech. Topic: {topic}
-Transcript: "{transcript}"
 
-JSON only:
-{{
+async def _gemini_reading_tips(reference_text: str, transcript: str, reading: dict) -> dict:
+    prompt = READING_TIPS_PROMPT.format(
+        reference=reference_text,
+        transcript=transcript,
+        omitted=reading['omissions'],
+        substituted=reading['substitutions'],
+    )
+    gemini_log.debug("Requesting reading tips from %s", gemini.model)
+    tips = parse_gemini_json(await gemini_generate(prompt))
+    return {
+        'grammar_tips': list(tips.get('grammar_tips', []))[:2],
+        'fluency_tips': list(tips.get('fluency_tips', []))[:2],
+        'summary': str(tips.get('summary', '')),
+    }
+
+
+async def analyze_reading_locally(transcript: str, reference_text: str, duration: Optional[float] = None) -> dict:
+    """Score read mode by aligning the transcript with the level text.
+
+    Scores are computed locally (see reading.py). With READING_GEMINI_TIPS,
+    Gemini's tips replace the generated ones; any Gemini failure keeps the
+    local analysis as is.
+    """
+    with stage_timer('local_scoring'):
+        analysis = score_reading(reference_text, transcript, duration)
+    reading = analysis['reading']
+    reading_log.info(
+        "Local score: accuracy=%s matched=%s/%s wpm=%s",
+        reading['accuracy'], reading['matched'], reading['reference_words'], reading['words_per_minute'],
+    )
+    if not (READING_GEMINI_TIPS and gemini.configured):
+        return analysis
+
+    try:
+        tips = await analysis_cache.get_or_compute(
+            content_key('read-tips', reference_text, transcript),
+            lambda: _gemini_reading_tips(reference_text, transcript, analysis['reading']),
+        )
+    except Exception as e:
+        gemini_log.warning("Reading tips unavailable: %s", e)
+        return analysis
+    analysis['grammar_tips'] = tips['grammar_tips'] or analysis['grammar_tips']
+    analysis['fluency_tips'] = tips['fluency_tips'] or analysis['fluency_tips']
+    if tips['summary']:
+        analysis['summary'] = analysis['feedback'] = f"{analysis['summary']} {tips['summary']}"
+    return analysis
+
+
+class BatchItem(BaseModel):
+    transcript: str
+    topic: str
+    mode: str = 'speak'
+    reference_text: Optional[str] = None
+    duration: Optional[float] = None
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+
+
+PACKED_ANALYSIS_PROMPT = """Analyze each speech separately.
+{speeches}
+
+JSON array only, one object per speech:
+[{{
+    "id": <speech number>,
     "grammar_score": <1-10>,
     "vocabulary_score": <1-10>,
     "fluency_score": <1-10>,
@@ -276,127 +584,154 @@ JSON only:
     "grammar_tips": ["<tip1>", "<tip2>"],
     "fluency_tips": ["<tip1>", "<tip2>"],
     "summary": "<brief feedback>"
-}}"""
+}}]"""
 
-                payload = {
-                    "contents": [
-                        {
-                            "parts": [
-                                {
-                                    "text": prompt
-                                }
-                            ]
-                        }
-                    ]
-                }
-                
-                print(f"[GEMINI] Sending request to {url[:60]}...")
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
-                result = response.json()
-                print(f"[GEMINI] Response received: {str(result)[:200]}...")
-                
-                if result.get('candidates') and len(result['candidates']) > 0:
-                    candidate = result['candidates'][0]
-                    if 'content' in candidate and 'parts' in candidate['content']:
-                        text_content = candidate['content']['parts'][0].get('text', '{}')
-                        print(f"[GEMINI] Raw text content: {text_content[:200]}...")
-                        
-                        text_content = text_content.strip()
-                        if text_content.startswith('```'):
-                            text_content = text_content.split('```')[1]
-                            if text_content.startswith('json'):
-                                text_content = text_content[4:]
-                        text_content = text_content.strip()
-                        
-                        print(f"[GEMINI] Parsing JSON...")
-                        analysis = json.loads(text_content)
-                        print(f"[GEMINI] Parsed analysis: {analysis}")
-                        
-                        analysis['grammar_score'] = max(1, min(10, float(analysis.get('grammar_score', 5))))
-                        analysis['vocabulary_score'] = max(1, min(10, float(analysis.get('vocabulary_score', 5))))
-                        analysis['fluency_score'] = max(1, min(10, float(analysis.get('fluency_score', 5))))
-                        analysis['topic_relevance_score'] = max(1, min(10, float(analysis.get('topic_relevance_score', 5))))
-                        
-                        # Ensure tips are lists (2 per section for speed)
-                        analysis['grammar_tips'] = analysis.get('grammar_tips', [])[:2]
-                        analysis['fluency_tips'] = analysis.get('fluency_tips', [])[:2]
-                        analysis['summary'] = analysis.get('summary', 'Great effort!')
-                        
-                        # Legacy feedback field for backward compatibility
-                        analysis['feedback'] = analysis.get('summary', 'Great effort!')
-                        analysis['transcript'] = transcript
-                        
-                        print(f"[GEMINI] Final analysis: {analysis}")
-                        return analysis
-                
-                print(f"[GEMINI] Unexpected response: {result}")
-                return {
-                    'grammar_score': 5.0,
-                    'vocabulary_score': 5.0,
-                    'fluency_score': 5.0,
-                    'topic_relevance_score': 5.0,
-                    'grammar_tips': [],
-                    'fluency_tips': [],
-                    'summary': 'Unable to analyze speech at this time. Please try again.',
-                    'feedback': 'Unable to analyze speech at this time. Please try again.',
-                    'transcript': transcript,
-                }
-            
-    except json.JSONDecodeError as e:
-        print(f"[GEMINI] JSON parsing error: {e}")
-        return {
-            'grammar_score': 5.0,
-            'vocabulary_score': 5.0,
-            'fluency_score': 5.0,
-            'topic_relevance_score': 5.0,
-            'grammar_tips': [],
-            'fluency_tips': [],
-            'summary': 'Error parsing analysis. Please try again.',
-            'feedback': 'Error parsing analysis. Please try again.',
-            'transcript': transcript,
-        }
-    except Exception as e:
-        print(f"[GEMINI] Error calling Gemini API: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {
-            'grammar_score': 5.0,
-            'vocabulary_score': 5.0,
-            'fluency_score': 5.0,
-            'topic_relevance_score': 5.0,
-            'grammar_tips': [],
-            'fluency_tips': [],
-            'summary': f'Analysis error: {str(e)}',
-            'feedback': f'Analysis error: {str(e)}',
-            'transcript': transcript,
-        }
+
+async def _gemini_packed_analysis(items: List[BatchItem]) -> dict:
+    """Analyze several transcripts with one Gemini call.
+
+    Returns ``{position: analysis}`` for the answers that came back usable;
+    callers analyze anything missing individually.
+    """
+    speeches = '\n'.join(
+        f'{n}. Topic: {item.topic}\nTranscript: "{item.transcript}"' for n, item in enumerate(items, 1)
+    )
+    batch_log.debug("Sending %d transcripts to %s in one prompt", len(items), gemini.model)
+    answers = parse_gemini_json(await gemini_generate(PACKED_ANALYSIS_PROMPT.format(speeches=speeches)))
+    results = {}
+    for answer in answers if isinstance(answers, list) else []:
+        try:
+            position = int(answer['id']) - 1
+            if 0 <= position < len(items) and position not in results:
+                results[position] = normalize_analysis(answer, items[position].transcript)
+        except (KeyError, TypeError, ValueError) as e:
+            batch_log.warning("Skipping malformed packed answer: %s", e)
+            record_parse_failure()
+    return results
+
+
+async def analyze_batch(items: List[BatchItem]):
+    """Yield ``(index, analysis)`` for every item as soon as it is ready.
+
+    Read-mode items with a reference text and everything without a Gemini
+    key are scored locally. The rest are served from the analysis cache
+    when possible, and the misses go to Gemini ``BATCH_PACK_SIZE`` per
+    prompt with at most ``BATCH_CONCURRENCY`` calls in flight. Anything a
+    packed answer leaves out goes through ``analyze_with_gemini`` on its
+    own, so every item gets a result.
+    """
+    results = asyncio.Queue()
+    pending = {}
+    local = []
+    for index, item in enumerate(items):
+        if item.mode == 'read' and item.reference_text and tokenize(item.reference_text):
+            results.put_nowait([(index, score_reading(item.reference_text, item.transcript, item.duration))])
+        elif not gemini.configured:
+            local.append(index)
+        else:
+            # Duplicates in one batch share a single analysis
+            key = content_key(item.transcript, item.topic, item.mode)
+            pending.setdefault(key, []).append(index)
+    if local:
+        scored = lexical_scorer.score_batch([items[i].transcript for i in local], [items[i].topic for i in local])
+        results.put_nowait(list(zip(local, scored)))
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def lookup(keys):
+        cached = await asyncio.gather(*(analysis_cache.get(key) for key in keys))
+        misses = []
+        for key, analysis in zip(keys, cached):
+            if analysis is not None:
+                results.put_nowait([(index, dict(analysis)) for index in pending[key]])
+            else:
+                misses.append(key)
+        return misses
+
+    async def run_pack(keys):
+        first = [items[pending[key][0]] for key in keys]
+        answers = {}
+        async with semaphore:
+            try:
+                answers = await _gemini_packed_analysis(first)
+            except Exception as e:
+                batch_log.warning("Packed analysis failed, analyzing individually: %s", e)
+        for position, key in enumerate(keys):
+            analysis = answers.get(position)
+            if analysis is None:
+                item = first[position]
+                async with semaphore:
+                    analysis = await analyze_with_gemini(item.transcript, item.topic, item.mode)
+            else:
+                await analysis_cache.set(key, analysis)
+            results.put_nowait([(index, dict(analysis)) for index in pending[key]])
+
+    async def run_all():
+        try:
+            misses = await lookup(list(pending))
+            packs = [misses[i:i + BATCH_PACK_SIZE] for i in range(0, len(misses), BATCH_PACK_SIZE)]
+            await asyncio.gather(*(run_pack(pack) for pack in packs))
+        finally:
+            results.put_nowait(None)
+
+    worker = asyncio.ensure_future(run_all())
+    try:
+        while True:
+            ready = await results.get()
+            if ready is None:
+                break
+            for index, analysis in ready:
+                yield index, analysis
+        # Surface an unexpected failure instead of silently ending the stream
+        await worker
+    finally:
+        worker.cancel()
+
+
+@app.post('/api/analyze_batch/')
+async def analyze_batch_endpoint(request: BatchRequest):
+    """Re-score many transcripts at once, streaming NDJSON as results complete.
+
+    Each line is ``{"index": <position in items>, "analysis": {...}}``;
+    lines arrive in completion order, not request order.
+    """
+    set_request_labels('analyze_batch', 'batch')
+    if not request.items:
+        return JSONResponse({'detail': 'No items received'}, status_code=400)
+    if len(request.items) > BATCH_MAX_ITEMS:
+        return JSONResponse({'detail': f'At most {BATCH_MAX_ITEMS} items per batch'}, status_code=413)
+
+    async def lines():
+        async for index, analysis in analyze_batch(request.items):
+            yield jsonlib.dumps({'index': index, 'analysis': analysis}) + '\n'
+
+    return StreamingResponse(lines(), media_type='application/x-ndjson')
 
 
 @app.post('/api/analyze_speech/')
-async def analyze_speech(audio: UploadFile = File(...), topic: str = Form(...)):
+async def analyze_speech(audio: UploadFile = File(...), topic: str = Form(...), duration: Optional[float] = Form(None)):
+    set_request_labels('analyze_speech', 'speak')
+    check_duration(duration)
     try:
-        content = await audio.read()
-        if not content:
+        if not audio.size:
             return JSONResponse({'detail': 'No audio file received'}, status_code=400)
         
-        print(f"[ANALYZE_SPEECH] Processing audio, topic: {topic}")
-        transcript = await transcribe_with_assemblyai(content)
+        request_log.info("analyze_speech: processing audio, topic: %s", topic)
+        transcript = await transcribe_with_assemblyai(audio)
         
         if not transcript:
-            print("[ANALYZE_SPEECH] Transcription failed")
+            request_log.warning("analyze_speech: transcription failed")
             return JSONResponse(
                 {'detail': 'Transcription failed. Please check AssemblyAI API key and try again.'}, 
                 status_code=500
             )
         
-        print(f"[ANALYZE_SPEECH] Got transcript: {transcript[:100]}...")
         analysis = await analyze_with_gemini(transcript, topic, mode='speak')
         return JSONResponse(analysis)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error in analyze_speech: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        request_log.exception("Error in analyze_speech: %s", e)
         return JSONResponse(
             {'detail': f'Error processing audio: {str(e)}'}, 
             status_code=500
@@ -404,30 +739,42 @@ async def analyze_speech(audio: UploadFile = File(...), topic: str = Form(...)):
 
 
 @app.post('/api/analyze_reading/')
-async def analyze_reading(audio: UploadFile = File(...), topic: str = Form(...)):
+async def analyze_reading(
+    audio: UploadFile = File(...),
+    topic: str = Form(...),
+    duration: Optional[float] = Form(None),
+    reference_text: Optional[str] = Form(None),
+):
+    """Score a read-aloud attempt.
+
+    With ``reference_text`` (the text shown to the learner) the attempt is
+    scored locally; without it the transcript goes to Gemini as before.
+    """
+    set_request_labels('analyze_reading', 'read')
+    check_duration(duration)
     try:
-        content = await audio.read()
-        if not content:
+        if not audio.size:
             return JSONResponse({'detail': 'No audio file received'}, status_code=400)
         
-        print(f"[ANALYZE_READING] Processing audio, topic: {topic}")
-        transcript = await transcribe_with_assemblyai(content)
+        request_log.info("analyze_reading: processing audio, topic: %s", topic)
+        transcript = await transcribe_with_assemblyai(audio)
         
         if not transcript:
-            print("[ANALYZE_READING] Transcription failed")
+            request_log.warning("analyze_reading: transcription failed")
             return JSONResponse(
                 {'detail': 'Transcription failed. Please check AssemblyAI API key and try again.'}, 
                 status_code=500
             )
 
-        print(f"[ANALYZE_READING] Got transcript: {transcript[:100]}...")
+        if reference_text and tokenize(reference_text):
+            return JSONResponse(await analyze_reading_locally(transcript, reference_text, duration))
         analysis = await analyze_with_gemini(transcript, topic, mode='read')
         # Emphasize pronunciation / tone in feedback (already in Gemini prompt)
         return JSONResponse(analysis)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error in analyze_reading: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        request_log.exception("Error in analyze_reading: %s", e)
         return JSONResponse(
             {'detail': f'Error processing audio: {str(e)}'}, 
             status_code=500
@@ -435,76 +782,160 @@ async def analyze_reading(audio: UploadFile = File(...), topic: str = Form(...))
 
 
 @app.post('/api/queue_job/')
-async def queue_job(audio: UploadFile = File(...), topic: str = Form(...), mode: str = Form('speak')):
-    """Enqueue audio transcription + analysis as background job using RQ/Redis."""
+async def queue_job(
+    audio: UploadFile = File(...),
+    topic: str = Form(...),
+    mode: str = Form('speak'),
+    duration: Optional[float] = Form(None),
+    reference_text: Optional[str] = Form(None),
+    level_id: Optional[int] = Form(None),
+    authorization: Optional[str] = Header(None),
+):
+    """Enqueue audio transcription + analysis as background job using RQ/Redis.
+
+    The recording is stored in the blob store (the shared AUDIO_BLOB_DIR, or
+    Redis for small recordings without one) and the job only carries its
+    content hash, keeping job payloads tiny. Read-mode jobs with a
+    ``reference_text`` are scored locally, as in /api/analyze_reading/.
+
+    With a ``level_id``, the caller's JWT is verified and the worker saves
+    the result as the user's Feedback in Django itself (see persistence.py),
+    so the client does not need to POST it to /api/save_feedback/.
+    """
+    set_request_labels('queue_job', mode)
+    check_duration(duration)
+    user_id = None
+    if level_id is not None:
+        if not feedback_sink.configured:
+            raise HTTPException(status_code=503, detail='Saving job results is not configured')
+        user_id = user_id_from_authorization(authorization)
     try:
-        content = await audio.read()
-        if not content:
+        if not audio.size:
             return JSONResponse({'detail': 'No audio file received'}, status_code=400)
 
-        # Connect to Redis (REDIS_URL env var)
-        redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
-        redis_conn = Redis.from_url(redis_url)
-        q = Queue('default', connection=redis_conn)
+        audio_ref = await run_in_threadpool(blob_store.put_file, audio.file)
 
-        # Enqueue the job - use the tasks module to keep implementation single-sourced
+        # Publish 'queued' before enqueueing so it can never overwrite a state
+        # the worker has already reported
+        job_id = uuid.uuid4().hex
+        await publish_job_event(async_redis, job_id, 'queued')
+
+        # Enqueue the job - use the tasks module to keep implementation single-sourced.
+        # RQ is blocking, so keep it off the event loop.
         from .tasks import transcribe_and_analyze
-        job = q.enqueue(transcribe_and_analyze, content, topic, mode)
+        job = await run_in_threadpool(
+            job_queue.enqueue, transcribe_and_analyze, audio_ref, topic, mode, reference_text, duration,
+            user_id, level_id,
+            job_id=job_id,
+        )
 
-        return JSONResponse({'job_id': job.get_id()}, status_code=202)
+        return JSONResponse({'job_id': job.id}, status_code=202)
+    except BlobTooLarge as e:
+        return JSONResponse({'detail': str(e)}, status_code=413)
     except Exception as e:
-        print('Error enqueueing job:', e)
+        request_log.exception("Error enqueueing job: %s", e)
         return JSONResponse({'detail': str(e)}, status_code=500)
 
 
 @app.get('/api/job_status/{job_id}')
 def job_status(job_id: str):
     try:
-        redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
-        redis_conn = Redis.from_url(redis_url)
-        q = Queue('default', connection=redis_conn)
-        job = q.fetch_job(job_id)
+        job = job_queue.fetch_job(job_id)
         if not job:
             return JSONResponse({'status': 'not_found'}, status_code=404)
         data = {
-            'id': job.get_id(),
+            'id': job.id,
             'status': job.get_status(),
             'result': job.result if job.is_finished else None,
             'exc_info': job.exc_info if job.is_failed else None,
         }
         return JSONResponse(data)
     except Exception as e:
-        print('Error fetching job status:', e)
+        request_log.exception("Error fetching job status: %s", e)
         return JSONResponse({'detail': str(e)}, status_code=500)
 
 
+def _job_state_from_rq(job_id: str) -> dict:
+    """Current state of a job that has no stored event (e.g. expired events)."""
+    job = job_queue.fetch_job(job_id)
+    if not job:
+        return {'job_id': job_id, 'state': 'not_found'}
+    if job.is_finished:
+        return {'job_id': job_id, 'state': 'done', 'result': job.result}
+    if job.is_failed:
+        return {'job_id': job_id, 'state': 'failed', 'error': 'job_failed'}
+    return {'job_id': job_id, 'state': 'queued'}
+
+
+def _job_event_stream(job_id: str):
+    return job_events.stream(
+        job_id,
+        JOB_EVENTS_TIMEOUT,
+        fallback=lambda: run_in_threadpool(_job_state_from_rq, job_id),
+    )
+
+
+@app.get('/api/job_events/{job_id}')
+async def job_events_sse(job_id: str):
+    """Server-Sent Events stream of a queued job's state transitions.
+
+    Emits queued, uploading, transcribing, analyzing and finally done (with
+    the analysis as ``result``) or failed, then closes the stream.
+    """
+    async def events():
+        async for event in _job_event_stream(job_id):
+            if event is None:
+                yield ': keepalive\n\n'
+                continue
+            yield f"event: {event['state']}\ndata: {jsonlib.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@app.websocket('/ws/job_events/{job_id}')
+async def job_events_ws(websocket: WebSocket, job_id: str):
+    """WebSocket variant of /api/job_events/: one JSON message per state."""
+    await websocket.accept()
+    try:
+        async for event in _job_event_stream(job_id):
+            if event is not None:
+                await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
 # AssemblyAI webhook receiver: AssemblyAI will POST the transcript result here
 @app.post('/api/assemblyai_callback/')
-async def assemblyai_callback(payload: dict):
+async def assemblyai_callback(payload: dict, request: Request):
     """Handle AssemblyAI webhook callbacks. Payload follows AssemblyAI webhook structure."""
-    print('[WEBHOOK] Received AssemblyAI callback')
+    if ASSEMBLYAI_WEBHOOK_SECRET and request.headers.get(WEBHOOK_AUTH_HEADER) != ASSEMBLYAI_WEBHOOK_SECRET:
+        webhook_log.warning("Rejected callback with missing/invalid secret")
+        return JSONResponse({'error': 'unauthorized'}, status_code=401)
     try:
-        # Minimal handling: log and store to temp file or forward to queue result store
-        # Example payload contains 'id' and 'status' and 'text' when done
-        job_id = payload.get('id')
+        # Webhooks carry 'transcript_id' and 'status'; full transcript
+        # objects (with 'id') are accepted too
+        job_id = payload.get('transcript_id') or payload.get('id')
         status = payload.get('status')
-        text = payload.get('text')
-        print(f'[WEBHOOK] id={job_id} status={status} text_len={len(text) if text else 0}')
-        # Store to a simple Redis key so workers or HTTP endpoints can read it
-        redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
-        redis_conn = Redis.from_url(redis_url)
-        key = f'assemblyai:result:{job_id}'
-        redis_conn.set(key, json.dumps(payload), ex=60*60)
+        webhook_log.info("id=%s status=%s", job_id, status)
+        if not job_id or not isinstance(job_id, str):
+            return JSONResponse({'error': 'missing transcript_id'}, status_code=400)
+        # Store under assemblyai:result:{id} and publish so waiting requests
+        # and worker jobs wake up immediately. Only the id and status are
+        # passed on: waiters fetch the transcript from AssemblyAI themselves.
+        await publish_transcript_result(async_redis, job_id, {'transcript_id': job_id, 'status': status})
         return JSONResponse({'ok': True})
     except Exception as e:
-        print('[WEBHOOK] Error handling callback:', e)
+        webhook_log.exception("Error handling callback: %s", e)
         return JSONResponse({'error': str(e)}, status_code=500)
 
 
-# Prometheus metrics
-REQUEST_COUNTER = Counter('s2s_requests_total', 'Total requests received')
-JOB_DURATION = Histogram('s2s_job_duration_seconds', 'Time taken for jobs')
-
+# Prometheus metrics (see metrics.py)
 @app.get('/metrics')
 def metrics():
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
\ No newline at end of file
+    body, content_type = render_latest()
+    return Response(body, media_type=content_type)
\ No newline at end of file
@@ -0,0 +1,218 @@
+"""Prometheus metrics for the AI service and its RQ workers.
+
+Set ``PROMETHEUS_MULTIPROC_DIR`` to a directory shared by every uvicorn
+worker and RQ worker process (including other containers) to aggregate all
+of them into the single /metrics endpoint; without it each process reports
+only its own metrics, which is fine for a single uvicorn worker.
+
+Each process writes its own files, named after ``process_identifier()``:
+the host name plus the pid, so containers sharing the directory (each with
+its own pid namespace) never write to the same file. The start scripts
+remove their own host's files left from a previous run, live gauges are
+dropped when a process exits (``mark_process_dead``), and the forking RQ
+worker gives all its successive work horses one identity so one job does
+not leave a new set of files behind.
+
+Stage metrics carry ``endpoint`` and ``mode`` labels taken from the request
+or job being served (see ``set_request_labels``), so the pipeline helpers
+deep inside main.py do not need them passed down explicitly.
+"""
+import os
+import socket
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, values
+
+
+PROMETHEUS_MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR', '')
+
+# '_' separates the parts of multiprocess file names
+METRICS_HOST = socket.gethostname().replace('_', '-')
+
+# Worker pid when running as an RQ work horse (see use_work_horse_identity)
+_work_horse_of = None
+
+
+def horse_identifier(worker_pid: int) -> str:
+    return f'{METRICS_HOST}-{worker_pid}-horse'
+
+
+def process_identifier() -> str:
+    """Name of this process's multiprocess metric files."""
+    if _work_horse_of is not None:
+        return horse_identifier(_work_horse_of)
+    return f'{METRICS_HOST}-{os.getpid()}'
+
+
+def use_work_horse_identity():
+    """Called in a forked RQ work horse: write to the files of the worker's previous horses.
+
+    A worker runs one horse at a time, so they can share files, and the
+    values (read back from the files) keep accumulating across jobs.
+    """
+    global _work_horse_of
+    _work_horse_of = os.getppid()
+
+
+if PROMETHEUS_MULTIPROC_DIR:
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+    # Must happen before any metric is created (env.py imports this module
+    # ahead of the rest of the package)
+    values.ValueClass = values.MultiProcessValue(process_identifier)
+
+# Label values for client-supplied modes are limited to keep series bounded
+KNOWN_MODES = ('speak', 'read', 'batch')
+
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+REQUEST_COUNTER = Counter(
+    's2s_requests_total',
+    'Total requests received',
+    ['endpoint', 'mode', 'status'],
+)
+REQUEST_BODY_SECONDS = Histogram(
+    's2s_request_body_seconds',
+    'Time spent receiving request bodies (uploads)',
+    ['endpoint'],
+    buckets=STAGE_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    's2s_stage_seconds',
+    'Latency of each pipeline stage',
+    ['stage', 'endpoint', 'mode'],
+    buckets=STAGE_BUCKETS,
+)
+TRANSCRIPT_POLLS = Histogram(
+    's2s_transcript_polls',
+    'AssemblyAI status polls needed per transcript',
+    ['endpoint', 'mode'],
+    buckets=(0, 1, 2, 5, 10, 20, 30, 60, 120),
+)
+GEMINI_PARSE_FAILURES = Counter(
+    's2s_gemini_parse_failures_total',
+    'Gemini answers that were not valid analysis JSON',
+    ['endpoint', 'mode'],
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    's2s_queue_wait_seconds',
+    'Time jobs spent queued before a worker started them',
+    ['mode'],
+    buckets=STAGE_BUCKETS,
+)
+JOB_DURATION = Histogram(
+    's2s_job_duration_seconds',
+    'Time taken for jobs',
+    ['mode', 'status'],
+    buckets=STAGE_BUCKETS,
+)
+
+# {'endpoint': ..., 'mode': ...} for the request or job being served. A
+# mutable dict so labels set by an endpoint are seen by the middleware.
+_labels = ContextVar('s2s_metric_labels', default=None)
+
+
+def mode_label(mode) -> str:
+    return mode if mode in KNOWN_MODES else 'other'
+
+
+def set_request_labels(endpoint: str, mode: str):
+    mode = mode_label(mode)
+    labels = _labels.get()
+    if labels is None:
+        _labels.set({'endpoint': endpoint, 'mode': mode})
+    else:
+        labels.update(endpoint=endpoint, mode=mode)
+
+
+def request_labels() -> tuple:
+    labels = _labels.get() or {}
+    return labels.get('endpoint', 'none'), labels.get('mode', 'none')
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Observe the duration of the enclosed block as pipeline ``stage``."""
+    endpoint, mode = request_labels()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage=stage, endpoint=endpoint, mode=mode).observe(time.perf_counter() - started)
+
+
+def observe_stage(stage: str, seconds: float):
+    endpoint, mode = request_labels()
+    STAGE_SECONDS.labels(stage=stage, endpoint=endpoint, mode=mode).observe(seconds)
+
+
+def observe_polls(count: int):
+    endpoint, mode = request_labels()
+    TRANSCRIPT_POLLS.labels(endpoint=endpoint, mode=mode).observe(count)
+
+
+def record_parse_failure():
+    endpoint, mode = request_labels()
+    GEMINI_PARSE_FAILURES.labels(endpoint=endpoint, mode=mode).inc()
+
+
+def render_latest() -> tuple:
+    """``(body, content_type)`` for /metrics, merging worker processes if configured."""
+    if PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(identifier: Optional[str] = None):
+    """Drop a process's live gauges (default: this one's) from the multiprocess directory."""
+    if PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(identifier or process_identifier())
+
+
+class RequestMetricsMiddleware:
+    """Count requests per endpoint/mode/status and time body uploads."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        labels = {}
+        token = _labels.set(labels)
+        started = time.perf_counter()
+        body_seconds = None
+        status = 500
+
+        async def timed_receive():
+            nonlocal body_seconds
+            message = await receive()
+            if message['type'] == 'http.request' and not message.get('more_body') and body_seconds is None:
+                body_seconds = time.perf_counter() - started
+            return message
+
+        async def send_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, timed_receive, send_status)
+        finally:
+            _labels.reset(token)
+            route = scope.get('route')
+            endpoint = labels.get('endpoint') or (route.path if route is not None else 'unmatched')
+            REQUEST_COUNTER.labels(endpoint=endpoint, mode=labels.get('mode', 'none'), status=str(status)).inc()
+            if body_seconds is not None and scope['method'] in ('POST', 'PUT', 'PATCH'):
+                REQUEST_BODY_SECONDS.labels(endpoint=endpoint).observe(body_seconds)
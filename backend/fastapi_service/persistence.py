@@ -0,0 +1,110 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+from .http_pool import PooledClient, env_float
+from .logs import get_logger
+
+
+log = get_logger('persist')
+
+# Django base URL as seen from the workers, and the shared secret of its
+# internal ingestion endpoint (INTERNAL_API_TOKEN in Django's settings)
+DJANGO_INTERNAL_URL = os.getenv('DJANGO_INTERNAL_URL', '')
+INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN', '')
+FEEDBACK_FLUSH_DELAY = env_float('FEEDBACK_FLUSH_DELAY', 0.2)
+FEEDBACK_BATCH_SIZE = int(os.getenv('FEEDBACK_BATCH_SIZE', '100'))
+FEEDBACK_SAVE_ATTEMPTS = int(os.getenv('FEEDBACK_SAVE_ATTEMPTS', '3'))
+
+INGEST_PATH = '/api/internal/feedback/'
+
+
+class FeedbackSink(PooledClient):
+    """Saves finished job results as Django ``Feedback`` rows.
+
+    Results arriving within ``FEEDBACK_FLUSH_DELAY`` of each other (from the
+    many jobs an async worker runs at once) are sent to Django's internal
+    ingestion endpoint as one batch, which Django stores with a fixed number
+    of queries. Each caller awaits its own item's result.
+    """
+
+    def __init__(self, base_url: str, token: str, timeout: float = 10.0):
+        super().__init__(base_url, headers={'X-Internal-Token': token}, timeout=timeout)
+        self.token = token
+        self._pending = []
+        self._flusher = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.base_url and self.token)
+
+    async def save(self, user_id: int, level_id: int, analysis: dict) -> Optional[dict]:
+        """Store ``analysis`` for the user and level.
+
+        Returns Django's per-item result (``{'status': 'created', 'id',
+        'xp_earned'}`` or ``{'status': 'error', 'errors'}``), or None if
+        Django could not be reached.
+        """
+        item = {
+            'user_id': user_id,
+            'level_id': level_id,
+            'transcript': analysis.get('transcript', ''),
+            'grammar_score': analysis.get('grammar_score', 0),
+            'vocabulary_score': analysis.get('vocabulary_score', 0),
+            'fluency_score': analysis.get('fluency_score', 0),
+            'topic_relevance_score': analysis.get('topic_relevance_score', 0),
+            'feedback_text': analysis.get('feedback', ''),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+        }
+        loop = asyncio.get_running_loop()
+        entry = (item, loop.create_future())
+        self._pending.append(entry)
+        if len(self._pending) >= FEEDBACK_BATCH_SIZE:
+            asyncio.ensure_future(self._flush())
+        elif self._flusher is None or self._flusher.done() or self._flusher.get_loop() is not loop:
+            # A flusher left over from another loop (plain rq jobs) never runs
+            self._flusher = asyncio.ensure_future(self._flush_later())
+        try:
+            return await entry[1]
+        except asyncio.CancelledError:
+            if entry in self._pending:
+                self._pending.remove(entry)
+            raise
+
+    async def _flush_later(self):
+        await asyncio.sleep(FEEDBACK_FLUSH_DELAY)
+        await self._flush()
+
+    async def _flush(self):
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        results = await self._send([item for item, _ in batch])
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _send(self, items: list) -> list:
+        for attempt in range(1, FEEDBACK_SAVE_ATTEMPTS + 1):
+            try:
+                response = await self.client.post(INGEST_PATH, json={'items': items})
+                if response.status_code in (201, 400):
+                    results = response.json()['results']
+                    log.info("Saved %d/%d job results", sum(r.get('status') == 'created' for r in results), len(items))
+                    return results
+                log.warning("Ingestion answered %d: %s", response.status_code, response.text[:200])
+                break
+            except httpx.ConnectError as e:
+                # Nothing reached Django, so retrying cannot duplicate rows
+                log.warning("Ingestion attempt %d/%d failed: %s", attempt, FEEDBACK_SAVE_ATTEMPTS, e)
+                await asyncio.sleep(0.5 * attempt)
+            except Exception as e:
+                log.warning("Ingestion failed: %s", e)
+                break
+        return [None] * len(items)
+
+
+feedback_sink = FeedbackSink(DJANGO_INTERNAL_URL, INTERNAL_API_TOKEN)
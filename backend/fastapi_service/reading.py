@@ -0,0 +1,202 @@
+"""Local scoring for read mode.
+
+In read mode the learner reads a known text aloud, so most of the score can
+be computed by aligning the transcript against that text instead of asking
+Gemini: a word-level edit-distance alignment gives accuracy, omissions,
+insertions and substitutions, and the recording duration gives words per
+minute. The result is deterministic and takes milliseconds.
+"""
+import os
+import re
+from array import array
+from typing import List, Optional, Tuple
+
+
+WORD_RE = re.compile(r"[^\W_]+(?:['’][^\W_]+)*")
+
+# Comfortable read-aloud pace for learners, in words per minute
+READING_TARGET_WPM = (
+    float(os.getenv('READING_MIN_WPM', '100')),
+    float(os.getenv('READING_MAX_WPM', '170')),
+)
+
+# Pace credit when the recording's duration is unknown: neither rewarded as
+# ideal nor punished as too slow/fast
+UNKNOWN_PACE_RATIO = float(os.getenv('READING_UNKNOWN_PACE', '0.75'))
+
+# Backtrace moves
+MATCH, SUBSTITUTE, OMIT, INSERT = 0, 1, 2, 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words with punctuation dropped ("Don't!" -> "don't")."""
+    return [w.replace('’', "'") for w in WORD_RE.findall(text.casefold())]
+
+
+def align(reference: List[str], spoken: List[str]) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """Word-level Levenshtein alignment of ``spoken`` against ``reference``.
+
+    Returns ``(op, reference_word, spoken_word)`` tuples in reading order.
+    Words are mapped to integer ids and the DP runs over ``array`` rows with
+    the backtrace kept in a flat ``bytearray``; the shared prefix and suffix
+    (usually most of a read-aloud attempt) are matched up front so the
+    quadratic part only covers the stretch where the two differ.
+    """
+    ids = {}
+    ref = array('l', (ids.setdefault(w, len(ids)) for w in reference))
+    hyp = array('l', (ids.setdefault(w, len(ids)) for w in spoken))
+
+    start = 0
+    while start < len(ref) and start < len(hyp) and ref[start] == hyp[start]:
+        start += 1
+    end_ref, end_hyp = len(ref), len(hyp)
+    while end_ref > start and end_hyp > start and ref[end_ref - 1] == hyp[end_hyp - 1]:
+        end_ref -= 1
+        end_hyp -= 1
+
+    r = ref[start:end_ref]
+    h = hyp[start:end_hyp]
+    n, m = len(r), len(h)
+    width = m + 1
+    moves = bytearray((n + 1) * width)
+    for j in range(1, width):
+        moves[j] = INSERT
+    previous = array('l', range(width))
+    for i in range(1, n + 1):
+        current = array('l', [i]) * width
+        moves[i * width] = OMIT
+        word = r[i - 1]
+        row = i * width
+        for j in range(1, width):
+            same = word == h[j - 1]
+            diagonal = previous[j - 1] + (not same)
+            omit = previous[j] + 1
+            insert = current[j - 1] + 1
+            # On ties prefer a match, then a skipped/extra word, then a
+            # substitution: "the lazy" read as "a lazy lazy" is one misread
+            # word plus a repeat, not two misreads
+            if same and diagonal <= omit and diagonal <= insert:
+                current[j] = diagonal
+                moves[row + j] = MATCH
+            elif omit <= insert and omit <= diagonal:
+                current[j] = omit
+                moves[row + j] = OMIT
+            elif insert <= diagonal:
+                current[j] = insert
+                moves[row + j] = INSERT
+            else:
+                current[j] = diagonal
+                moves[row + j] = SUBSTITUTE
+        previous = current
+
+    middle = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        move = moves[i * width + j]
+        if move == MATCH or move == SUBSTITUTE:
+            middle.append((move, reference[start + i - 1], spoken[start + j - 1]))
+            i -= 1
+            j -= 1
+        elif move == OMIT:
+            middle.append((OMIT, reference[start + i - 1], None))
+            i -= 1
+        else:
+            middle.append((INSERT, None, spoken[start + j - 1]))
+            j -= 1
+    middle.reverse()
+
+    head = [(MATCH, w, w) for w in reference[:start]]
+    tail = [(MATCH, w, w) for w in reference[start + n:]]
+    return head + middle + tail
+
+
+def _scale(ratio: float) -> float:
+    """Map a 0..1 ratio onto the 1-10 score range."""
+    return round(1 + 9 * max(0.0, min(1.0, ratio)), 1)
+
+
+def _pace_ratio(wpm: Optional[float]) -> float:
+    low, high = READING_TARGET_WPM
+    if wpm is None:
+        return UNKNOWN_PACE_RATIO
+    if wpm < low:
+        return wpm / low
+    if wpm > high:
+        return high / wpm
+    return 1.0
+
+
+def _quoted(words: List[str]) -> str:
+    return ', '.join(f'"{w}"' for w in words[:3])
+
+
+def score_reading(reference_text: str, transcript: str, duration: Optional[float] = None) -> dict:
+    """Score a read-aloud attempt against the text the learner was shown.
+
+    Returns the same fields as the Gemini analysis (so the frontend and
+    /api/save_feedback/ need no changes) plus a ``reading`` section with the
+    raw alignment statistics.
+    """
+    reference = tokenize(reference_text)
+    spoken = tokenize(transcript)
+    alignment = align(reference, spoken)
+
+    omitted = [ref for op, ref, _ in alignment if op == OMIT]
+    inserted = [hyp for op, _, hyp in alignment if op == INSERT]
+    substituted = [(ref, hyp) for op, ref, hyp in alignment if op == SUBSTITUTE]
+    matched = len(reference) - len(omitted) - len(substituted)
+
+    total = len(reference) or 1
+    accuracy = matched / total
+    # Share of the text the learner attempted, and of the text actually read
+    # correctly: misreads do not count as reading it, so every score is
+    # scaled by one of these and skipping or misreading the text (or not
+    # reading at all) cannot score well
+    attempted = (total - len(omitted)) / total
+    coverage = matched / total
+    wpm = round(len(spoken) / (duration / 60), 1) if duration and duration > 0 else None
+    pace = _pace_ratio(wpm)
+    extra_rate = len(inserted) / total
+
+    grammar_tips = []
+    if substituted:
+        grammar_tips.append(
+            'Check these words: ' + ', '.join(f'"{ref}" (heard "{hyp}")' for ref, hyp in substituted[:3])
+        )
+    if omitted:
+        grammar_tips.append(f'You skipped {_quoted(omitted)}. Follow the text word by word.')
+
+    fluency_tips = []
+    if wpm is not None and wpm < READING_TARGET_WPM[0]:
+        fluency_tips.append(f'You read at {wpm:.0f} words per minute. Try reading a little faster and more smoothly.')
+    elif wpm is not None and wpm > READING_TARGET_WPM[1]:
+        fluency_tips.append(f'You read at {wpm:.0f} words per minute. Slow down so every word is clear.')
+    if inserted:
+        fluency_tips.append(f'Avoid extra words and repeats such as {_quoted(inserted)}.')
+
+    summary = f'You read {matched} of {len(reference)} words correctly ({accuracy:.0%} accuracy).'
+    if wpm is not None:
+        summary += f' Pace: {wpm:.0f} words per minute.'
+
+    return {
+        'grammar_score': _scale(accuracy),
+        'vocabulary_score': _scale((1 - len(substituted) / total) * attempted),
+        'fluency_score': _scale(pace * (1 - extra_rate) * coverage),
+        'topic_relevance_score': _scale(coverage),
+        'grammar_tips': grammar_tips[:2],
+        'fluency_tips': fluency_tips[:2],
+        'summary': summary,
+        'feedback': summary,
+        'transcript': transcript,
+        'reading': {
+            'reference_words': len(reference),
+            'spoken_words': len(spoken),
+            'matched': matched,
+            'accuracy': round(accuracy, 3),
+            'coverage': round(coverage, 3),
+            'omissions': len(omitted),
+            'insertions': len(inserted),
+            'substitutions': len(substituted),
+            'words_per_minute': wpm,
+        },
+    }
@@ -0,0 +1,50 @@
+import os
+
+from redis import ConnectionPool, Redis
+from redis.asyncio import ConnectionPool as AsyncConnectionPool
+from redis.asyncio import Redis as AsyncRedis
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import ExponentialBackoff
+from redis.retry import Retry
+from rq import Queue
+
+
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', '50'))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', '30'))
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', '5'))
+REDIS_CONNECT_TIMEOUT = float(os.getenv('REDIS_CONNECT_TIMEOUT', '2'))
+REDIS_RETRIES = int(os.getenv('REDIS_RETRIES', '3'))
+
+POOL_KWARGS = dict(
+    max_connections=REDIS_MAX_CONNECTIONS,
+    health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+    socket_keepalive=True,
+)
+
+# Process-wide pools: every endpoint, cache and job shares these instead of
+# opening a fresh connection per request.
+sync_pool = ConnectionPool.from_url(
+    REDIS_URL,
+    retry=Retry(ExponentialBackoff(cap=1, base=0.05), REDIS_RETRIES),
+    **POOL_KWARGS,
+)
+async_pool = AsyncConnectionPool.from_url(
+    REDIS_URL,
+    retry=AsyncRetry(ExponentialBackoff(cap=1, base=0.05), REDIS_RETRIES),
+    **POOL_KWARGS,
+)
+
+# Blocking client for RQ and sync handlers; async client for async handlers
+redis_conn = Redis(connection_pool=sync_pool)
+async_redis = AsyncRedis(connection_pool=async_pool)
+
+job_queue = Queue('default', connection=redis_conn)
+
+
+async def close_async_redis():
+    """Drop async connections; they are bound to the event loop that made them."""
+    await async_redis.aclose()
+    await async_pool.disconnect()
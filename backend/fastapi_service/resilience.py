@@ -0,0 +1,238 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+import httpx
+from prometheus_client import Counter, Gauge
+from starlette.exceptions import HTTPException
+
+from .logs import get_logger
+
+
+log = get_logger('breaker')
+
+
+BREAKER_WINDOW = int(os.getenv('BREAKER_WINDOW', '20'))
+BREAKER_MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', '10'))
+BREAKER_FAILURE_RATE = float(os.getenv('BREAKER_FAILURE_RATE', '0.5'))
+BREAKER_OPEN_SECONDS = float(os.getenv('BREAKER_OPEN_SECONDS', '30'))
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = Gauge(
+    's2s_circuit_state',
+    'Circuit breaker state per provider (0 closed, 1 half-open, 2 open)',
+    ['provider'],
+    multiprocess_mode='livemax',
+)
+CIRCUIT_REJECTED = Counter(
+    's2s_circuit_rejected_total',
+    'Calls failed fast by an open circuit breaker',
+    ['provider'],
+)
+HEDGED_REQUESTS = Counter(
+    's2s_hedged_requests_total',
+    'Hedged duplicate requests fired, and how many of them answered first',
+    ['provider', 'outcome'],
+)
+
+
+class CircuitOpen(HTTPException):
+    """A provider's breaker is open; rendered as 503 with Retry-After."""
+
+    def __init__(self, provider: str, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail=f'{provider} is unavailable, please retry in {retry_after}s',
+            headers={'Retry-After': str(retry_after)},
+        )
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+def is_provider_fault(exc: BaseException) -> bool:
+    """Whether ``exc`` says the provider is unhealthy (and should count against its breaker).
+
+    Connection errors, timeouts and 5xx answers do; 4xx answers (a rejected
+    upload, a bad request for one user's input) and local errors do not.
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError))
+
+
+class CallResult:
+    """Handle yielded by ``CircuitBreaker.guard`` to flag soft failures."""
+
+    def __init__(self):
+        self.ok = True
+
+    def failed(self):
+        self.ok = False
+
+
+class CircuitBreaker:
+    """Per-provider breaker over a rolling window of recent calls.
+
+    Once at least ``min_calls`` of the last ``window`` calls are recorded and
+    the share of failures (errors, and calls slower than ``slow_call`` when
+    set) reaches ``failure_rate``, the breaker opens and calls fail fast with
+    ``CircuitOpen`` for ``open_seconds``. After that a single probe call is
+    let through: success closes the breaker, failure opens it again.
+
+    Exceptions listed in ``ignored`` (e.g. our own admission rejections) say
+    nothing about the provider's health and are not recorded.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+        slow_call: Optional[float] = None,
+        ignored: tuple = (),
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.slow_call = slow_call
+        self.ignored = ignored
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)
+        # Durations of successful calls, for hedging delays
+        self._latencies = deque(maxlen=200)
+        self._opened_at = 0.0
+        self._probing = False
+        CIRCUIT_STATE.labels(provider=self.name).set(STATE_VALUES[self.state])
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            log.warning("%s: %s -> %s", self.name, self.state, state)
+        self.state = state
+        CIRCUIT_STATE.labels(provider=self.name).set(STATE_VALUES[state])
+
+    def _reject(self) -> CircuitOpen:
+        CIRCUIT_REJECTED.labels(provider=self.name).inc()
+        remaining = self._opened_at + self.open_seconds - time.monotonic()
+        return CircuitOpen(self.name, max(1, math.ceil(remaining)))
+
+    def check(self):
+        """Raise ``CircuitOpen`` if a call made now would be refused."""
+        if self.state == OPEN and time.monotonic() < self._opened_at + self.open_seconds:
+            raise self._reject()
+        if self.state == HALF_OPEN and self._probing:
+            raise self._reject()
+
+    def _admit(self) -> bool:
+        """Let a call through; returns True if it is the half-open probe."""
+        self.check()
+        if self.state == OPEN:
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            self._probing = True
+            return True
+        return False
+
+    def _record(self, ok: bool, duration: float, probe: bool):
+        if ok and self.slow_call is not None and duration > self.slow_call:
+            ok = False
+        if ok:
+            self._latencies.append(duration)
+        if probe:
+            self._probing = False
+            if ok:
+                self._outcomes.clear()
+                self._set_state(CLOSED)
+            else:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+            return
+
+        self._outcomes.append(ok)
+        failures = self._outcomes.count(False)
+        if (
+            self.state == CLOSED
+            and len(self._outcomes) >= self.min_calls
+            and failures / len(self._outcomes) >= self.failure_rate
+        ):
+            self._opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    @asynccontextmanager
+    async def guard(self):
+        """Run one provider call under the breaker.
+
+        Exceptions count as failures; call ``failed()`` on the yielded handle
+        for calls that return normally but produced nothing usable.
+        """
+        probe = self._admit()
+        result = CallResult()
+        started = time.monotonic()
+        try:
+            yield result
+        except (asyncio.CancelledError,) + self.ignored:
+            # A cancelled call (lost hedge, client gone) says nothing either
+            if probe:
+                self._probing = False
+            raise
+        except BaseException:
+            self._record(False, time.monotonic() - started, probe)
+            raise
+        self._record(result.ok, time.monotonic() - started, probe)
+
+    def latency_quantile(self, q: float, min_samples: int = 20) -> Optional[float]:
+        """``q`` quantile of recent successful call durations, if known."""
+        if len(self._latencies) < min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> dict:
+        return {
+            'state': self.state,
+            'recent_calls': len(self._outcomes),
+            'recent_failures': self._outcomes.count(False),
+            'p95_seconds': self.latency_quantile(0.95),
+        }
+
+
+async def hedged(call: Callable[[], Awaitable], delay: float, provider: str = ''):
+    """Await ``call()``, firing a duplicate if no answer came after ``delay``.
+
+    Whichever attempt succeeds first wins and the other is cancelled. If one
+    attempt fails, the other one is still awaited; only when both fail does
+    the first error propagate.
+    """
+    primary = asyncio.ensure_future(call())
+    attempts = {primary}
+    try:
+        done, _ = await asyncio.wait(attempts, timeout=delay)
+        if done:
+            return primary.result()
+
+        HEDGED_REQUESTS.labels(provider=provider, outcome='fired').inc()
+        backup = asyncio.ensure_future(call())
+        attempts.add(backup)
+        pending = set(attempts)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is backup:
+                        HEDGED_REQUESTS.labels(provider=provider, outcome='won').inc()
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in attempts:
+            if not task.done():
+                task.cancel()
@@ -1,69 +1,151 @@
-import os
-import json
-from rq import Queue
-from redis import Redis
-from time import sleep
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Optional
 
-# Setup Redis connection (use REDIS_URL env var or default to localhost)
-redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
-redis_conn = Redis.from_url(redis_url)
-q = Queue('default', connection=redis_conn)
+from rq import get_current_job
 
-# Dummy wrapper functions that will be enqueued. These should call the same
-# internal functions used by your FastAPI endpoints (transcribe/analyze).
+# First: loads backend/.env before other modules read their settings
+from . import env  # noqa: F401
+from .blobstore import BlobNotFound, blob_store
+from .job_events import publish_job_event
+from .metrics import JOB_DURATION, QUEUE_WAIT_SECONDS, mode_label, set_request_labels
+from .persistence import feedback_sink
+from .redis_pool import async_redis, job_queue
 
-def transcribe_and_analyze(audio_bytes: bytes, topic: str, mode: str = 'speak'):
+# Persistent event loop installed by the async worker (worker.py). With a
+# plain `rq worker` it stays None and each job gets a short-lived loop.
+job_loop = None
+
+
+def set_job_loop(loop):
+    global job_loop
+    job_loop = loop
+
+
+async def _transcribe_and_analyze(audio_ref: str, topic: str, mode: str, reference_text, duration, progress) -> dict:
+    # Import here to avoid circular imports at module import time
+    from .main import analyze_reading_locally, analyze_with_gemini, transcribe_with_assemblyai
+    from .reading import tokenize
+
+    await progress('uploading')
+    try:
+        with blob_store.open(audio_ref) as audio:
+            transcript = await transcribe_with_assemblyai(audio, progress=progress)
+    except BlobNotFound:
+        return {'error': 'audio_not_found'}
+    if not transcript:
+        return {'error': 'transcription_failed'}
+
+    await progress('analyzing')
+    if mode == 'read' and reference_text and tokenize(reference_text):
+        return await analyze_reading_locally(transcript, reference_text, duration)
+    return await analyze_with_gemini(transcript, topic, mode)
+
+
+async def process_job(
+    audio_ref: str,
+    topic: str,
+    mode: str = 'speak',
+    job_id: Optional[str] = None,
+    reference_text: Optional[str] = None,
+    duration: Optional[float] = None,
+    user_id: Optional[int] = None,
+    level_id: Optional[int] = None,
+) -> dict:
+    """Transcribe and analyze one stored recording.
+
+    When ``job_id`` is given, each stage is published as a job event (see
+    job_events.py) for /api/job_events/ and /ws/job_events/ subscribers.
+    With ``user_id`` and ``level_id`` (verified when the job was queued) a
+    successful analysis is also saved as the user's Feedback, and Django's
+    answer is added to the result as ``saved_feedback``.
+    """
+    set_request_labels('worker', mode)
+
+    async def progress(state: str, **data):
+        if job_id is not None:
+            await publish_job_event(async_redis, job_id, state, **data)
+
+    try:
+        result = await _transcribe_and_analyze(audio_ref, topic, mode, reference_text, duration, progress)
+    except (Exception, asyncio.CancelledError) as e:
+        # Unexpected errors and job timeouts still fail the job in RQ
+        await progress('failed', error=type(e).__name__)
+        raise
+
+    if 'error' in result:
+        await progress('failed', error=result['error'])
+        return result
+
+    if user_id is not None and level_id is not None:
+        await progress('saving')
+        result = {**result, 'saved_feedback': await feedback_sink.save(user_id, level_id, result)}
+    await progress('done', result=result)
+    return result
+
+
+def _observe_queue_wait(enqueued_at: datetime, mode: str):
+    # RQ stores naive UTC timestamps
+    if enqueued_at.tzinfo is None:
+        enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+    waited = (datetime.now(timezone.utc) - enqueued_at).total_seconds()
+    QUEUE_WAIT_SECONDS.labels(mode=mode_label(mode)).observe(max(0.0, waited))
+
+
+def transcribe_and_analyze(
+    audio_ref: str,
+    topic: str,
+    mode: str = 'speak',
+    reference_text: Optional[str] = None,
+    duration: Optional[float] = None,
+    user_id: Optional[int] = None,
+    level_id: Optional[int] = None,
+):
     """Background job to transcribe audio and analyze using external APIs.
 
-    This imports local functions to keep consistency with main service logic.
+    ``audio_ref`` is a blob store reference (see blobstore.py); the audio is
+    memory-mapped from the shared disk, or read from Redis without one.
+
+    Unexpected exceptions propagate so RQ marks the job as failed (with
+    exc_info) instead of reporting an error dict as a successful result.
     """
+    # The current job is tracked per thread, so look it up before handing
+    # the work to the event loop
+    job = get_current_job()
+    job_id = job.id if job is not None else None
+    if job is not None and job.enqueued_at is not None:
+        _observe_queue_wait(job.enqueued_at, mode)
+
+    started = time.perf_counter()
+    status = 'error'
     try:
-        # Import here to avoid circular imports at module import time
-        from .main import transcribe_with_assemblyai, analyze_with_gemini
+        if job_loop is not None:
+            result = job_loop.run(
+                process_job(audio_ref, topic, mode, job_id, reference_text, duration, user_id, level_id),
+                timeout=job.timeout if job is not None else None,
+            )
+        else:
+            from .main import close_clients
 
-        # Run the async functions using a fresh event loop in the worker process
-        try:
-            import asyncio
             loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            transcript = loop.run_until_complete(transcribe_with_assemblyai(audio_bytes))
-            if not transcript:
-                return {'error': 'transcription_failed'}
-
-            # If webhook mode was used, transcribe_with_assemblyai returns
-            # a special marker: '__webhook_pending__:<assemblyai_id>'. In that
-            # case wait for the webhook handler to store the result in Redis.
-            if isinstance(transcript, str) and transcript.startswith('__webhook_pending__:'):
-                _, aid = transcript.split(':', 1)
-                key = f'assemblyai:result:{aid}'
-                # wait up to 120 seconds for webhook to populate
-                waited = 0
-                final_payload = None
-                while waited < 120:
-                    raw = redis_conn.get(key)
-                    if raw:
-                        try:
-                            final_payload = json.loads(raw)
-                            break
-                        except Exception:
-                            final_payload = None
-                            break
-                    sleep(1)
-                    waited += 1
-                if not final_payload:
-                    return {'error': 'transcription_webhook_timeout'}
-                transcript = final_payload.get('text') or ''
-                if not transcript:
-                    return {'error': 'transcription_empty_after_webhook'}
-            analysis = loop.run_until_complete(analyze_with_gemini(transcript, topic, mode))
-            return analysis
-        except Exception as e:
-            return {'error': str(e)}
-    except Exception as e:
-        return {'error': str(e)}
+            try:
+                result = loop.run_until_complete(
+                    process_job(audio_ref, topic, mode, job_id, reference_text, duration, user_id, level_id)
+                )
+            finally:
+                # Pooled clients are bound to this loop; release them with it
+                loop.run_until_complete(close_clients())
+                loop.close()
+        status = 'failed' if 'error' in result else 'done'
+        return result
+    finally:
+        JOB_DURATION.labels(mode=mode_label(mode), status=status).observe(time.perf_counter() - started)
+        blob_store.maybe_gc()
 
 
 def enqueue_transcription(audio_bytes: bytes, topic: str, mode: str = 'speak'):
     """Enqueue a transcription+analysis job and return job id"""
-    job = q.enqueue(transcribe_and_analyze, audio_bytes, topic, mode)
-    return job.get_id()
\ No newline at end of file
+    audio_ref = blob_store.put_bytes(audio_bytes)
+    job = job_queue.enqueue(transcribe_and_analyze, audio_ref, topic, mode)
+    return job.id
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from fastapi_service.admission import AdmissionLimiter, LoadSheddingMiddleware, Overloaded
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def hold(limiter, release, order=None, name=None):
+    async with limiter.slot():
+        if order is not None:
+            order.append(name)
+        await release.wait()
+
+
+def test_waiters_are_served_in_order():
+    limiter = AdmissionLimiter('test', max_concurrent=1, max_waiting=3, wait_timeout=5)
+    order = []
+
+    async def scenario():
+        releases = [asyncio.Event() for _ in range(3)]
+        tasks = []
+        for i, release in enumerate(releases):
+            tasks.append(asyncio.ensure_future(hold(limiter, release, order, i)))
+            await asyncio.sleep(0)
+        assert limiter.stats() == {'in_flight': 1, 'waiting': 2, 'max_concurrent': 1, 'max_waiting': 3}
+        for release in reversed(releases):
+            release.set()
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*tasks)
+
+    run(scenario())
+    assert order == [0, 1, 2]
+    assert limiter.stats()['in_flight'] == 0
+
+
+def test_full_queue_is_refused_with_429():
+    limiter = AdmissionLimiter('test', max_concurrent=1, max_waiting=1, wait_timeout=5)
+
+    async def scenario():
+        release = asyncio.Event()
+        tasks = [asyncio.ensure_future(hold(limiter, release)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert limiter.saturated
+        with pytest.raises(Overloaded) as refused:
+            await limiter.acquire()
+        assert refused.value.status_code == 429
+        assert int(refused.value.headers['Retry-After']) >= 1
+        release.set()
+        await asyncio.gather(*tasks)
+
+    run(scenario())
+
+
+def test_wait_timeout_is_refused_with_503():
+    limiter = AdmissionLimiter('test', max_concurrent=1, max_waiting=1, wait_timeout=0.05)
+
+    async def scenario():
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(limiter, release))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as refused:
+            await limiter.acquire()
+        assert refused.value.status_code == 503
+        assert limiter.stats()['waiting'] == 0
+        release.set()
+        await holder
+
+    run(scenario())
+    assert limiter.stats()['in_flight'] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    limiter = AdmissionLimiter('test', max_concurrent=1, max_waiting=2, wait_timeout=5)
+
+    async def scenario():
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(limiter, release))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.stats()['waiting'] == 0
+        release.set()
+        await holder
+
+    run(scenario())
+    assert limiter.stats()['in_flight'] == 0
+
+
+def test_shedding_middleware_answers_before_reading_body():
+    limiter = AdmissionLimiter('test', max_concurrent=0, max_waiting=0)
+    called, sent = [], []
+
+    async def app(scope, receive, send):
+        called.append(scope['path'])
+
+    async def receive():
+        raise AssertionError('body must not be read')
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = LoadSheddingMiddleware(app, limiter, paths=['/api/analyze_speech/'])
+    run(middleware({'type': 'http', 'path': '/api/analyze_speech/'}, receive, send))
+    run(middleware({'type': 'http', 'path': '/health'}, receive, send))
+
+    assert sent[0]['status'] == 429
+    assert (b'retry-after', b'1') in sent[0]['headers']
+    assert called == ['/health']
@@ -0,0 +1,60 @@
+import asyncio
+
+from fastapi_service import jsonlib, main
+from fastapi_service.cache import TwoTierCache
+from fastapi_service.gemini import GeminiProvider
+
+
+ANALYSIS_FIELDS = {
+    'grammar_score', 'vocabulary_score', 'fluency_score', 'topic_relevance_score',
+    'grammar_tips', 'fluency_tips', 'summary', 'feedback', 'transcript',
+}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def packed_answer(count):
+    return jsonlib.dumps([
+        {
+            'id': n, 'grammar_score': 7, 'vocabulary_score': 6, 'fluency_score': 8,
+            'topic_relevance_score': 9, 'grammar_tips': ['a'], 'fluency_tips': ['b'],
+            'summary': f'speech {n}', 'confidence': 'high',
+        }
+        for n in range(1, count + 1)
+    ])
+
+
+def test_packed_answers_round_trip_through_cache_without_extra_keys(monkeypatch):
+    prompts = []
+
+    async def fake_generate(prompt):
+        prompts.append(prompt)
+        return packed_answer(2)
+
+    monkeypatch.setattr(main, 'gemini', GeminiProvider(api_key='test-key'))
+    monkeypatch.setattr(main, 'gemini_generate', fake_generate)
+    monkeypatch.setattr(main, 'analysis_cache', TwoTierCache('test-analysis', ttl=60, max_entries=10))
+    items = [main.BatchItem(transcript=f'I like trains {n}', topic='Hobbies') for n in range(2)]
+
+    async def scenario():
+        streamed = [analysis async for _, analysis in main.analyze_batch(items)]
+        # A later single analysis of the same speech is a cache hit
+        single = await main.analyze_with_gemini(items[1].transcript, 'Hobbies')
+        return streamed, single
+
+    streamed, single = run(scenario())
+    assert len(prompts) == 1
+    for analysis in streamed + [single]:
+        assert set(analysis) == ANALYSIS_FIELDS
+    assert single['summary'] == 'speech 2'
+    assert single['transcript'] == 'I like trains 1'
+
+
+def test_normalize_analysis_clamps_and_drops_unknown_fields():
+    analysis = main.normalize_analysis({'id': 3, 'grammar_score': 14, 'fluency_tips': ['a', 'b', 'c']}, 'hello')
+    assert set(analysis) == ANALYSIS_FIELDS
+    assert analysis['grammar_score'] == 10
+    assert analysis['vocabulary_score'] == 5
+    assert analysis['fluency_tips'] == ['a', 'b']
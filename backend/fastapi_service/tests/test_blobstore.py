@@ -0,0 +1,45 @@
+import io
+
+import fakeredis
+import pytest
+
+from fastapi_service.blobstore import BlobNotFound, BlobStore, BlobTooLarge, RedisBlobStore
+
+
+@pytest.fixture(params=['disk', 'redis'])
+def store(request, tmp_path):
+    if request.param == 'disk':
+        return BlobStore(str(tmp_path), ttl=60)
+    return RedisBlobStore(fakeredis.FakeRedis(), ttl=60, max_bytes=1024)
+
+
+def test_round_trip(store):
+    ref = store.put_file(io.BytesIO(b'audio'))
+    assert ref == store.put_bytes(b'audio')
+    with store.open(ref) as audio:
+        assert bytes(audio) == b'audio'
+
+
+def test_unknown_ref(store):
+    with pytest.raises(BlobNotFound):
+        with store.open('0' * 64):
+            pass
+    with pytest.raises(BlobNotFound):
+        with store.open('../etc/passwd'):
+            pass
+
+
+def test_redis_store_refuses_large_recordings():
+    redis = fakeredis.FakeRedis()
+    store = RedisBlobStore(redis, ttl=60, max_bytes=4)
+    with pytest.raises(BlobTooLarge):
+        store.put_file(io.BytesIO(b'12345'))
+    with pytest.raises(BlobTooLarge):
+        store.put_bytes(b'12345')
+    assert redis.keys() == []
+
+
+def test_redis_store_expires_blobs():
+    redis = fakeredis.FakeRedis()
+    ref = RedisBlobStore(redis, ttl=60).put_bytes(b'audio')
+    assert 0 < redis.ttl(f'audio_blob:{ref}') <= 60
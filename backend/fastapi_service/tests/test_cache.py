@@ -0,0 +1,141 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from fastapi_service.cache import TwoTierCache, content_key
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Provider:
+    """Stand-in upstream call that counts invocations."""
+
+    def __init__(self, value='result', delay=0.02, error=None):
+        self.calls = 0
+        self.value = value
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = TwoTierCache('test', ttl=60, max_entries=10)
+    provider = Provider()
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_compute('k', provider) for _ in range(5)))
+
+    assert run(scenario()) == ['result'] * 5
+    assert provider.calls == 1
+    assert cache.stats()['inflight'] == 0
+
+    # Later callers are served from the local tier
+    assert run(cache.get_or_compute('k', provider)) == 'result'
+    assert provider.calls == 1
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = TwoTierCache('test', ttl=60, max_entries=10)
+    provider = Provider(error=RuntimeError('provider down'))
+
+    async def scenario():
+        return await asyncio.gather(
+            *(cache.get_or_compute('k', provider) for _ in range(3)), return_exceptions=True,
+        )
+
+    results = run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert provider.calls == 1
+
+    provider.error = None
+    assert run(cache.get_or_compute('k', provider)) == 'result'
+    assert provider.calls == 2
+
+
+def test_rejected_values_are_not_stored():
+    cache = TwoTierCache('test', ttl=60, max_entries=10)
+    provider = Provider(value={'error': 'no speech'})
+    should_store = lambda value: 'error' not in value  # noqa: E731
+
+    run(cache.get_or_compute('k', provider, should_store))
+    run(cache.get_or_compute('k', provider, should_store))
+    assert provider.calls == 2
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    cache = TwoTierCache('test', ttl=60, max_entries=10)
+    provider = Provider(delay=0.05)
+
+    async def scenario():
+        first = asyncio.ensure_future(cache.get_or_compute('k', provider))
+        second = asyncio.ensure_future(cache.get_or_compute('k', provider))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert run(scenario()) == 'result'
+    assert provider.calls == 1
+
+
+def test_redis_tier_is_shared_between_processes():
+    redis = fakeredis.aioredis.FakeRedis()
+    provider = Provider(value={'text': 'hello'})
+
+    async def scenario():
+        writer = TwoTierCache('test', ttl=60, max_entries=10, redis=redis)
+        reader = TwoTierCache('test', ttl=60, max_entries=10, redis=redis)
+        await writer.get_or_compute('k', provider)
+        assert await reader.get_or_compute('k', provider) == {'text': 'hello'}
+        assert 0 < await redis.ttl('cache:test:k') <= 60
+        return reader.stats()
+
+    stats = run(scenario())
+    assert provider.calls == 1
+    assert stats['hits'] == 1 and stats['local_entries'] == 1
+
+
+def test_unreachable_redis_degrades_to_local_tier():
+    class DownRedis:
+        async def get(self, key):
+            raise ConnectionError('down')
+
+        async def ttl(self, key):
+            raise ConnectionError('down')
+
+        async def set(self, key, value, ex=None):
+            raise ConnectionError('down')
+
+    cache = TwoTierCache('test', ttl=60, max_entries=10, redis=DownRedis())
+    provider = Provider()
+    assert run(cache.get_or_compute('k', provider)) == 'result'
+    assert run(cache.get_or_compute('k', provider)) == 'result'
+    assert provider.calls == 1
+
+
+def test_local_tier_evicts_least_recently_used():
+    cache = TwoTierCache('test', ttl=60, max_entries=2)
+
+    async def scenario():
+        await cache.set('a', 1)
+        await cache.set('b', 2)
+        await cache.get('a')
+        await cache.set('c', 3)
+        return [await cache.get(key) for key in 'abc']
+
+    assert run(scenario()) == [1, None, 3]
+
+
+def test_content_key_separates_parts():
+    assert content_key(b'ab', 'c') != content_key(b'a', 'bc')
+    assert content_key({'b': 1, 'a': 2}) == content_key({'a': 2, 'b': 1})
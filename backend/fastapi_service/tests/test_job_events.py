@@ -0,0 +1,117 @@
+import asyncio
+
+import fakeredis
+from fastapi.testclient import TestClient
+
+from fastapi_service import main
+from fastapi_service.job_events import JobEventHub, publish_job_event
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def collect(hub, job_id, timeout=2):
+    events = []
+    async for event in hub.stream(job_id, timeout):
+        if event is not None:
+            events.append(event['state'])
+    return events
+
+
+def test_stream_replays_stored_state_then_follows_to_terminal():
+    async def scenario():
+        redis = fakeredis.aioredis.FakeRedis()
+        hub = JobEventHub(redis)
+        try:
+            await publish_job_event(redis, 'j1', 'transcribing')
+            streaming = asyncio.ensure_future(collect(hub, 'j1'))
+            await asyncio.sleep(0.05)
+            for state in ('analyzing', 'done', 'uploading'):
+                await publish_job_event(redis, 'j1', state)
+            return await streaming
+        finally:
+            await hub.stop()
+
+    assert run(scenario()) == ['transcribing', 'analyzing', 'done']
+
+
+def test_terminal_replay_closes_stream_at_once():
+    async def scenario():
+        redis = fakeredis.aioredis.FakeRedis()
+        hub = JobEventHub(redis)
+        try:
+            await publish_job_event(redis, 'j1', 'failed', error='transcription_failed')
+            return await collect(hub, 'j1', timeout=30)
+        finally:
+            await hub.stop()
+
+    assert run(scenario()) == ['failed']
+
+
+def test_events_racing_the_replay_are_not_repeated_or_reordered():
+    class RacingHub(JobEventHub):
+        async def _current_state(self, job_id):
+            # Published between subscribing and reading the stored state:
+            # queued for this stream, and the later one is what gets stored
+            for queue in self._subscribers[job_id]:
+                queue.put_nowait({'job_id': job_id, 'state': 'transcribing'})
+                queue.put_nowait({'job_id': job_id, 'state': 'analyzing'})
+            return {'job_id': job_id, 'state': 'analyzing'}
+
+    async def scenario():
+        redis = fakeredis.aioredis.FakeRedis()
+        hub = RacingHub(redis)
+        try:
+            streaming = asyncio.ensure_future(collect(hub, 'j1'))
+            await asyncio.sleep(0.05)
+            await publish_job_event(redis, 'j1', 'done', result={})
+            return await streaming
+        finally:
+            await hub.stop()
+
+    assert run(scenario()) == ['analyzing', 'done']
+
+
+def test_fallback_supplies_state_of_unknown_jobs():
+    async def fallback():
+        return {'job_id': 'old', 'state': 'not_found'}
+
+    async def scenario():
+        hub = JobEventHub(fakeredis.aioredis.FakeRedis())
+        try:
+            return [event async for event in hub.stream('old', 30, fallback=fallback)]
+        finally:
+            await hub.stop()
+
+    assert run(scenario()) == [{'job_id': 'old', 'state': 'not_found'}]
+
+
+def test_start_closes_pubsub_of_dead_listener():
+    async def scenario():
+        hub = JobEventHub(fakeredis.aioredis.FakeRedis())
+        await hub.start()
+        old = hub._pubsub
+        hub._listener.cancel()
+        await asyncio.sleep(0)
+        await hub.start()
+        replaced = hub._pubsub is not old and old.connection is None
+        await hub.stop()
+        return replaced
+
+    assert run(scenario())
+
+
+def test_sse_and_websocket_endpoints_replay_finished_job(monkeypatch):
+    redis = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr(main, 'job_events', JobEventHub(redis))
+    run(publish_job_event(redis, 'j1', 'done', result={'grammar_score': 7}))
+    client = TestClient(main.app)
+
+    response = client.get('/api/job_events/j1')
+    assert response.headers['content-type'].startswith('text/event-stream')
+    assert response.text.startswith('event: done\ndata: ')
+    assert '"grammar_score":7' in response.text.replace(' ', '')
+
+    with client.websocket_connect('/ws/job_events/j1') as websocket:
+        assert websocket.receive_json() == {'job_id': 'j1', 'state': 'done', 'result': {'grammar_score': 7}}
@@ -0,0 +1,28 @@
+from fastapi_service.lexical import FULL_LIST_WORDS, LexicalScorer, lexical_scorer
+
+
+ANSWER = 'We visited the old harbour and watched enormous ships unloading colourful containers.'
+
+
+def table(size):
+    words = ['we', 'the', 'and', 'old'] + [f'filler{i}' for i in range(size - 4)]
+    return {'en': {word: min(rank // 100, 2) for rank, word in enumerate(words)}}
+
+
+def test_band_weight_follows_list_length():
+    short = LexicalScorer(table(400)).features([ANSWER], [''])
+    full = LexicalScorer(table(FULL_LIST_WORDS)).features([ANSWER], [''])
+    assert short['band_weight'][0] == 400 / FULL_LIST_WORDS
+    assert full['band_weight'][0] == 1.0
+
+
+def test_short_list_cannot_inflate_vocabulary():
+    # Against a tiny list almost every word is "rare"; that should count for little
+    short = LexicalScorer(table(400)).score(ANSWER)
+    full = LexicalScorer(table(FULL_LIST_WORDS)).score(ANSWER)
+    assert short['vocabulary_score'] < full['vocabulary_score']
+
+
+def test_bundled_tables_load():
+    assert {'en', 'de'} <= set(lexical_scorer.tables)
+    assert lexical_scorer.tables['en']['the'] == 0
@@ -0,0 +1,96 @@
+import pytest
+
+from fastapi_service.reading import INSERT, MATCH, OMIT, SUBSTITUTE, align, score_reading, tokenize
+
+
+TEXT = ' '.join(f'word{i}' for i in range(50))
+
+
+def ops(reference, spoken):
+    return [op for op, _, _ in align(tokenize(reference), tokenize(spoken))]
+
+
+def test_tokenize_drops_punctuation_and_case():
+    assert tokenize("Don’t stop, Emma!") == ["don't", 'stop', 'emma']
+
+
+def test_align_exact_read():
+    assert ops('the quick brown fox', 'The quick, brown fox.') == [MATCH] * 4
+
+
+def test_align_omission_insertion_substitution():
+    assert ops('the quick brown fox', 'the brown fox') == [MATCH, OMIT, MATCH, MATCH]
+    assert ops('the quick brown fox', 'the quick quick brown fox') == [MATCH, MATCH, INSERT, MATCH, MATCH]
+    assert ops('the quick brown fox', 'the quack brown fox') == [MATCH, SUBSTITUTE, MATCH, MATCH]
+
+
+def test_align_prefers_repeat_over_two_misreads():
+    assert sorted(ops('the lazy dog', 'a lazy lazy dog')) == [MATCH, MATCH, SUBSTITUTE, INSERT]
+
+
+def test_align_keeps_reading_order():
+    alignment = align(tokenize('one two three'), tokenize('one three four'))
+    assert [(ref, hyp) for _, ref, hyp in alignment] == [
+        ('one', 'one'), ('two', None), ('three', 'three'), (None, 'four'),
+    ]
+
+
+def test_perfect_reading_at_target_pace():
+    # 50 words in 20 s = 150 wpm
+    analysis = score_reading(TEXT, TEXT, duration=20)
+    assert analysis['grammar_score'] == analysis['vocabulary_score'] == analysis['fluency_score'] == 10.0
+    assert analysis['topic_relevance_score'] == 10.0
+    assert analysis['reading']['coverage'] == 1.0
+
+
+def test_empty_reading_scores_minimum():
+    analysis = score_reading('Hello world', '', duration=5)
+    for name in ('grammar_score', 'vocabulary_score', 'fluency_score', 'topic_relevance_score'):
+        assert analysis[name] == 1.0
+    assert analysis['reading']['omissions'] == 2
+
+
+def test_partial_reading_scores_low():
+    analysis = score_reading(TEXT, 'word0', duration=0.5)
+    for name in ('grammar_score', 'vocabulary_score', 'fluency_score', 'topic_relevance_score'):
+        assert analysis[name] < 2
+    assert analysis['reading']['coverage'] == pytest.approx(0.02)
+
+
+def test_half_reading_scores_half():
+    half = ' '.join(TEXT.split()[:25])
+    analysis = score_reading(TEXT, half, duration=10)
+    assert analysis['vocabulary_score'] == analysis['fluency_score'] == 5.5
+
+
+def test_unknown_duration_is_not_perfect_pace():
+    known = score_reading(TEXT, TEXT, duration=20)
+    unknown = score_reading(TEXT, TEXT)
+    assert unknown['reading']['words_per_minute'] is None
+    assert unknown['fluency_score'] < known['fluency_score']
+    assert unknown['fluency_score'] > score_reading(TEXT, TEXT, duration=120)['fluency_score']
+
+
+def test_misreads_lower_scores_by_their_share():
+    spoken = TEXT.replace('word3 ', 'wort3 ').replace('word7 ', 'wort7 ')
+    analysis = score_reading(TEXT, spoken, duration=20)
+    assert analysis['reading']['substitutions'] == 2
+    assert analysis['reading']['coverage'] == 0.96
+    assert analysis['vocabulary_score'] == analysis['topic_relevance_score'] == 9.6
+
+
+def test_reading_something_else_scores_minimum():
+    # Right length and pace, but not a single word of the text
+    spoken = ' '.join(f'other{i}' for i in range(50))
+    analysis = score_reading(TEXT, spoken, duration=20)
+    assert analysis['reading']['substitutions'] == 50
+    for name in ('grammar_score', 'vocabulary_score', 'fluency_score', 'topic_relevance_score'):
+        assert analysis[name] == 1.0
+
+
+def test_mostly_misread_text_scores_low():
+    words = TEXT.split()
+    spoken = ' '.join(word if i % 10 == 0 else f'other{i}' for i, word in enumerate(words))
+    analysis = score_reading(TEXT, spoken, duration=20)
+    for name in ('grammar_score', 'vocabulary_score', 'fluency_score', 'topic_relevance_score'):
+        assert analysis[name] < 2.5
@@ -0,0 +1,209 @@
+import asyncio
+
+import httpx
+import pytest
+
+from fastapi_service import main
+from fastapi_service.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen, hedged, is_provider_fault
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def status_error(code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request('POST', 'https://provider.test/')
+    return httpx.HTTPStatusError('error', request=request, response=httpx.Response(code, request=request))
+
+
+async def call(breaker, ok=True, exc=None):
+    async with breaker.guard() as result:
+        if exc is not None:
+            raise exc
+        if not ok:
+            result.failed()
+
+
+def test_breaker_opens_at_failure_rate():
+    breaker = CircuitBreaker('test', window=4, min_calls=4, failure_rate=0.5, open_seconds=60)
+
+    async def scenario():
+        await call(breaker)
+        await call(breaker)
+        await call(breaker, ok=False)
+        assert breaker.state == CLOSED
+        await call(breaker, ok=False)
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpen) as rejected:
+            await call(breaker)
+        assert rejected.value.status_code == 503
+        assert 1 <= rejected.value.retry_after <= 60
+
+    run(scenario())
+
+
+def test_breaker_needs_min_calls():
+    breaker = CircuitBreaker('test', window=10, min_calls=5, failure_rate=0.5)
+
+    async def scenario():
+        for _ in range(4):
+            with pytest.raises(RuntimeError):
+                await call(breaker, exc=RuntimeError('boom'))
+        assert breaker.state == CLOSED
+
+    run(scenario())
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker('test', window=2, min_calls=2, failure_rate=0.5, open_seconds=0)
+
+    async def scenario():
+        await call(breaker, ok=False)
+        await call(breaker, ok=False)
+        assert breaker.state == OPEN
+
+        # Cool-down over: one probe, which fails and reopens the breaker
+        await call(breaker, ok=False)
+        assert breaker.state == OPEN
+
+        probe_started, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_probe():
+            async with breaker.guard():
+                probe_started.set()
+                await release.wait()
+
+        probe = asyncio.ensure_future(slow_probe())
+        await probe_started.wait()
+        assert breaker.state == HALF_OPEN
+        # Only one probe at a time
+        with pytest.raises(CircuitOpen):
+            await call(breaker)
+        release.set()
+        await probe
+        assert breaker.state == CLOSED
+
+    run(scenario())
+
+
+def test_ignored_and_cancelled_calls_are_not_recorded():
+    breaker = CircuitBreaker('test', window=2, min_calls=1, failure_rate=0.5, ignored=(KeyError,))
+
+    async def scenario():
+        with pytest.raises(KeyError):
+            await call(breaker, exc=KeyError('x'))
+        with pytest.raises(asyncio.CancelledError):
+            await call(breaker, exc=asyncio.CancelledError())
+        assert breaker.stats()['recent_calls'] == 0
+        assert breaker.state == CLOSED
+
+    run(scenario())
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker('test', window=1, min_calls=1, failure_rate=1.0, slow_call=0.01)
+
+    async def scenario():
+        async with breaker.guard():
+            await asyncio.sleep(0.03)
+        assert breaker.state == OPEN
+
+    run(scenario())
+
+
+def test_provider_fault_classification():
+    request = httpx.Request('GET', 'https://provider.test/')
+    assert is_provider_fault(httpx.ConnectError('down', request=request))
+    assert is_provider_fault(httpx.ReadTimeout('slow', request=request))
+    assert is_provider_fault(asyncio.TimeoutError())
+    assert is_provider_fault(status_error(502))
+    assert not is_provider_fault(status_error(400))
+    assert not is_provider_fault(ValueError('bad json'))
+
+
+def test_transcript_errors_do_not_trip_assemblyai_breaker(monkeypatch):
+    breaker = CircuitBreaker('assemblyai-test', window=4, min_calls=2, failure_rate=0.5, open_seconds=60)
+    monkeypatch.setattr(main, 'assemblyai_breaker', breaker)
+
+    async def bad_audio(audio, progress=None):
+        return {'status': 'error', 'error': 'no spoken audio'}
+
+    async def rejected_upload(audio, progress=None):
+        raise status_error(422)
+
+    async def outage(audio, progress=None):
+        raise httpx.ConnectError('down')
+
+    async def scenario():
+        for upstream in (bad_audio, rejected_upload, bad_audio, rejected_upload):
+            monkeypatch.setattr(main, '_transcribe_upstream', upstream)
+            assert await main._transcribe_admitted(b'audio') is None
+        assert breaker.state == CLOSED
+
+        monkeypatch.setattr(main, '_transcribe_upstream', outage)
+        for _ in range(2):
+            assert await main._transcribe_admitted(b'audio') is None
+        assert breaker.state == OPEN
+
+    run(scenario())
+
+
+def test_hedged_fast_primary_never_fires_backup():
+    calls = []
+
+    async def fast():
+        calls.append(1)
+        return 'primary'
+
+    assert run(hedged(fast, delay=0.5)) == 'primary'
+    assert len(calls) == 1
+
+
+def test_hedged_backup_wins_and_primary_is_cancelled():
+    attempts = []
+    cancelled = []
+
+    async def scenario():
+        async def attempt():
+            number = len(attempts)
+            attempts.append(number)
+            try:
+                await asyncio.sleep(1 if number == 0 else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(number)
+                raise
+            return number
+
+        assert await hedged(attempt, delay=0.05) == 1
+        await asyncio.sleep(0)
+
+    run(scenario())
+    assert attempts == [0, 1]
+    assert cancelled == [0]
+
+
+def test_hedged_waits_for_other_attempt_after_a_failure():
+    attempts = []
+
+    async def attempt():
+        number = len(attempts)
+        attempts.append(number)
+        if number == 0:
+            await asyncio.sleep(0.1)
+            return 'slow primary'
+        raise RuntimeError('backup failed')
+
+    assert run(hedged(attempt, delay=0.02)) == 'slow primary'
+
+
+def test_hedged_raises_first_error_when_both_fail():
+    attempts = []
+
+    async def attempt():
+        number = len(attempts)
+        attempts.append(number)
+        await asyncio.sleep(0.05 if number == 0 else 0.01)
+        raise RuntimeError(f'attempt {number}')
+
+    with pytest.raises(RuntimeError, match='attempt 1'):
+        run(hedged(attempt, delay=0.02))
@@ -0,0 +1,105 @@
+import asyncio
+
+import fakeredis
+from fastapi.testclient import TestClient
+
+from fastapi_service import jsonlib, main
+from fastapi_service.assemblyai import WEBHOOK_AUTH_HEADER
+from fastapi_service.webhooks import RESULT_KEY, TranscriptWaiter, publish_transcript_result
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_waiter_is_woken_by_published_result():
+    async def scenario():
+        redis = fakeredis.aioredis.FakeRedis()
+        waiter = TranscriptWaiter(redis)
+        try:
+            waiting = asyncio.ensure_future(waiter.wait('t1', timeout=5))
+            await asyncio.sleep(0.05)
+            await publish_transcript_result(redis, 't1', {'transcript_id': 't1', 'status': 'completed'})
+            return await waiting
+        finally:
+            await waiter.stop()
+
+    assert run(scenario()) == {'transcript_id': 't1', 'status': 'completed'}
+
+
+def test_waiter_finds_result_that_arrived_first_and_times_out_otherwise():
+    async def scenario():
+        redis = fakeredis.aioredis.FakeRedis()
+        waiter = TranscriptWaiter(redis)
+        try:
+            await publish_transcript_result(redis, 't1', {'transcript_id': 't1', 'status': 'error'})
+            early = await waiter.wait('t1', timeout=5)
+            missing = await waiter.wait('t2', timeout=0.05)
+            return early, missing, waiter._waiters
+        finally:
+            await waiter.stop()
+
+    early, missing, waiters = run(scenario())
+    assert early['status'] == 'error'
+    assert missing is None
+    assert waiters == {}
+
+
+def test_webhook_text_is_never_used_as_transcript(monkeypatch):
+    fetched = []
+
+    class Waiter:
+        async def wait(self, transcript_id, timeout):
+            return {'transcript_id': transcript_id, 'status': 'completed', 'text': 'forged text'}
+
+    async def get_transcript(transcript_id):
+        fetched.append(transcript_id)
+        return {'id': transcript_id, 'status': 'completed', 'text': 'what was said'}
+
+    monkeypatch.setattr(main, 'transcript_waiter', Waiter())
+    monkeypatch.setattr(main.assemblyai, 'get_transcript', get_transcript)
+    data = run(main._wait_for_webhook('t1'))
+    assert data['text'] == 'what was said'
+    assert fetched == ['t1']
+
+
+def test_callback_only_forwards_id_and_status(monkeypatch):
+    redis = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr(main, 'async_redis', redis)
+    monkeypatch.setattr(main, 'ASSEMBLYAI_WEBHOOK_SECRET', '')
+    client = TestClient(main.app)
+
+    response = client.post('/api/assemblyai_callback/', json={
+        'transcript_id': 't1', 'status': 'completed', 'text': 'forged text',
+    })
+    assert response.status_code == 200
+    stored = jsonlib.loads(run(redis.get(RESULT_KEY.format('t1'))))
+    assert stored == {'transcript_id': 't1', 'status': 'completed'}
+
+    assert client.post('/api/assemblyai_callback/', json={'status': 'completed'}).status_code == 400
+
+
+def test_callback_requires_secret_when_configured(monkeypatch):
+    monkeypatch.setattr(main, 'async_redis', fakeredis.aioredis.FakeRedis())
+    monkeypatch.setattr(main, 'ASSEMBLYAI_WEBHOOK_SECRET', 's3cret')
+    client = TestClient(main.app)
+    payload = {'transcript_id': 't1', 'status': 'completed'}
+
+    assert client.post('/api/assemblyai_callback/', json=payload).status_code == 401
+    response = client.post('/api/assemblyai_callback/', json=payload, headers={WEBHOOK_AUTH_HEADER: 's3cret'})
+    assert response.status_code == 200
+
+
+def test_restart_after_listener_died_closes_old_pubsub():
+    async def scenario():
+        waiter = TranscriptWaiter(fakeredis.aioredis.FakeRedis())
+        await waiter.start()
+        old = waiter._pubsub
+        waiter._listener.cancel()
+        await asyncio.sleep(0)
+        await waiter.start()
+        replaced = waiter._pubsub is not old and old.connection is None
+        await waiter.stop()
+        return replaced
+
+    assert run(scenario())
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from rq.timeouts import JobTimeoutException
+
+from fastapi_service import tasks
+from fastapi_service.worker import JobLoop
+
+
+@pytest.fixture
+def job_loop():
+    job_loop = JobLoop()
+    job_loop.start()
+    yield job_loop
+    job_loop.loop.call_soon_threadsafe(job_loop.loop.stop)
+
+
+def test_timeout_interrupts_slow_coroutine(job_loop):
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(8)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    started = time.monotonic()
+    with pytest.raises(JobTimeoutException):
+        job_loop.run(slow(), timeout=0.2)
+    assert time.monotonic() - started < 2
+    assert cancelled.is_set()
+
+
+def test_result_within_timeout(job_loop):
+    async def quick():
+        await asyncio.sleep(0.01)
+        return {'ok': True}
+
+    assert job_loop.run(quick(), timeout=5) == {'ok': True}
+    assert job_loop.run(quick()) == {'ok': True}
+
+
+def test_inner_timeout_error_is_not_a_job_timeout(job_loop):
+    async def provider_timeout():
+        raise TimeoutError('provider')
+
+    with pytest.raises(TimeoutError, match='provider'):
+        job_loop.run(provider_timeout(), timeout=5)
+
+
+def test_timed_out_job_publishes_failed_not_done(job_loop, monkeypatch):
+    events = []
+
+    async def record(redis, job_id, state, **data):
+        events.append(state)
+
+    async def slow_pipeline(*args):
+        await asyncio.sleep(8)
+        return {'grammar_score': 7}
+
+    monkeypatch.setattr(tasks, 'publish_job_event', record)
+    monkeypatch.setattr(tasks, '_transcribe_and_analyze', slow_pipeline)
+
+    with pytest.raises(JobTimeoutException):
+        job_loop.run(tasks.process_job('ref', 'topic', job_id='job-1'), timeout=0.2)
+    assert events == ['failed']
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import mmap
+import os
+from typing import AsyncIterator, Union
+
+from fastapi import UploadFile
+from starlette.exceptions import HTTPException
+
+
+# Uploads are spooled by Starlette (memory up to 1 MB, then a temp file) and
+# read back in chunks, so a request never holds the whole recording in RAM.
+MAX_UPLOAD_BYTES = int(os.getenv('MAX_UPLOAD_BYTES', str(25 * 1024 * 1024)))
+MAX_AUDIO_SECONDS = float(os.getenv('MAX_AUDIO_SECONDS', '300'))
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(256 * 1024)))
+
+# Raw bytes, a spooled upload, or a memory-mapped blob (see blobstore.py)
+AudioSource = Union[bytes, memoryview, mmap.mmap, UploadFile]
+BUFFER_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+
+def too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+
+class UploadLimitMiddleware:
+    """Reject request bodies larger than ``max_bytes`` with 413.
+
+    Requests that declare a too-large Content-Length are answered before any
+    of the body is read. Chunked or lying clients are cut off as soon as the
+    running byte count passes the limit, while the multipart parser is still
+    spooling, instead of after the whole body has been buffered.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] not in ('POST', 'PUT', 'PATCH'):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get('headers') or [])
+        content_length = headers.get(b'content-length')
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_bytes:
+                    # Re-raised by FastAPI's body parsing and rendered as 413
+                    raise too_large(f'Upload exceeds {self.max_bytes} bytes')
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send):
+        body = json.dumps({'detail': f'Upload exceeds {self.max_bytes} bytes'}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 413,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'connection', b'close'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+def check_duration(duration: float = None):
+    """Enforce MAX_AUDIO_SECONDS against the client-declared recording length."""
+    if duration is not None and duration > MAX_AUDIO_SECONDS:
+        raise too_large(f'Recording longer than {MAX_AUDIO_SECONDS:g} seconds')
+
+
+async def audio_digest(audio: AudioSource) -> tuple:
+    """Return ``(sha256 hex, size)`` of the audio, reading files in chunks."""
+    if isinstance(audio, BUFFER_TYPES):
+        return hashlib.sha256(audio).hexdigest(), len(audio)
+
+    digest = hashlib.sha256()
+    size = 0
+    await audio.seek(0)
+    while True:
+        chunk = await audio.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+    await audio.seek(0)
+    return digest.hexdigest(), size
+
+
+async def iter_audio(audio: UploadFile) -> AsyncIterator[bytes]:
+    """Stream an upload from its spooled file in fixed-size chunks."""
+    await audio.seek(0)
+    while True:
+        chunk = await audio.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def iter_buffer(buffer) -> AsyncIterator[bytes]:
+    """Stream a memory-mapped blob without copying it onto the heap in one piece."""
+    # Slicing (rather than holding a memoryview) keeps no buffer export
+    # alive, so the map can be closed even if the upload is abandoned
+    for start in range(0, len(buffer), UPLOAD_CHUNK_SIZE):
+        yield bytes(buffer[start:start + UPLOAD_CHUNK_SIZE])
+
+
+def upload_content(audio: AudioSource):
+    """Request body for an httpx upload: bytes as-is, everything else streamed."""
+    if isinstance(audio, (bytes, bytearray)):
+        return bytes(audio)
+    if isinstance(audio, BUFFER_TYPES):
+        return iter_buffer(audio)
+    return iter_audio(audio)
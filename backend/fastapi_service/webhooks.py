@@ -0,0 +1,122 @@
+import asyncio
+from typing import Optional
+
+from . import jsonlib
+from .logs import get_logger
+
+
+log = get_logger('webhook')
+
+
+RESULT_KEY = 'assemblyai:result:{}'
+DONE_CHANNEL = 'assemblyai:done:{}'
+DONE_PATTERN = 'assemblyai:done:*'
+RESULT_TTL = 60 * 60
+
+
+async def publish_transcript_result(redis, transcript_id: str, payload: dict):
+    """Store a webhook payload and wake everyone waiting on that transcript.
+
+    The key is written before publishing so a waiter that subscribes after the
+    message went out still finds the result when it checks the key.
+    """
+    raw = jsonlib.dumps(payload)
+    await redis.set(RESULT_KEY.format(transcript_id), raw, ex=RESULT_TTL)
+    await redis.publish(DONE_CHANNEL.format(transcript_id), raw)
+
+
+class TranscriptWaiter:
+    """Lets coroutines await AssemblyAI webhook results instead of polling.
+
+    One pattern subscription per process fans every ``assemblyai:done:<id>``
+    message out to the futures registered for that id, so any number of
+    in-flight transcriptions share a single Redis pub/sub connection. The
+    callback may land on a different process (API vs RQ worker); pub/sub
+    delivers it to whichever one is waiting.
+    """
+
+    def __init__(self, redis):
+        self.redis = redis
+        self._waiters = {}
+        self._pubsub = None
+        self._listener = None
+
+    async def start(self):
+        if self._listener is not None and not self._listener.done():
+            return
+        # The listener died: release its pub/sub connection before resubscribing
+        await self._close_pubsub()
+        self._pubsub = self.redis.pubsub()
+        await self._pubsub.psubscribe(DONE_PATTERN)
+        self._listener = asyncio.ensure_future(self._listen())
+
+    async def stop(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.cancel()
+        # Closing the connection also ends a listener that lost the
+        # cancellation inside a pub/sub read (it then stops on the error)
+        await self._close_pubsub()
+        if listener is not None:
+            try:
+                await listener
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def _close_pubsub(self):
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = None
+
+    async def _listen(self):
+        try:
+            while True:
+                # Poll with a short read timeout so the shared pool's
+                # socket_timeout never fires on an idle subscription
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None or message.get('type') != 'pmessage':
+                    continue
+                channel = message['channel']
+                if isinstance(channel, bytes):
+                    channel = channel.decode()
+                transcript_id = channel.rsplit(':', 1)[-1]
+                try:
+                    payload = jsonlib.loads(message['data'])
+                except (TypeError, ValueError):
+                    payload = {}
+                self._resolve(transcript_id, payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Waiters fall back to a direct status check when they time out;
+            # the next wait() resubscribes.
+            if self._listener is not None:
+                log.warning("Pub/sub listener stopped: %s", e)
+
+    def _resolve(self, transcript_id: str, payload: dict):
+        for future in self._waiters.pop(transcript_id, []):
+            if not future.done():
+                future.set_result(payload)
+
+    async def wait(self, transcript_id: str, timeout: float) -> Optional[dict]:
+        """Wait for the webhook payload of ``transcript_id``; None on timeout."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(transcript_id, []).append(future)
+        try:
+            await self.start()
+            # The callback may have arrived before we subscribed
+            raw = await self.redis.get(RESULT_KEY.format(transcript_id))
+            if raw is not None:
+                return jsonlib.loads(raw)
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(transcript_id)
+            if waiters and future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self._waiters[transcript_id]
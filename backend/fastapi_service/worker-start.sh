@@ -1,15 +1,33 @@
 #!/usr/bin/env bash
-# Minimal script to run an RQ worker in production
+# Minimal script to run workers in production (run from backend/)
+#
+# WORKER_MODE=async (default): long-lived asyncio worker processes, each
+#   running up to WORKER_CONCURRENCY jobs at once on one event loop.
+# WORKER_MODE=rq: stock `rq worker` processes, one job at a time each.
 set -e
 
 REDIS_URL=${REDIS_URL:-redis://localhost:6379/0}
 export REDIS_URL
 
-echo "Starting RQ worker on queue 'default' (Redis: $REDIS_URL)"
-echo "Starting multiple RQ workers (count=${WORKER_COUNT:-2})"
+WORKER_MODE=${WORKER_MODE:-async}
 WORKER_COUNT=${WORKER_COUNT:-2}
+export WORKER_CONCURRENCY=${WORKER_CONCURRENCY:-10}
+
+# Shared with the API so /metrics includes worker processes (see metrics.py).
+# Files are named after host and pid; drop this host's leftovers from the
+# previous run (other containers' files are theirs to clean)
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+	mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+	rm -f "$PROMETHEUS_MULTIPROC_DIR"/*_"${HOSTNAME//_/-}"-*.db
+fi
+
+echo "Starting $WORKER_COUNT '$WORKER_MODE' workers on queue 'default' (Redis: $REDIS_URL)"
 for i in $(seq 1 $WORKER_COUNT); do
 	echo "Starting worker $i"
-	rq worker default &
+	if [ "$WORKER_MODE" = "rq" ]; then
+		rq worker --url "$REDIS_URL" --worker-class fastapi_service.worker.ForkingJobWorker default &
+	else
+		python -m fastapi_service.worker &
+	fi
 done
 wait
@@ -0,0 +1,177 @@
+"""Long-lived asyncio worker for queued transcription jobs.
+
+Run with ``python -m fastapi_service.worker`` from ``backend/``.
+
+A stock ``rq worker`` runs one job at a time and each job spins up (and
+tears down) its own event loop and HTTP/Redis clients, even though the job
+spends nearly all of its time waiting on AssemblyAI and Gemini. This worker
+keeps one event loop alive for the life of the process and runs up to
+``WORKER_CONCURRENCY`` jobs on it at once, all sharing the pooled provider
+and Redis clients.
+
+Job bookkeeping (started/finished/failed registries, results, timeouts) is
+still done by RQ: each concurrency slot is a ``SimpleWorker`` running in its
+own thread, and the job function hands its coroutine to the shared loop and
+blocks that thread until it completes. A job that raises is recorded as
+failed by RQ exactly as with a regular worker.
+"""
+import asyncio
+import os
+import signal
+import threading
+import time
+from typing import Optional
+
+from rq import SimpleWorker, Worker
+from rq.timeouts import JobTimeoutException, TimerDeathPenalty
+
+# First: loads backend/.env before other modules read their settings
+from . import env  # noqa: F401
+from . import tasks
+from .logs import get_logger
+from .metrics import horse_identifier, mark_process_dead, use_work_horse_identity
+from .redis_pool import job_queue, redis_conn
+
+
+log = get_logger('worker')
+
+
+WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', '10'))
+WORKER_SHUTDOWN_GRACE = float(os.getenv('WORKER_SHUTDOWN_GRACE', '150'))
+
+
+async def _with_deadline(coro, timeout: float):
+    """Await ``coro``, cancelling it and raising JobTimeoutException after ``timeout``.
+
+    The cancelled job is awaited so it has published its ``failed`` event
+    before RQ records the timeout; it never gets to publish ``done``.
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if not done:
+        task.cancel()
+        try:
+            await task
+        except (Exception, asyncio.CancelledError):
+            pass
+        raise JobTimeoutException(f'Task exceeded maximum timeout value ({timeout} seconds)')
+    return task.result()
+
+
+class JobLoop:
+    """A persistent event loop running in a background thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name='job-loop', daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def start(self):
+        self._thread.start()
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run ``coro`` on the loop and block the calling thread for its result.
+
+        ``timeout`` (the RQ job timeout) is enforced on the loop, see
+        ``_with_deadline``. RQ's own timer cannot interrupt the job: its
+        exception is only delivered once this thread stops waiting.
+        """
+        if timeout is not None and timeout > 0:
+            coro = _with_deadline(coro, timeout)
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result()
+        except BaseException:
+            # Includes RQ's JobTimeoutException raised into this thread
+            future.cancel()
+            raise
+
+    def stop(self):
+        from .main import close_clients
+
+        asyncio.run_coroutine_threadsafe(close_clients(), self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=10)
+
+
+class ThreadedJobWorker(SimpleWorker):
+    """RQ worker that can run in a non-main thread.
+
+    Signals are owned by the main thread (see ``main``), and job timeouts use
+    a timer thread instead of SIGALRM, which only works in the main thread.
+    """
+
+    death_penalty_class = TimerDeathPenalty
+
+    def _install_signal_handlers(self):
+        pass
+
+
+class ForkingJobWorker(Worker):
+    """Stock forking RQ worker (``WORKER_MODE=rq``) that tidies its metrics.
+
+    Every job runs in a fresh work horse; all horses of one worker share a
+    metrics identity (see metrics.py) and their live gauges are dropped
+    when each exits. Start with ``rq worker --worker-class
+    fastapi_service.worker.ForkingJobWorker``.
+    """
+
+    def main_work_horse(self, job, queue):
+        use_work_horse_identity()
+        return super().main_work_horse(job, queue)
+
+    def monitor_work_horse(self, job, queue):
+        try:
+            return super().monitor_work_horse(job, queue)
+        finally:
+            mark_process_dead(horse_identifier(os.getpid()))
+
+    def teardown(self):
+        super().teardown()
+        if not self.is_horse:
+            mark_process_dead()
+
+
+def main():
+    job_loop = JobLoop()
+    job_loop.start()
+    tasks.set_job_loop(job_loop)
+
+    workers = [ThreadedJobWorker([job_queue], connection=redis_conn) for _ in range(WORKER_CONCURRENCY)]
+    threads = [
+        threading.Thread(target=worker.work, name=f'rq-slot-{i}', daemon=True)
+        for i, worker in enumerate(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    log.info("Async worker started: %d concurrent jobs on queue '%s'", WORKER_CONCURRENCY, job_queue.name)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    while not stop.is_set() and any(thread.is_alive() for thread in threads):
+        stop.wait(1)
+
+    # Warm shutdown: slots stop taking jobs after the current one. Idle slots
+    # are blocked in a dequeue and hold nothing, so only wait for busy ones.
+    log.info("Shutting down, waiting for in-flight jobs...")
+    for worker in workers:
+        worker._stop_requested = True
+    deadline = time.monotonic() + WORKER_SHUTDOWN_GRACE
+    while time.monotonic() < deadline and any(worker.get_state() == 'busy' for worker in workers):
+        time.sleep(0.5)
+
+    job_loop.stop()
+    mark_process_dead()
+    log.info("Stopped")
+
+
+if __name__ == '__main__':
+    main()
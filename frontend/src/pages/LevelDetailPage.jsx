@@ -83,6 +83,11 @@ export default function LevelDetailPage() {
       const formData = new FormData();
       formData.append('audio', blob, 'recording.webm');
       formData.append('topic', level.topic);
+      formData.append('duration', elapsedTime);
+      if (mode === 'read') {
+        // Read mode is scored against the exact text shown in the teleprompter
+        formData.append('reference_text', language === 'German' && level.text_german ? level.text_german : level.text);
+      }
 
       const endpoint = mode === 'continue' ? aiAPI.analyzeSpeech : aiAPI.analyzeReading;
       const response = await endpoint(formData);
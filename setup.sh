@@ -111,7 +111,7 @@ echo ""
 echo -e "${BLUE}Terminal 2 - FastAPI Service:${NC}"
 echo "  cd backend"
 echo "  source .venv/bin/activate"
-echo "  uvicorn backend.fastapi_service.main:app --reload --port 8001"
+echo "  uvicorn fastapi_service.main:app --reload --port 8001"
 echo ""
 echo -e "${BLUE}Terminal 3 - React Frontend:${NC}"
 echo "  cd frontend"